@@ -0,0 +1,246 @@
+"""Micro-benchmarks de las etapas de una petición GraphQL.
+
+Uso:
+    python -m benchmarks.pipeline_bench                    # compara contra baseline
+    python -m benchmarks.pipeline_bench --update-baseline  # regenera baseline
+    python -m benchmarks.pipeline_bench --only parse       # filtra etapas
+
+Cada etapa se mide con ``timeit`` (auto-range + repeticiones) y se reporta el
+mejor tiempo por llamada. Con ``--threshold 1.25`` el proceso termina con
+código 1 si alguna etapa es más de un 25% más lenta que el baseline.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable, Dict
+
+# Variables mínimas para importar el servidor sin servicios externos
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+from testing.mongo_stub import install_stub_mongo  # noqa: E402
+
+stub_mongo = install_stub_mongo(users=100)
+
+from ariadne import graphql_sync, make_executable_schema  # noqa: E402
+from flask import jsonify, request  # noqa: E402
+from graphql import GraphQLError, parse, validate  # noqa: E402
+from pydantic import ValidationError  # noqa: E402
+
+from server import create_app  # noqa: E402
+from server.enums.http_error_code_enum import HTTPErrorCode  # noqa: E402
+from server.helpers.custom_graphql_exception_helper import (  # noqa: E402
+    CustomGraphQLExceptionHelper,
+)
+from server.helpers.query_compiler_helper import QueryCompilerHelper  # noqa: E402
+from server.helpers.timeout_directive_helper import (  # noqa: E402
+    TimeoutDirectiveHelper,
+)
+from server.models.user_model import RegisterModel, UpdateUserModel  # noqa: E402
+from server.schema import all_resolvers, schema, type_defs  # noqa: E402
+from server.utils.auth_utils import create_token  # noqa: E402
+from server.utils.custom_error_formatter_utils import custom_format_error  # noqa: E402
+from server.utils.http_status_utils import resolve_status_code  # noqa: E402
+from testing.operations import OPERATIONS, REGISTER_INPUT  # noqa: E402
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 1.25
+REPEAT = 5
+
+
+def _graphql_error(original: Exception) -> GraphQLError:
+    return GraphQLError(str(original), original_error=original)
+
+
+def _validation_error() -> ValidationError:
+    try:
+        UpdateUserModel(name="x", lastname="y")
+    except ValidationError as error:
+        return error
+    raise RuntimeError("UpdateUserModel debía fallar")
+
+
+def build_stages() -> Dict[str, Callable[[], object]]:
+    """Construye las etapas a medir; cada una es un callable sin argumentos"""
+    app = create_app()
+    first_user = stub_mongo.collections["users"][0]
+    user_id = str(first_user["_id"])
+    token = create_token({"id": user_id})
+
+    request_body = json.dumps(
+        {
+            "operationName": "User",
+            "query": OPERATIONS["user"],
+            "variables": {"id": user_id},
+        }
+    )
+
+    stages: Dict[str, Callable[[], object]] = {
+        "json_decode": lambda: json.loads(request_body),
+    }
+
+    for name, query in OPERATIONS.items():
+        stages[f"parse_validate.{name}"] = lambda query=query: validate(
+            schema, parse(query)
+        )
+
+    stages["make_executable_schema"] = lambda: make_executable_schema(
+        type_defs, *all_resolvers, directives={"timeout": TimeoutDirectiveHelper}
+    )
+
+    def execute(operation: str, variables=None):
+        data = {"query": OPERATIONS[operation], "variables": variables or {}}
+
+        def run():
+            with app.test_request_context(
+                "/graphql",
+                method="POST",
+                headers={"Authorization": f"Bearer {token}"},
+            ):
+                return graphql_sync(
+                    schema,
+                    data,
+                    context_value=request,
+                    error_formatter=custom_format_error,
+                )
+
+        return run
+
+    stages["execute.hello"] = execute("hello")
+    stages["execute.users"] = execute("users")
+    stages["execute.user"] = execute("user", {"id": user_id})
+    stages["execute.profile"] = execute("profile")
+
+    # Mismas operaciones con el plan compilado (cacheado tras la primera vez)
+    query_compiler = QueryCompilerHelper(schema)
+
+    def execute_compiled(operation: str, variables=None):
+        data = {"query": OPERATIONS[operation], "variables": variables or {}}
+
+        def run():
+            with app.test_request_context(
+                "/graphql",
+                method="POST",
+                headers={"Authorization": f"Bearer {token}"},
+            ):
+                return query_compiler.execute(
+                    data,
+                    context_value=request,
+                    error_formatter=custom_format_error,
+                )
+
+        return run
+
+    stages["execute_compiled.users"] = execute_compiled("users")
+    stages["execute_compiled.user"] = execute_compiled("user", {"id": user_id})
+    stages["execute_compiled.profile"] = execute_compiled("profile")
+    stages["compile.users"] = lambda: query_compiler.compile(OPERATIONS["users"])
+    stages["compile.profile"] = lambda: query_compiler.compile(OPERATIONS["profile"])
+
+    custom_error = _graphql_error(
+        CustomGraphQLExceptionHelper("No encontrado", HTTPErrorCode.NOT_FOUND)
+    )
+    validation_error = _graphql_error(_validation_error())
+    plain_error = GraphQLError("Cannot query field 'foo' on type 'Query'.")
+    stages["format_error.custom"] = lambda: custom_format_error(custom_error)
+    stages["format_error.validation"] = lambda: custom_format_error(validation_error)
+    stages["format_error.default"] = lambda: custom_format_error(plain_error)
+
+    error_result = {
+        "data": None,
+        "errors": [
+            {"message": "x", "extensions": {"code": "BAD_USER_INPUT"}},
+            {"message": "y", "extensions": {"code": "SERVICE_UNAVAILABLE"}},
+        ],
+    }
+    stages["status_mapping.ok"] = lambda: resolve_status_code(True, {"data": {}})
+    stages["status_mapping.errors"] = lambda: resolve_status_code(False, error_result)
+
+    # Incluye el hash bcrypt que RegisterModel aplica al validar
+    stages["register_model"] = lambda: RegisterModel(**REGISTER_INPUT)
+
+    _, users_payload = execute("users")()
+
+    def run_jsonify():
+        with app.app_context():
+            return jsonify(users_payload)
+
+    stages["jsonify.users"] = run_jsonify
+    return stages
+
+
+def measure(stage: Callable[[], object], repeat: int = REPEAT) -> float:
+    """Devuelve el mejor tiempo por llamada (segundos) de ``repeat`` rondas"""
+    timer = timeit.Timer(stage)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def load_baseline(path: Path) -> Dict[str, float]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["stages"]
+
+
+def save_baseline(path: Path, results: Dict[str, float]) -> None:
+    payload = {
+        "python": sys.version.split()[0],
+        "unit": "seconds_per_call",
+        "stages": results,
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", help="Solo etapas que contengan este texto")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+
+    stages = build_stages()
+    if args.only:
+        stages = {name: fn for name, fn in stages.items() if args.only in name}
+
+    baseline = load_baseline(args.baseline)
+    results: Dict[str, float] = {}
+    regressions = []
+
+    print(f"{'etapa':<32} {'actual (µs)':>12} {'baseline (µs)':>14} {'ratio':>7}")
+    for name, stage in stages.items():
+        elapsed = measure(stage, args.repeat)
+        results[name] = elapsed
+        reference = baseline.get(name)
+        ratio = elapsed / reference if reference else None
+        flag = ""
+        if ratio is not None and ratio > args.threshold:
+            regressions.append(name)
+            flag = "  <-- regresión"
+        print(
+            f"{name:<32} {elapsed * 1e6:>12.2f} "
+            f"{(reference or 0) * 1e6:>14.2f} "
+            f"{(f'{ratio:.2f}' if ratio else '-'):>7}{flag}"
+        )
+
+    if args.update_baseline:
+        merged = {**baseline, **results}
+        save_baseline(args.baseline, merged)
+        print(f"Baseline actualizado en {args.baseline}")
+        return 0
+
+    if regressions:
+        print(
+            f"{len(regressions)} etapa(s) superan el umbral x{args.threshold}: "
+            + ", ".join(regressions)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""Memoria y throughput al leer listados grandes de usuarios.
+
+Uso:
+    python -m benchmarks.user_decoding_bench                   # 10k y 50k usuarios
+    python -m benchmarks.user_decoding_bench --users 100000
+
+Simula lo que hace el driver con cada lote del cursor (bytes BSON de
+``BATCH_SIZE`` documentos) y compara:
+
+* ``dict``: decodificar a dicts con la proyección antigua (todo salvo la
+  contraseña) y copiarlos a otro dict con los campos del schema
+* ``dict+record``: proyección mínima de ``User``, dicts del decodificador en
+  C mapeados a ``User`` (lo que hacen los resolvers)
+* ``raw+record``: RawBSONDocument (decodificación perezosa) mapeado a
+  ``User``; se lee cada campo, así que la pereza no ahorra nada y el acceso
+  desde Python sale más caro que decodificar en C
+
+Para cada variante se mide el throughput (usuarios/s, mejor de ``--repeat``
+rondas), el pico de memoria al construir la lista y la memoria que retiene la
+lista final. ``execute.*`` mide además la ejecución GraphQL de esa lista.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+# Variables mínimas para importar el servidor sin servicios externos
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+from testing.mongo_stub import install_stub_mongo, make_users  # noqa: E402
+
+install_stub_mongo(users=1)
+
+import bson  # noqa: E402
+from ariadne import QueryType, graphql_sync, make_executable_schema  # noqa: E402
+from bson.codec_options import CodecOptions  # noqa: E402
+from bson.raw_bson import RawBSONDocument  # noqa: E402
+
+from server.models.user_model import User  # noqa: E402
+
+BATCH_SIZE = 1000
+REPEAT = 3
+DEFAULT_USERS = (10_000, 50_000)
+
+DICT_CODEC_OPTIONS = CodecOptions()
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+USERS_QUERY = "{ users { id name lastname email isAdmin } }"
+
+
+def _user_to_dict(user: Dict[str, Any]) -> Dict[str, Any]:
+    # Mapeo previo a User: un segundo dict por usuario
+    return {
+        "id": str(user["_id"]),
+        "name": user["name"],
+        "lastname": user["lastname"],
+        "email": user["email"],
+        "isAdmin": user.get("isAdmin", False),
+    }
+
+
+def _encode_batches(users: List[Dict[str, Any]], fields) -> List[bytes]:
+    """Lotes como los que devuelve el servidor para una proyección dada"""
+    batches = []
+    for start in range(0, len(users), BATCH_SIZE):
+        batches.append(
+            b"".join(
+                bson.encode({key: value for key, value in user.items() if fields(key)})
+                for user in users[start : start + BATCH_SIZE]
+            )
+        )
+    return batches
+
+
+def build_variants(count: int) -> Dict[str, Callable[[], list]]:
+    users = make_users(count)
+    legacy_batches = _encode_batches(users, lambda key: key != "password")
+    projected_batches = _encode_batches(
+        users, lambda key: key == "_id" or key in User.PROJECTION
+    )
+
+    def variant(batches, codec_options, to_user):
+        def run():
+            result = []
+            for batch in batches:
+                result.extend(
+                    to_user(user) for user in bson.decode_all(batch, codec_options)
+                )
+            return result
+
+        return run
+
+    return {
+        "dict": variant(legacy_batches, DICT_CODEC_OPTIONS, _user_to_dict),
+        "dict+record": variant(
+            projected_batches, DICT_CODEC_OPTIONS, User.from_document
+        ),
+        "raw+record": variant(projected_batches, RAW_CODEC_OPTIONS, User.from_document),
+    }
+
+
+def build_execution_schema(users: list):
+    type_defs = """
+        type User {
+            id: ID!
+            name: String!
+            lastname: String!
+            email: String!
+            isAdmin: Boolean!
+        }
+        type Query { users: [User!]! }
+    """
+    query = QueryType()
+    query.set_field("users", lambda *_: users)
+    return make_executable_schema(type_defs, query)
+
+
+def measure_throughput(run: Callable[[], list], count: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def measure_memory(run: Callable[[], list]):
+    """Devuelve (pico al construir, retenido por la lista) en bytes"""
+    gc.collect()
+    tracemalloc.start()
+    result = run()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak, retained
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, action="append")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'variante':<28} {'usuarios/s':>12} {'pico (MiB)':>11} "
+        f"{'retenido (MiB)':>15} {'B/usuario':>10}"
+    )
+    for count in args.users or DEFAULT_USERS:
+        variants = build_variants(count)
+        for name, run in variants.items():
+            throughput = measure_throughput(run, count, args.repeat)
+            peak, retained = measure_memory(run)
+            print(
+                f"{f'{name} ({count})':<28} {throughput:>12,.0f} "
+                f"{peak / 2**20:>11.2f} {retained / 2**20:>15.2f} "
+                f"{retained / count:>10.0f}"
+            )
+
+        for name in ("dict", "dict+record"):
+            schema = build_execution_schema(variants[name]())
+            throughput = measure_throughput(
+                lambda: graphql_sync(schema, {"query": USERS_QUERY}), count, 1
+            )
+            print(f"{f'execute.{name} ({count})':<28} {throughput:>12,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
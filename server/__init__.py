@@ -1,16 +1,44 @@
 import logging
-from flask import Flask, request, jsonify
+import os
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 from ariadne import graphql_sync
 from ariadne.explorer import ExplorerGraphiQL
 
+from server.commands.index_commands import indexes_cli
 from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.admission_control_helper import AdmissionControlHelper
+from server.helpers.compression_helper import CompressionHelper
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.incremental_execution_helper import IncrementalExecutionContext
+from server.helpers.introspection_cache_helper import IntrospectionCacheHelper
 from server.helpers.logger_helper import LoggerHelper
 from server.helpers.mail_helper import MailHelper
+from server.helpers.metrics_helper import MetricsHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+from server.helpers.profiling_helper import PROFILE_HEADER, ProfilingHelper
+from server.helpers.query_compiler_helper import QueryCompilerHelper
+from server.helpers.request_coalescing_helper import RequestCoalescingHelper
+from server.helpers.token_revocation_helper import TokenRevocationHelper
+from server.helpers.tracing_helper import TracingHelper
+from server.helpers.users_replica_helper import UsersReplicaHelper
 from server.schema import schema
 from server.utils.custom_error_formatter_utils import (
     custom_format_error,
 )  # tu schema creado con Ariadne
+from server.utils.deadline_utils import (
+    REQUEST_TIMEOUT_HEADER,
+    request_deadline,
+    resolve_request_timeout,
+)
+from server.utils.http_status_utils import resolve_retry_after, resolve_status_code
+from server.utils.incremental_delivery_utils import (
+    MULTIPART_CONTENT_TYPE,
+    accepts_incremental_delivery,
+    multipart_response_body,
+)
+from server.utils.readiness_utils import check_readiness
+from server.utils.request_utils import init_proxy_fix
 
 # Desactiva completamente el logger que imprime el traceback
 logging.getLogger("ariadne").setLevel(logging.CRITICAL)
@@ -18,11 +46,47 @@ logging.getLogger("ariadne").setLevel(logging.CRITICAL)
 
 def create_app():
     app = Flask(__name__)
+    # remote_addr del cliente real detrás de TRUSTED_PROXY_HOPS proxies
+    init_proxy_fix(app)
     # Habilita CORS para todas las rutas y orígenes
     CORS(app, resources={r"/graphql": {"origins": "*"}})
     explorer_html = ExplorerGraphiQL().html(None)
+    # Los índices se crean en el despliegue: flask indexes sync
+    app.cli.add_command(indexes_cli)
+    query_compiler = QueryCompilerHelper(schema)
+
+    tracing = TracingHelper()
+    tracing.init_app(app)
+    MetricsHelper().register("tracing", tracing.metrics)
 
     MailHelper().init_app(app)
+    CompressionHelper().init_app(app)
+    introspection_cache = IntrospectionCacheHelper()
+    introspection_cache.init_app(app, schema)
+
+    mongo_registry = MongoRegistryHelper()
+    MetricsHelper().register("mongo_pools", mongo_registry.metrics)
+    token_revocation = TokenRevocationHelper()
+    token_revocation.start()
+    MetricsHelper().register("token_revocation", token_revocation.metrics)
+
+    # Abre los pools al arrancar el worker y no en las primeras peticiones
+    if os.getenv("MONGO_WARM_UP", "true").lower() == "true":
+        mongo_registry.warm_up()
+
+    # Réplica en memoria de users (opcional, USERS_REPLICA_ENABLED)
+    users_replica = UsersReplicaHelper()
+    users_replica.start(mongo_registry)
+    MetricsHelper().register("users_replica", users_replica.metrics)
+
+    admission_control = AdmissionControlHelper()
+    MetricsHelper().register("admission_control", admission_control.metrics)
+
+    profiling = ProfilingHelper()
+    MetricsHelper().register("profiling", profiling.metrics)
+
+    request_coalescing = RequestCoalescingHelper()
+    MetricsHelper().register("request_coalescing", request_coalescing.metrics)
 
     @app.route("/", methods=["GET"])
     def root():
@@ -32,42 +96,161 @@ def create_app():
     def health_check():
         return jsonify({"status": "Ok", "message": "Pong"})
 
+    @app.route("/ready", methods=["GET"])
+    def readiness_check():
+        # A diferencia de /ping, comprueba las dependencias
+        ready, report = check_readiness(mongo_registry, MailHelper())
+        status_code = 200 if ready else HTTPErrorCode.SERVICE_UNAVAILABLE.status_code
+        return jsonify(report), status_code
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        try:
+            MetricsHelper().authorize(request.headers.get("Authorization", ""))
+        except CustomGraphQLExceptionHelper as e:
+            return error_response(e)
+        return jsonify(MetricsHelper().snapshot())
+
     @app.route("/graphql", methods=["GET"])
     def graphql_explorer():
-        # Sirve GraphiQL UI para hacer queries
+        # Sirve GraphiQL UI para hacer queries; su versión comprimida se cachea
+        g.compression_cache_key = "graphiql_explorer"
         return explorer_html, 200
 
+    def execute_operation(data):
+        # @defer/@stream solo se aplican si el cliente acepta multipart/mixed;
+        # si no, se ignoran y la respuesta es el JSON completo
+        execution_context_class = (
+            IncrementalExecutionContext
+            if accepts_incremental_delivery(request.headers.get("Accept", ""))
+            else None
+        )
+        # Perfil bajo demanda (X-Profile, solo administradores) o muestreado
+        profile = profiling.start(
+            request.headers, data.get("operationName", "unnamed"), g.request_id
+        )
+        result = None
+        try:
+            # Todas las consultas a MongoDB de la operación comparten el
+            # presupuesto de X-Request-Timeout (o REQUEST_TIMEOUT_MS)
+            with request_deadline():
+                # Operaciones ya vistas y compilables evitan parse, validate y el
+                # ejecutor genérico; el resto (o si falla la coerción) va por
+                # graphql_sync. Las peticiones muestreadas por las trazas también,
+                # para tener los spans de cada fase y resolver
+                compiled_result = (
+                    None
+                    if tracing.is_sampled()
+                    else query_compiler.execute(
+                        data,
+                        context_value=request,
+                        debug=app.debug,
+                        error_formatter=custom_format_error,
+                    )
+                )
+                if compiled_result is not None:
+                    success, result = compiled_result
+                else:
+                    success, result = graphql_sync(
+                        schema,
+                        data,
+                        context_value=request,
+                        debug=app.debug,
+                        error_formatter=custom_format_error,
+                        introspection=introspection_cache.enabled,
+                        **tracing.graphql_options(execution_context_class),
+                    )
+        finally:
+            profiling.finish(profile, result)
+
+        status_code = resolve_status_code(success, result)
+
+        execution = g.pop("incremental_execution", None)
+        if execution is not None and execution.has_pending:
+            # El status se fija con el payload inicial; los errores de los
+            # siguientes van en cada parte
+            return Response(
+                stream_with_context(
+                    multipart_response_body(
+                        result, execution, custom_format_error, app.debug
+                    )
+                ),
+                status=status_code,
+                content_type=MULTIPART_CONTENT_TYPE,
+            )
+
+        response = jsonify(result)
+        response.status_code = status_code
+        retry_after = resolve_retry_after(result)
+        if retry_after is not None:
+            response.headers["Retry-After"] = str(retry_after)
+        return response
+
+    def error_response(e: CustomGraphQLExceptionHelper):
+        response = jsonify({"data": None, "errors": [e.to_dict()]})
+        response.status_code = e.status_code
+        retry_after = e.details.get("retryAfter")
+        if retry_after is not None:
+            response.headers["Retry-After"] = str(retry_after)
+        return response
+
+    def admitted_execution(data):
+        # Con el servidor saturado se rechaza al momento en vez de encolar
+        try:
+            admitted_at = admission_control.admit(
+                admission_control.is_priority(
+                    data, request.headers.get("Authorization", "")
+                )
+            )
+        except CustomGraphQLExceptionHelper as e:
+            return error_response(e)
+
+        try:
+            response = execute_operation(data)
+        except BaseException:
+            admission_control.release(admitted_at)
+            raise
+        if response.is_streamed:
+            # Los payloads de @defer/@stream se ejecutan al enviar la respuesta
+            response.call_on_close(lambda: admission_control.release(admitted_at))
+        else:
+            admission_control.release(admitted_at)
+        return response
+
     # Ejemplo función Flask con graphql_sync (suponiendo schema y custom_format_error definidos)
 
     @app.route("/graphql", methods=["POST"])
     def graphql_server():
         data = request.get_json()
         operation_name = data.get("operationName", "unnamed")
-        LoggerHelper.info(f"GraphQL operation: {operation_name}")
-
-        success, result = graphql_sync(
-            schema,
-            data,
-            context_value=request,
-            debug=app.debug,
-            error_formatter=custom_format_error,
-        )
+        LoggerHelper.info(f"GraphQL operation: {operation_name} ({g.request_id})")
+        root_span = tracing.current_span()
+        if root_span is not None:
+            root_span.set_attribute("graphql.operation.name", operation_name)
+
+        cached_response = introspection_cache.cached_response(data)
+        if cached_response is not None:
+            return cached_response
 
-        status_code = 200 if success else HTTPErrorCode.BAD_REQUEST.status_code
-
-        # Ajustar status_code según código de error en extensions.code
-        if "errors" in result:
-            for err in result["errors"]:
-                code = err.get("extensions", {}).get("code", "")
-                # Mapea el código string a enum si existe
-                for error_enum in HTTPErrorCode:
-                    if code == error_enum.code_name:
-                        status_code = error_enum.status_code
-                        break
-                # Si ya asignaste un código distinto de 200, no sigas buscando
-                if status_code != HTTPErrorCode.BAD_REQUEST.status_code:
-                    break
-
-        return jsonify(result), status_code
+        # Queries idénticas en curso comparten una sola ejecución (las
+        # respuestas multipart, perfiladas o trazadas son propias de cada una)
+        timeout = resolve_request_timeout(request.headers.get(REQUEST_TIMEOUT_HEADER))
+        coalescing_key = None
+        if not (
+            accepts_incremental_delivery(request.headers.get("Accept", ""))
+            or PROFILE_HEADER in request.headers
+            or tracing.is_sampled()
+        ):
+            coalescing_key = request_coalescing.key(
+                data, request.headers.get("Authorization", ""), timeout
+            )
+        if coalescing_key is None:
+            return admitted_execution(data)
+        try:
+            return request_coalescing.execute(
+                coalescing_key, lambda: admitted_execution(data), timeout
+            )
+        except CustomGraphQLExceptionHelper as e:
+            return error_response(e)
 
     return app
@@ -0,0 +1,37 @@
+import click
+from flask.cli import AppGroup
+
+from server.helpers.index_sync_helper import IndexSyncHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+
+indexes_cli = AppGroup("indexes", help="Índices de MongoDB declarados en MONGO_INDEXES")
+
+
+def _index_sync() -> IndexSyncHelper:
+    return IndexSyncHelper(MongoRegistryHelper(), report=click.echo)
+
+
+@indexes_cli.command("diff")
+def diff_indexes():
+    """Compara los índices declarados con los existentes sin modificar nada"""
+    in_sync = True
+    for collection_name, state in _index_sync().diff().items():
+        for name in state["in_sync"]:
+            click.echo(f"  {collection_name}.{name}: ok")
+        for spec in state["missing"]:
+            click.echo(f"+ {collection_name}.{spec['name']}: falta")
+        for name, differences in state["changed"].items():
+            click.echo(f"~ {collection_name}.{name}: {', '.join(differences)}")
+        for name in state["extra"]:
+            click.echo(f"- {collection_name}.{name}: no declarado")
+        in_sync = in_sync and not (state["missing"] or state["changed"])
+    if not in_sync:
+        raise SystemExit(1)
+
+
+@indexes_cli.command("sync")
+@click.option("--prune", is_flag=True, help="Elimina los índices no declarados")
+def sync_indexes(prune: bool):
+    """Construye los índices que faltan informando del progreso"""
+    if not _index_sync().sync(prune=prune):
+        raise SystemExit(1)
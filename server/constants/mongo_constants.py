@@ -0,0 +1,14 @@
+# server/constants/mongo_constants.py
+
+# Collation insensible a mayúsculas/minúsculas (strength 2 compara base + acentos).
+# Los índices y las consultas deben usar la misma collation para que Mongo
+# pueda resolver la consulta con el índice.
+CASE_INSENSITIVE_COLLATION = {"locale": "es", "strength": 2}
+
+# Proyección para ordenar y devolver la relevancia de una búsqueda $text
+TEXT_SCORE_FIELD = "score"
+TEXT_SCORE_META = {"$meta": "textScore"}
+
+# Respuesta de una réplica en memoria que no puede resolver la lectura: la
+# consulta se envía a MongoDB (None es un resultado válido de find_one)
+REPLICA_MISS = object()
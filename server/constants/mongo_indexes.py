@@ -0,0 +1,99 @@
+# server/constants/mongo_indexes.py
+
+# Índices declarados por colección. No se crean al arrancar: se comparan con
+# los existentes y se construyen con ``flask indexes sync`` en cada despliegue
+# (ver IndexSyncHelper). Cada entrada son los argumentos de IndexModel:
+# ``keys`` y las opciones (unique, expireAfterSeconds, collation, ...).
+#
+# Los índices con collation solo se usan si la consulta lleva la misma: ver
+# CASE_INSENSITIVE_COLLATION.
+from pymongo import ASCENDING, TEXT
+
+from server.constants.mongo_constants import CASE_INSENSITIVE_COLLATION
+
+MONGO_INDEXES = {
+    "users": [
+        {"name": "UQ_EMAIL_IDX", "keys": [("email", ASCENDING)], "unique": True},
+        # Búsqueda por prefijo insensible a mayúsculas y orderBy sin filtro.
+        # Todos los de orden terminan en _id: `users` lo añade como desempate
+        # y el índice tiene que cubrirlo para evitar el SORT en memoria
+        {
+            "name": "IDX_USERS_EMAIL_ID_CI",
+            "keys": [("email", ASCENDING), ("_id", ASCENDING)],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        {
+            "name": "IDX_USERS_NAME_ID_CI",
+            "keys": [("name", ASCENDING), ("_id", ASCENDING)],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        # Compuestos para filter/orderBy de `users` (regla ESR: igualdad,
+        # orden, rango), con la misma collation con la que se consulta.
+        # Las combinaciones que no cubren (isAdmin=false, o un rango sobre
+        # otro campo que el de orden) se ordenan en memoria: ver
+        # UserResolver._allows_blocking_sort
+        {
+            "name": "IDX_USERS_CREATED_AT_ID",
+            "keys": [("created_at", ASCENDING), ("_id", ASCENDING)],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        {
+            "name": "IDX_USERS_ADMIN_CREATED_AT_ID",
+            "keys": [
+                ("isAdmin", ASCENDING),
+                ("created_at", ASCENDING),
+                ("_id", ASCENDING),
+            ],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        {
+            "name": "IDX_USERS_ADMIN_EMAIL_ID",
+            "keys": [("isAdmin", ASCENDING), ("email", ASCENDING), ("_id", ASCENDING)],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        {
+            "name": "IDX_USERS_ADMIN_NAME_ID",
+            "keys": [("isAdmin", ASCENDING), ("name", ASCENDING), ("_id", ASCENDING)],
+            "collation": CASE_INSENSITIVE_COLLATION,
+        },
+        # Búsqueda de texto libre; sin stemming porque son nombres y correos
+        {
+            "name": "IDX_USERS_TEXT",
+            "keys": [("name", TEXT), ("lastname", TEXT), ("email", TEXT)],
+            "default_language": "none",
+            "weights": {"name": 3, "lastname": 2, "email": 1},
+        },
+    ],
+    "revoked_tokens": [
+        # Los documentos se borran al expirar el token revocado
+        {
+            "name": "expires_at_ttl_idx",
+            "keys": [("expires_at", ASCENDING)],
+            "expireAfterSeconds": 0,
+        },
+        # Sincronización incremental del filtro de Bloom
+        {
+            "name": "IDX_REVOKED_TOKENS_CREATED_AT",
+            "keys": [("created_at", ASCENDING)],
+        },
+    ],
+    "rate_limits": [
+        # Buckets de RATE_LIMIT_BACKEND=mongo
+        {
+            "name": "expires_at_ttl_idx",
+            "keys": [("expires_at", ASCENDING)],
+            "expireAfterSeconds": 0,
+        },
+    ],
+}
+
+# Pool propio de la construcción de índices: sin socket timeout, porque
+# createIndexes no responde hasta que termina la construcción
+INDEX_BUILD_POOL = {
+    "allowed_collections": list(MONGO_INDEXES),
+    "max_pool_size": 2,
+    "min_pool_size": 0,
+    "connect_timeout_ms": 5000,
+    "socket_timeout_ms": 0,
+    "read_preference": "primary",
+}
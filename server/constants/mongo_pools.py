@@ -0,0 +1,59 @@
+# server/constants/mongo_pools.py
+
+# Pools de MongoDB con nombre. Cada uno tiene su propio MongoClient, de modo
+# que una carga lenta (p. ej. agregaciones de reporting) no puede agotar las
+# conexiones de las lecturas críticas de autenticación.
+#
+# Cualquier valor se puede sobrescribir por entorno con
+# MONGO_POOL_<NOMBRE>_<OPCIÓN>, p. ej. MONGO_POOL_REPORTING_MAX_POOL_SIZE=10.
+#
+# ``warm_up: False`` excluye el pool del precalentamiento al arrancar: se crea
+# en su primer uso, si llega a usarse.
+MONGO_POOLS = {
+    # CRUD general de los resolvers
+    "default": {
+        "allowed_collections": ["users"],
+        "max_pool_size": 50,
+        "connect_timeout_ms": 5000,
+        "socket_timeout_ms": 30000,
+        "read_preference": "primary",
+    },
+    # Lecturas cortas y sensibles a latencia: require_token, login, refresh
+    "auth": {
+        "allowed_collections": ["users", "rate_limits", "revoked_tokens"],
+        "max_pool_size": 20,
+        "connect_timeout_ms": 2000,
+        "socket_timeout_ms": 5000,
+        "read_preference": "primary",
+    },
+    # Conteos y agregaciones; toleran datos ligeramente desfasados
+    "reporting": {
+        "allowed_collections": ["users"],
+        "max_pool_size": 5,
+        "min_pool_size": 1,
+        "connect_timeout_ms": 5000,
+        "socket_timeout_ms": 60000,
+        "read_preference": "secondaryPreferred",
+    },
+    # Carga y change stream de la réplica en memoria de users (opcional, ver
+    # UsersReplicaHelper); el stream ocupa una conexión de forma permanente.
+    # Lo crea la réplica al arrancar solo si USERS_REPLICA_ENABLED
+    "replica": {
+        "warm_up": False,
+        "allowed_collections": ["users", "replica_state"],
+        "max_pool_size": 2,
+        "min_pool_size": 0,
+        "connect_timeout_ms": 5000,
+        "socket_timeout_ms": 60000,
+        "read_preference": "primary",
+    },
+}
+
+# Opciones de entorno admitidas y su conversión de tipo
+MONGO_POOL_ENV_OPTIONS = {
+    "max_pool_size": int,
+    "min_pool_size": int,
+    "connect_timeout_ms": int,
+    "socket_timeout_ms": int,
+    "read_preference": str,
+}
@@ -0,0 +1,59 @@
+from functools import wraps
+from typing import Optional, Sequence
+
+from flask import g, request
+from graphql import GraphQLResolveInfo
+
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.rate_limiter_helper import RateLimiterHelper
+from server.utils.auth_utils import verify_token
+from server.utils.request_utils import get_client_ip
+
+
+def _current_user_id() -> Optional[str]:
+    user = g.get("current_user")
+    if user:
+        return str(user["_id"])
+
+    auth_header = request.headers.get("Authorization", "")
+    token = auth_header.replace("Bearer ", "").strip()
+    if not token:
+        return None
+    try:
+        return verify_token(token).get("id")
+    except CustomGraphQLExceptionHelper:
+        return None
+
+
+def rate_limit(
+    limit: int, period: float, key_by: Sequence[str] = ("ip", "user", "operation")
+):
+    """
+    Limita las llamadas a un resolver a ``limit`` por ``period`` segundos
+
+    Args:
+        limit: Peticiones permitidas por periodo (también el tamaño de ráfaga)
+        period: Periodo en segundos
+        key_by: Componentes de la clave del bucket: "ip", "user", "operation"
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            info = next(arg for arg in args if isinstance(arg, GraphQLResolveInfo))
+            operation = info.field_name
+
+            parts = []
+            if "operation" in key_by:
+                parts.append(operation)
+            if "ip" in key_by:
+                parts.append(get_client_ip())
+            if "user" in key_by:
+                parts.append(_current_user_id() or "anonymous")
+
+            RateLimiterHelper().hit(":".join(parts), limit, period, operation)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -3,10 +3,11 @@ from flask import g, request
 from server.enums.http_error_code_enum import HTTPErrorCode
 from server.utils.auth_utils import verify_token
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
-from server.helpers.mongo_helper import MongoHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
 from bson import ObjectId
 
-mongo = MongoHelper(allowed_collections=["users"])
+# Pool dedicado: esta consulta corre en cada petición autenticada
+mongo = MongoRegistryHelper().get("auth")
 
 
 def require_token(func):
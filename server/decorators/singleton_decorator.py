@@ -6,4 +6,4 @@ def singleton(cls):
             instances[cls] = cls(*args, **kwargs)
         return instances[cls]
 
-    return getinstance
\ No newline at end of file
+    return getinstance
@@ -8,8 +8,10 @@ class HTTPErrorCode(Enum):
     NOT_FOUND = (404, "NOT_FOUND")
     METHOD_NOT_ALLOWED = (405, "METHOD_NOT_ALLOWED")
     CONFLICT = (409, "CONFLICT")
+    TOO_MANY_REQUESTS = (429, "TOO_MANY_REQUESTS")
     INTERNAL_SERVER_ERROR = (500, "INTERNAL_SERVER_ERROR")
     SERVICE_UNAVAILABLE = (503, "SERVICE_UNAVAILABLE")
+    GATEWAY_TIMEOUT = (504, "GATEWAY_TIMEOUT")
 
     def __init__(self, status_code, code_name):
         self.status_code = status_code
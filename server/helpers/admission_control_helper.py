@@ -0,0 +1,189 @@
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from server.decorators.singleton_decorator import singleton
+from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.utils.auth_utils import verify_token
+
+# Reducción multiplicativa del límite cuando la latencia supera el objetivo
+BACKOFF_RATIO = 0.9
+COMMENT_PATTERN = re.compile(r"#[^\n]*")
+FIRST_OPERATION_PATTERN = re.compile(r"\s*(?:\{|query\b|mutation\b|subscription\b)")
+
+
+def _is_mutation(data: Dict[str, Any]) -> bool:
+    """Tipo de la operación a ejecutar sin parsear el documento completo"""
+    query = data.get("query")
+    if not isinstance(query, str):
+        return False
+    query = COMMENT_PATTERN.sub("", query)
+    operation_name = data.get("operationName")
+    if operation_name:
+        return (
+            re.search(rf"\bmutation\s+{re.escape(operation_name)}\b", query) is not None
+        )
+    match = FIRST_OPERATION_PATTERN.match(query)
+    return match is not None and match.group().strip() == "mutation"
+
+
+@singleton
+class AdmissionControlHelper:
+    """
+    Control de admisión de /graphql: como mucho ``limit`` operaciones en
+    ejecución a la vez y una cola corta de espera; lo que no entra se rechaza
+    al momento con SERVICE_UNAVAILABLE y Retry-After en lugar de acumular
+    peticiones hasta bloquear todos los hilos del worker.
+
+    Con ADMISSION_ADAPTIVE el límite se ajusta por AIMD: sube de forma
+    aditiva mientras la latencia está por debajo de
+    ADMISSION_TARGET_LATENCY_MS y el límite se está usando, y baja de forma
+    multiplicativa (como mucho una vez por ventana) cuando la supera.
+
+    Las mutaciones y las peticiones autenticadas tienen prioridad: las
+    consultas anónimas no usan la fracción reservada del límite
+    (ADMISSION_RESERVED_RATIO), disponen de la mitad de la cola y no
+    adelantan a las prioritarias que esperan
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+        self.adaptive = os.getenv("ADMISSION_ADAPTIVE", "true").lower() == "true"
+        self.min_limit = int(os.getenv("ADMISSION_MIN_LIMIT", "4"))
+        self.max_limit = int(os.getenv("ADMISSION_MAX_LIMIT", "128"))
+        self.queue_size = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+        self.queue_timeout = (
+            float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "100")) / 1000
+        )
+        self.target_latency = (
+            float(os.getenv("ADMISSION_TARGET_LATENCY_MS", "500")) / 1000
+        )
+        self.reserved_ratio = float(os.getenv("ADMISSION_RESERVED_RATIO", "0.25"))
+        self.retry_after = int(os.getenv("ADMISSION_RETRY_AFTER_S", "1"))
+
+        self._limit = float(
+            min(
+                self.max_limit,
+                max(self.min_limit, int(os.getenv("ADMISSION_LIMIT", "32"))),
+            )
+        )
+        self.in_flight = 0
+        self._waiting = {True: 0, False: 0}
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+        self._stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_priority": 0,
+            "rejected_anonymous": 0,
+        }
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized "
+            f"(admission control {'enabled' if self.enabled else 'disabled'})"
+        )
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def is_priority(self, data: Dict[str, Any], authorization: str) -> bool:
+        """Mutaciones y peticiones con un access token válido"""
+        if _is_mutation(data):
+            return True
+        token = authorization.replace("Bearer ", "").strip()
+        if not token:
+            return False
+        try:
+            verify_token(token)
+        except CustomGraphQLExceptionHelper:
+            return False
+        return True
+
+    def _can_enter(self, priority: bool) -> bool:
+        limit = self.limit
+        if priority:
+            return self.in_flight < limit
+        reserved = math.ceil(limit * self.reserved_ratio)
+        return self._waiting[True] == 0 and self.in_flight < max(1, limit - reserved)
+
+    def admit(self, priority: bool) -> Optional[float]:
+        """
+        Reserva un hueco para la operación (esperando como mucho
+        ADMISSION_QUEUE_TIMEOUT_MS en la cola)
+
+        Returns:
+            Instante de admisión para release(); None si está desactivado
+
+        Raises:
+            CustomGraphQLExceptionHelper: SERVICE_UNAVAILABLE con
+                ``retryAfter`` si no hay hueco
+        """
+        if not self.enabled:
+            return None
+        with self._condition:
+            if not self._can_enter(priority):
+                queue_size = self.queue_size if priority else self.queue_size // 2
+                if self._waiting[priority] >= queue_size:
+                    self._reject(priority)
+                self._waiting[priority] += 1
+                self._stats["queued"] += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while not self._can_enter(priority):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject(priority)
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting[priority] -= 1
+            self.in_flight += 1
+            self._stats["admitted"] += 1
+        return time.monotonic()
+
+    def _reject(self, priority: bool) -> None:
+        self._stats["rejected_priority" if priority else "rejected_anonymous"] += 1
+        raise CustomGraphQLExceptionHelper(
+            "Servidor saturado, inténtalo más tarde",
+            HTTPErrorCode.SERVICE_UNAVAILABLE,
+            details={"retryAfter": self.retry_after},
+        )
+
+    def release(self, admitted_at: Optional[float]) -> None:
+        """Libera el hueco y usa la duración de la operación para ajustar el límite"""
+        if admitted_at is None:
+            return
+        latency = time.monotonic() - admitted_at
+        with self._condition:
+            self.in_flight -= 1
+            if self.adaptive:
+                self._adapt(latency)
+            # Todos comprueban de nuevo: los prioritarios pasan primero
+            self._condition.notify_all()
+
+    def _adapt(self, latency: float) -> None:
+        if latency > self.target_latency:
+            now = time.monotonic()
+            # Una sola reducción por ventana: las operaciones que ya estaban
+            # en curso también llegarán lentas
+            if now - self._last_decrease >= self.target_latency:
+                self._limit = max(self.min_limit, self._limit * BACKOFF_RATIO)
+                self._last_decrease = now
+        elif (self.in_flight + 1) * 2 >= self._limit:
+            # Solo crece si se está usando: +1 por cada ``limit`` operaciones
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "enabled": self.enabled,
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "waiting_priority": self._waiting[True],
+                "waiting_anonymous": self._waiting[False],
+                **self._stats,
+            }
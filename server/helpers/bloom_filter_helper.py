@@ -0,0 +1,55 @@
+import hashlib
+import math
+import threading
+from typing import Iterable, Iterator
+
+
+class BloomFilterHelper:
+    """
+    Filtro de Bloom en memoria (thread-safe). ``in`` nunca da falsos
+    negativos: si responde False el elemento seguro que no se añadió; si
+    responde True hay que confirmarlo en el origen (falso positivo posible)
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Elementos esperados; por encima crece la tasa de error
+            error_rate: Probabilidad de falso positivo con ``capacity`` elementos
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> Iterator[int]:
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones a partir de un digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        positions = list(self._positions(item))
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        # Lectura sin lock: los bits solo pasan de 0 a 1
+        bits = self._bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
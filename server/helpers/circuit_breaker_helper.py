@@ -0,0 +1,104 @@
+import math
+import threading
+import time
+from typing import Any, Dict
+
+from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreakerHelper:
+    """
+    Circuit breaker (thread-safe) para una dependencia externa.
+
+    Tras ``failure_threshold`` fallos consecutivos pasa a ``open`` y rechaza
+    las llamadas sin intentarlas durante ``recovery_timeout`` segundos; luego
+    deja pasar una llamada de prueba (``half_open``) que lo cierra si va bien
+    o lo vuelve a abrir si falla
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, recovery_timeout: float = 10.0
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.rejected_calls = 0
+        self.times_opened = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """
+        Raises:
+            CustomGraphQLExceptionHelper: SERVICE_UNAVAILABLE si el circuito
+                está abierto (con ``retryAfter`` en los detalles)
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            retry_after = self._opened_at + self.recovery_timeout - time.monotonic()
+            if self.state == OPEN and retry_after <= 0:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected_calls += 1
+
+        raise CustomGraphQLExceptionHelper(
+            "Servicio no disponible temporalmente, inténtalo más tarde",
+            HTTPErrorCode.SERVICE_UNAVAILABLE,
+            details={
+                "dependency": self.name,
+                "retryAfter": max(1, math.ceil(retry_after)),
+            },
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != CLOSED:
+                LoggerHelper.info(f"Circuito '{self.name}' cerrado")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """
+        Libera la llamada de prueba sin resultado (p. ej. la operación se
+        abandonó antes de terminar): la siguiente llamada hará de prueba
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED
+                and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+                LoggerHelper.error(
+                    f"Circuito '{self.name}' abierto tras "
+                    f"{self.consecutive_failures} fallos consecutivos"
+                )
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "rejected_calls": self.rejected_calls,
+                "times_opened": self.times_opened,
+            }
@@ -0,0 +1,139 @@
+import gzip
+import os
+import zlib
+from typing import Dict, Optional
+
+from flask import Flask, Response, g, request
+
+from server.decorators.singleton_decorator import singleton
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.ttl_cache_helper import TTLCacheHelper
+
+# Dependencias opcionales: si no están instaladas solo se ofrece gzip
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depende del entorno
+    zstandard = None
+
+
+@singleton
+class CompressionHelper:
+    """
+    Comprime las respuestas según Accept-Encoding (zstd, br o gzip).
+
+    Las respuestas dinámicas usan niveles moderados (CPU vs bytes); las que
+    una vista marca como estáticas con ``g.compression_cache_key`` se
+    comprimen una sola vez al nivel máximo y se sirven desde caché
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self._initialized = False
+        self.min_size = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+        self.levels = {
+            "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", "5")),
+            "br": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+            "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+        }
+        self.static_levels = {"gzip": 9, "br": 11, "zstd": 19}
+        # Preferencia del servidor ante empate de q-values
+        self.encodings = [
+            encoding
+            for encoding, available in (
+                ("zstd", zstandard is not None),
+                ("br", brotli is not None),
+                ("gzip", True),
+            )
+            if available
+        ]
+        self._static_cache = TTLCacheHelper(float("inf"), max_entries=64)
+
+    def init_app(self, app: Flask):
+        if self._initialized:
+            return
+
+        self.app = app
+        app.after_request(self._compress_response)
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized ({', '.join(self.encodings)})"
+        )
+        self._initialized = True
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Elige la codificación soportada con mayor q-value aceptada por el cliente"""
+        accepted: Dict[str, float] = {}
+        for part in accept_encoding.lower().split(","):
+            name, _, params = part.strip().partition(";")
+            quality = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    quality = float(params[2:])
+                except ValueError:
+                    quality = 0.0
+            if name:
+                accepted[name] = quality
+
+        best, best_quality = None, 0.0
+        for encoding in self.encodings:
+            quality = accepted.get(encoding, accepted.get("*", 0.0))
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(
+        self, data: bytes, encoding: str, level: Optional[int] = None
+    ) -> bytes:
+        level = self.levels[encoding] if level is None else level
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=level).compress(data)
+        if encoding == "br":
+            return brotli.compress(data, quality=level)
+        return gzip.compress(data, compresslevel=level, mtime=0)
+
+    def precompress(self, cache_key: str, data: bytes) -> None:
+        """Llena la caché estática de ``cache_key`` en todas las codificaciones"""
+        checksum = zlib.crc32(data)
+        for encoding in self.encodings:
+            self._static_cache.get_or_set(
+                (cache_key, encoding, checksum),
+                lambda: self.compress(data, encoding, self.static_levels[encoding]),
+            )
+
+    def _compress_response(self, response: Response) -> Response:
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = self.negotiate(request.headers.get("Accept-Encoding", ""))
+        if not encoding:
+            return response
+
+        cache_key = g.get("compression_cache_key")
+        if cache_key:
+            # El crc32 invalida la entrada si el contenido "estático" cambia
+            compressed = self._static_cache.get_or_set(
+                (cache_key, encoding, zlib.crc32(data)),
+                lambda: self.compress(data, encoding, self.static_levels[encoding]),
+            )
+        else:
+            compressed = self.compress(data, encoding)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
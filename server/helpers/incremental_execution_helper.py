@@ -0,0 +1,321 @@
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from flask import g
+from graphql import (
+    FieldNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLObjectType,
+    GraphQLOutputType,
+    GraphQLResolveInfo,
+    InlineFragmentNode,
+    OperationDefinitionNode,
+    OperationType,
+    SelectionSetNode,
+    located_error,
+)
+from graphql.execution import ExecutionContext
+from graphql.execution.collect_fields import (
+    does_fragment_condition_match,
+    get_field_entry_key,
+    should_include_node,
+)
+from graphql.execution.values import get_directive_values
+from graphql.pyutils import Path, is_iterable
+
+FieldMap = Dict[str, List[FieldNode]]
+DeferredSelections = List[Tuple[Optional[str], SelectionSetNode]]
+
+
+class _DeferredFragment:
+    def __init__(self, label, parent_type, source, path, selection_set):
+        self.label = label
+        self.parent_type = parent_type
+        self.source = source
+        self.path = path
+        self.selection_set = selection_set
+
+
+class _StreamedList:
+    def __init__(self, label, path, iterator, index, item_type, field_nodes, info):
+        self.label = label
+        self.path = path
+        self.iterator = iterator
+        self.index = index
+        self.item_type = item_type
+        self.field_nodes = field_nodes
+        self.info = info
+
+
+class IncrementalExecutionContext(ExecutionContext):
+    """
+    ExecutionContext con soporte de ``@defer`` y ``@stream`` (graphql-core 3.2
+    no los implementa). La ejecución normal devuelve el payload inicial sin
+    los fragmentos diferidos y con solo ``initialCount`` elementos de cada
+    lista en stream; el resto se produce después con ``incremental_results``.
+
+    Solo se aplica a queries: en mutaciones las directivas se ignoran. La
+    instancia de la petición queda en ``g.incremental_execution``
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.incremental = self.operation.operation == OperationType.QUERY
+        self._defer_directive = self.schema.get_directive("defer")
+        self._stream_directive = self.schema.get_directive("stream")
+        self._pending: Deque[Union[_DeferredFragment, _StreamedList]] = deque()
+        self._deferred_cache: Dict[Tuple, Tuple[FieldMap, DeferredSelections]] = {}
+        g.incremental_execution = self
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def execute_operation(
+        self, operation: OperationDefinitionNode, root_value: Any
+    ) -> Any:
+        if not self.incremental:
+            return super().execute_operation(operation, root_value)
+
+        root_type = self.schema.get_root_type(operation.operation)
+        fields, deferred = self._collect_fields(root_type, [operation.selection_set])
+        self._defer(deferred, root_type, root_value, None)
+        return self.execute_fields(root_type, root_value, None, fields)
+
+    def collect_subfields(
+        self, return_type: GraphQLObjectType, field_nodes: List[FieldNode]
+    ) -> FieldMap:
+        if not self.incremental:
+            return super().collect_subfields(return_type, field_nodes)
+        return self._collect_subfields(return_type, field_nodes)[0]
+
+    def complete_object_value(
+        self,
+        return_type: GraphQLObjectType,
+        field_nodes: List[FieldNode],
+        info: GraphQLResolveInfo,
+        path: Path,
+        result: Any,
+    ) -> Any:
+        completed = super().complete_object_value(
+            return_type, field_nodes, info, path, result
+        )
+        if self.incremental:
+            deferred = self._collect_subfields(return_type, field_nodes)[1]
+            self._defer(deferred, return_type, result, path)
+        return completed
+
+    def complete_list_value(
+        self,
+        return_type: Any,
+        field_nodes: List[FieldNode],
+        info: GraphQLResolveInfo,
+        path: Path,
+        result: Any,
+    ) -> Any:
+        stream = self._directive_args(self._stream_directive, field_nodes[0])
+        if stream is None or not is_iterable(result):
+            return super().complete_list_value(
+                return_type, field_nodes, info, path, result
+            )
+
+        initial_count = stream["initialCount"]
+        if initial_count is None or initial_count < 0:
+            raise GraphQLError(
+                "initialCount de @stream debe ser un entero no negativo", field_nodes
+            )
+
+        # Solo se consumen initialCount elementos; el resto sigue en el iterador
+        # (p. ej. el cursor de MongoDB) hasta enviar los payloads siguientes
+        iterator = iter(result)
+        initial = list(islice(iterator, initial_count))
+        completed = super().complete_list_value(
+            return_type, field_nodes, info, path, initial
+        )
+        self._pending.append(
+            _StreamedList(
+                stream.get("label"),
+                path,
+                iterator,
+                len(initial),
+                return_type.of_type,
+                field_nodes,
+                info,
+            )
+        )
+        return completed
+
+    def incremental_results(
+        self, batch_size: int
+    ) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Ejecuta el trabajo pendiente en orden de llegada. Cada elemento es una
+        entrada de ``incremental`` (``data`` o ``items``, ``path``, ``label`` y
+        ``errors`` como GraphQLError) o None cuando un stream se agota sin
+        elementos nuevos. Las listas en stream avanzan de ``batch_size`` en
+        ``batch_size`` elementos, alternándose con el resto del trabajo
+        """
+        while self._pending:
+            record = self._pending.popleft()
+            self.errors = []
+            if isinstance(record, _DeferredFragment):
+                entry = self._execute_deferred(record)
+            else:
+                entry = self._next_stream_items(record, batch_size)
+            if entry is not None:
+                if record.label is not None:
+                    entry["label"] = record.label
+                if self.errors:
+                    entry["errors"] = self.errors
+            yield entry
+
+    def _execute_deferred(self, record: _DeferredFragment) -> Dict[str, Any]:
+        fields, deferred = self._collect_fields(
+            record.parent_type, [record.selection_set]
+        )
+        self._defer(deferred, record.parent_type, record.source, record.path)
+        try:
+            data = self.execute_fields(
+                record.parent_type, record.source, record.path, fields
+            )
+        except GraphQLError as error:
+            self.errors.append(error)
+            data = None
+        return {"data": data, "path": record.path.as_list() if record.path else []}
+
+    def _next_stream_items(
+        self, record: _StreamedList, batch_size: int
+    ) -> Optional[Dict[str, Any]]:
+        start = record.index
+        items = []
+        while len(items) < batch_size:
+            item_path = record.path.add_key(record.index, None)
+            try:
+                item = next(record.iterator)
+            except StopIteration:
+                break
+            except Exception as raw_error:
+                # Fallo del origen (p. ej. el cursor): se cierra el stream
+                self.errors.append(
+                    located_error(raw_error, record.field_nodes, item_path.as_list())
+                )
+                return {"items": items or None, "path": self._item_path(record, start)}
+
+            try:
+                items.append(
+                    self.complete_value(
+                        record.item_type,
+                        record.field_nodes,
+                        record.info,
+                        item_path,
+                        item,
+                    )
+                )
+            except Exception as raw_error:
+                error = located_error(
+                    raw_error, record.field_nodes, item_path.as_list()
+                )
+                try:
+                    self.handle_field_error(error, record.item_type)
+                except GraphQLError:
+                    # Elemento non-null con error: el stream no puede continuar
+                    return {"items": None, "path": self._item_path(record, start)}
+                items.append(None)
+            record.index += 1
+        else:
+            self._pending.append(record)
+
+        if not items:
+            return None
+        return {"items": items, "path": self._item_path(record, start)}
+
+    @staticmethod
+    def _item_path(record: _StreamedList, index: int) -> List[Union[str, int]]:
+        return record.path.add_key(index, None).as_list()
+
+    def _defer(
+        self,
+        deferred: DeferredSelections,
+        parent_type: GraphQLObjectType,
+        source: Any,
+        path: Optional[Path],
+    ) -> None:
+        for label, selection_set in deferred:
+            self._pending.append(
+                _DeferredFragment(label, parent_type, source, path, selection_set)
+            )
+
+    def _collect_subfields(
+        self, return_type: GraphQLObjectType, field_nodes: List[FieldNode]
+    ) -> Tuple[FieldMap, DeferredSelections]:
+        # Misma clave que _subfields_cache de graphql-core
+        key = (return_type, *map(id, field_nodes))
+        collected = self._deferred_cache.get(key)
+        if collected is None:
+            collected = self._collect_fields(
+                return_type,
+                [node.selection_set for node in field_nodes if node.selection_set],
+            )
+            self._deferred_cache[key] = collected
+        return collected
+
+    def _collect_fields(
+        self, runtime_type: GraphQLObjectType, selection_sets: List[SelectionSetNode]
+    ) -> Tuple[FieldMap, DeferredSelections]:
+        """
+        Variante de collect_fields de graphql-core que deja fuera los
+        fragmentos con ``@defer`` y los devuelve aparte
+        """
+        fields: FieldMap = {}
+        deferred: DeferredSelections = []
+        visited_fragment_names = set()
+
+        def collect(selection_set: SelectionSetNode) -> None:
+            for selection in selection_set.selections:
+                if isinstance(selection, FieldNode):
+                    if should_include_node(self.variable_values, selection):
+                        key = get_field_entry_key(selection)
+                        fields.setdefault(key, []).append(selection)
+                    continue
+
+                if isinstance(selection, InlineFragmentNode):
+                    fragment = selection
+                    if not should_include_node(self.variable_values, selection):
+                        continue
+                elif isinstance(selection, FragmentSpreadNode):
+                    name = selection.name.value
+                    if name in visited_fragment_names or not should_include_node(
+                        self.variable_values, selection
+                    ):
+                        continue
+                    visited_fragment_names.add(name)
+                    fragment = self.fragments.get(name)
+                    if not fragment:
+                        continue
+                else:
+                    continue
+
+                if not does_fragment_condition_match(
+                    self.schema, fragment, runtime_type
+                ):
+                    continue
+                defer = self._directive_args(self._defer_directive, selection)
+                if defer is not None:
+                    deferred.append((defer.get("label"), fragment.selection_set))
+                else:
+                    collect(fragment.selection_set)
+
+        for selection_set in selection_sets:
+            collect(selection_set)
+        return fields, deferred
+
+    def _directive_args(self, directive, node) -> Optional[Dict[str, Any]]:
+        """Argumentos de ``directive`` en ``node`` si está activa (``if``)"""
+        if not self.incremental or directive is None:
+            return None
+        values = get_directive_values(directive, node, self.variable_values)
+        if not values or not values.get("if", True):
+            return None
+        return values
@@ -0,0 +1,206 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TypedDict
+
+from pymongo import TEXT, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from server.constants.mongo_indexes import INDEX_BUILD_POOL, MONGO_INDEXES
+from server.helpers.logger_helper import LoggerHelper
+
+INDEX_BUILD_POOL_NAME = "indexes"
+# Opciones que se comparan con las del índice existente y su valor por defecto
+COMPARED_OPTIONS = {
+    "unique": False,
+    "sparse": False,
+    "expireAfterSeconds": None,
+    "partialFilterExpression": None,
+}
+TEXT_OPTIONS = {"default_language": "english"}
+PROGRESS_INTERVAL_S = 2.0
+
+
+class IndexState(TypedDict):
+    """Estado de los índices de una colección (ver IndexSyncHelper.diff)"""
+
+    missing: List[Dict[str, Any]]
+    changed: Dict[str, List[str]]
+    extra: List[str]
+    in_sync: List[str]
+
+
+def _same_keys(spec: Dict[str, Any], existing: Dict[str, Any]) -> bool:
+    keys = spec["keys"]
+    if any(direction == TEXT for _, direction in keys):
+        # Los índices de texto se guardan como {_fts, _ftsx} más ``weights``
+        weights = spec.get("weights") or {}
+        return existing.get("weights") == {
+            field: weights.get(field, 1) for field, _ in keys
+        } and all(
+            existing.get(option, default) == spec.get(option, default)
+            for option, default in TEXT_OPTIONS.items()
+        )
+    return [(field, direction) for field, direction in existing["key"].items()] == [
+        (field, direction) for field, direction in keys
+    ]
+
+
+def _differences(spec: Dict[str, Any], existing: Dict[str, Any]) -> List[str]:
+    """Diferencias entre el índice declarado y el existente con el mismo nombre"""
+    differences = []
+    if not _same_keys(spec, existing):
+        differences.append("keys")
+    for option, default in COMPARED_OPTIONS.items():
+        if spec.get(option, default) != existing.get(option, default):
+            differences.append(option)
+    # El servidor completa la collation con todos sus valores por defecto
+    collation = spec.get("collation")
+    existing_collation = existing.get("collation")
+    if collation is None or existing_collation is None:
+        if collation is not existing_collation:
+            differences.append("collation")
+    elif any(existing_collation.get(k) != v for k, v in collation.items()):
+        differences.append("collation")
+    return differences
+
+
+class IndexSyncHelper:
+    """
+    Reconcilia los índices declarados en MONGO_INDEXES con los que existen
+    en MongoDB (list_indexes): construye los que faltan, informa de los que
+    tienen otras opciones y opcionalmente elimina los no declarados.
+
+    Pensado para ejecutarse en el despliegue (``flask indexes sync``) y no en
+    cada worker. Los índices que faltan en una colección se crean con un solo
+    createIndexes; desde MongoDB 4.2 la construcción no bloquea la colección
+    salvo brevemente al principio y al final, y mientras dura se informa del
+    progreso que publica el servidor en $currentOp
+    """
+
+    def __init__(
+        self,
+        mongo_registry,
+        index_specs: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        report: Callable[[str], None] = LoggerHelper.info,
+    ):
+        try:
+            mongo_registry.register(INDEX_BUILD_POOL_NAME, **INDEX_BUILD_POOL)
+        except ValueError:
+            pass  # ya creado por otra instancia en este proceso
+        self.mongo_helper = mongo_registry.get(INDEX_BUILD_POOL_NAME)
+        self.index_specs: Dict[str, List[Dict[str, Any]]] = index_specs or MONGO_INDEXES
+        self.report = report
+
+    def diff(self) -> Dict[str, IndexState]:
+        """
+        Estado de cada colección declarada
+
+        Returns:
+            Por colección: ``missing`` (specs), ``changed`` (nombre ->
+            opciones distintas), ``extra`` (nombres no declarados) y
+            ``in_sync`` (nombres)
+        """
+        result: Dict[str, IndexState] = {}
+        for collection_name, specs in self.index_specs.items():
+            existing = {
+                index["name"]: index
+                for index in self.mongo_helper.get_collection(
+                    collection_name
+                ).list_indexes()
+            }
+            declared = {spec["name"] for spec in specs}
+            state = IndexState(missing=[], changed={}, extra=[], in_sync=[])
+            for spec in specs:
+                current = existing.get(spec["name"])
+                if current is None:
+                    state["missing"].append(spec)
+                    continue
+                differences = _differences(spec, current)
+                if differences:
+                    state["changed"][spec["name"]] = differences
+                else:
+                    state["in_sync"].append(spec["name"])
+            state["extra"] = [
+                name for name in existing if name != "_id_" and name not in declared
+            ]
+            result[collection_name] = state
+        return result
+
+    def sync(self, prune: bool = False) -> bool:
+        """
+        Construye los índices que faltan (y con ``prune`` elimina los no
+        declarados). Los índices con otras opciones no se tocan: recrearlos
+        deja la colección sin ellos mientras se construyen
+
+        Returns:
+            True si al terminar todos los índices declarados coinciden
+        """
+        ok = True
+        for collection_name, state in self.diff().items():
+            for name, differences in state["changed"].items():
+                ok = False
+                self.report(
+                    f"{collection_name}.{name}: distinto del declarado "
+                    f"({', '.join(differences)}); hay que recrearlo a mano"
+                )
+            if state["missing"]:
+                ok = self._build(collection_name, state["missing"]) and ok
+            if prune:
+                for name in state["extra"]:
+                    self.mongo_helper.get_collection(collection_name).drop_index(name)
+                    self.report(f"{collection_name}.{name}: eliminado")
+        return ok
+
+    def _build(self, collection_name: str, specs: List[Dict[str, Any]]) -> bool:
+        names = ", ".join(spec["name"] for spec in specs)
+        self.report(f"{collection_name}: construyendo {names}")
+        models = [
+            IndexModel(spec["keys"], **{k: v for k, v in spec.items() if k != "keys"})
+            for spec in specs
+        ]
+        errors: List[Exception] = []
+
+        def build():
+            try:
+                self.mongo_helper.create_indexes(collection_name, models)
+            except PyMongoError as e:
+                errors.append(e)
+
+        started = time.monotonic()
+        thread = threading.Thread(target=build, name=f"index-build-{collection_name}")
+        thread.start()
+        thread.join(PROGRESS_INTERVAL_S)
+        while thread.is_alive():
+            self._report_progress(collection_name, time.monotonic() - started)
+            thread.join(PROGRESS_INTERVAL_S)
+
+        elapsed = time.monotonic() - started
+        if errors:
+            self.report(f"{collection_name}: error construyendo {names}: {errors[0]}")
+            return False
+        self.report(f"{collection_name}: {names} construidos en {elapsed:.1f} s")
+        return True
+
+    def _report_progress(self, collection_name: str, elapsed: float) -> None:
+        namespace = f"{self.mongo_helper.dbname}.{collection_name}"
+        try:
+            operations = list(
+                self.mongo_helper.client.admin.aggregate(
+                    [
+                        {"$currentOp": {"allUsers": True, "idleConnections": False}},
+                        {"$match": {"ns": namespace, "progress": {"$exists": True}}},
+                    ]
+                )
+            )
+        except OperationFailure:
+            # Sin privilegio inprog: solo el tiempo transcurrido
+            operations = []
+        for operation in operations:
+            progress = operation["progress"]
+            self.report(
+                f"{collection_name}: {operation.get('msg', 'construyendo')} "
+                f"({progress.get('done', 0)}/{progress.get('total', '?')}, "
+                f"{elapsed:.0f} s)"
+            )
+        if not operations:
+            self.report(f"{collection_name}: construyendo ({elapsed:.0f} s)")
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, Optional
+
+from ariadne import graphql_sync
+from flask import Flask, Response, g
+from graphql import (
+    FieldNode,
+    GraphQLError,
+    GraphQLSchema,
+    OperationDefinitionNode,
+    get_introspection_query,
+    parse,
+    print_ast,
+)
+
+from server.decorators.singleton_decorator import singleton
+from server.helpers.compression_helper import CompressionHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.ttl_cache_helper import TTLCacheHelper
+
+INTROSPECTION_ROOT_FIELDS = {"__schema", "__type", "__typename"}
+# Filtro barato antes de parsear (no coincide con __typename)
+INTROSPECTION_FIELD_PATTERN = re.compile(r"__(schema|type)\b")
+
+
+@singleton
+class IntrospectionCacheHelper:
+    """
+    Respuestas de introspección precalculadas. El schema no cambia tras
+    make_executable_schema, así que el resultado de un documento que solo
+    consulta ``__schema``/``__type`` es siempre el mismo: se ejecuta una vez,
+    se guarda ya serializado y se sirve comprimido desde CompressionHelper.
+
+    GRAPHQL_INTROSPECTION=false desactiva la introspección por completo
+    """
+
+    def __init__(self):
+        self.app: Optional[Flask] = None
+        self.schema: Optional[GraphQLSchema] = None
+        self._initialized = False
+        self.enabled = os.getenv("GRAPHQL_INTROSPECTION", "true").lower() == "true"
+        # Texto exacto de la petición -> clave del documento normalizado
+        self._keys = TTLCacheHelper(float("inf"), max_entries=64)
+        # Clave -> cuerpo JSON ya serializado
+        self._bodies = TTLCacheHelper(float("inf"), max_entries=32)
+
+    def init_app(self, app: Flask, schema: GraphQLSchema):
+        if self._initialized:
+            return
+
+        self.app = app
+        self.schema = schema
+        if self.enabled:
+            # La consulta estándar y la variante con todas las opciones (la que
+            # envían GraphiQL y los generadores de código) quedan listas y
+            # comprimidas antes de la primera petición
+            for query in (
+                get_introspection_query(),
+                get_introspection_query(
+                    descriptions=True,
+                    specified_by_url=True,
+                    directive_is_repeatable=True,
+                    schema_description=True,
+                    input_value_deprecation=True,
+                ),
+            ):
+                key = self._cache_key({"query": query})
+                body = self._body(key, {"query": query})
+                if body is not None:
+                    CompressionHelper().precompress(self._compression_key(key), body)
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized "
+            f"(introspection {'enabled' if self.enabled else 'disabled'})"
+        )
+        self._initialized = True
+
+    def cached_response(self, data: Dict[str, Any]) -> Optional[Response]:
+        """
+        Respuesta precalculada si ``data`` es una petición de introspección
+        pura; None si la petición debe ejecutarse normalmente
+        """
+        if not self.enabled or not isinstance(data, dict):
+            return None
+        query = data.get("query")
+        if not isinstance(query, str) or not INTROSPECTION_FIELD_PATTERN.search(query):
+            return None
+
+        key = self._cache_key(data)
+        if key is None:
+            return None
+        body = self._body(key, data)
+        if body is None:
+            return None
+
+        g.compression_cache_key = self._compression_key(key)
+        return self.app.response_class(body, mimetype="application/json")
+
+    @staticmethod
+    def _compression_key(key: str) -> str:
+        return f"introspection:{key}"
+
+    def _cache_key(self, data: Dict[str, Any]) -> Optional[str]:
+        raw_key = (
+            data.get("query"),
+            data.get("operationName"),
+            json.dumps(data.get("variables") or {}, sort_keys=True),
+        )
+        key = self._keys.get(raw_key)
+        if key is None:
+            # Misma clave para documentos equivalentes (espacios, comentarios)
+            document = self._normalize(data["query"])
+            key = ""
+            if document is not None:
+                key = hashlib.sha256(
+                    "\0".join((document, *map(str, raw_key[1:]))).encode()
+                ).hexdigest()
+            self._keys.set(raw_key, key)
+        return key or None
+
+    @staticmethod
+    def _normalize(query: str) -> Optional[str]:
+        """Documento impreso de forma canónica, o None si no es introspección pura"""
+        try:
+            document = parse(query, no_location=True)
+        except GraphQLError:
+            return None
+
+        for definition in document.definitions:
+            if not isinstance(definition, OperationDefinitionNode):
+                continue
+            for selection in definition.selection_set.selections:
+                if (
+                    not isinstance(selection, FieldNode)
+                    or selection.name.value not in INTROSPECTION_ROOT_FIELDS
+                ):
+                    return None
+        return print_ast(document)
+
+    def _body(self, key: str, data: Dict[str, Any]) -> Optional[bytes]:
+        body = self._bodies.get(key)
+        if body is None:
+            success, result = graphql_sync(self.schema, data)
+            # Los errores se dejan a la ejecución normal, que los formatea
+            if not success or "errors" in result:
+                return None
+            body = self.app.json.dumps(result).encode()
+            self._bodies.set(key, body)
+        return body
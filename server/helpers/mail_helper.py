@@ -7,6 +7,7 @@ from typing import List, Optional
 from server.decorators.singleton_decorator import singleton
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
 from server.helpers.logger_helper import LoggerHelper
+from server.helpers.tracing_helper import SPAN_KIND_CLIENT, TracingHelper
 
 
 @singleton
@@ -15,6 +16,9 @@ class MailHelper:
         self.app: Optional[Flask] = None
         self.mail: Optional[Mail] = None
         self._initialized = False
+        # Envíos async lanzados que aún no han terminado
+        self._pending_sends = 0
+        self._pending_lock = threading.Lock()
 
     def init_app(self, app: Flask):
         if self._initialized:
@@ -72,8 +76,19 @@ class MailHelper:
                 self.app.logger.info(
                     f"[MailHelper] Enviando email async a: {recipients} - Asunto: {subject}"
                 )
-                thread = threading.Thread(target=self._send_async, args=(msg,))
-                thread.start()
+                # El hilo no hereda el contexto: el span del envío se cuelga
+                # explícitamente del activo
+                thread = threading.Thread(
+                    target=self._send_async,
+                    args=(msg, TracingHelper().current_span()),
+                )
+                with self._pending_lock:
+                    self._pending_sends += 1
+                try:
+                    thread.start()
+                except Exception:
+                    self._finish_pending_send()
+                    raise
                 return True
             else:
                 self.app.logger.info(
@@ -84,9 +99,15 @@ class MailHelper:
             self.app.logger.error(f"[MailHelper] Error al enviar correo (enviar): {e}")
             return False
 
-    def _send(self, msg) -> bool:
+    def _send(self, msg, parent_span=None) -> bool:
         try:
-            self.mail.send(msg)
+            with TracingHelper().span(
+                "mail.send",
+                {"mail.recipients": len(msg.recipients)},
+                SPAN_KIND_CLIENT,
+                parent_span,
+            ):
+                self.mail.send(msg)
             self.app.logger.info(
                 f"[MailHelper] Correo enviado correctamente a: {msg.recipients} - Asunto: {msg.subject}"
             )
@@ -95,6 +116,18 @@ class MailHelper:
             self.app.logger.error(f"[MailHelper] Error al enviar correo (send): {e}")
             return False
 
-    def _send_async(self, msg):
-        with self.app.app_context():
-            self._send(msg)
+    def _send_async(self, msg, parent_span=None):
+        try:
+            with self.app.app_context():
+                self._send(msg, parent_span)
+        finally:
+            self._finish_pending_send()
+
+    def _finish_pending_send(self):
+        with self._pending_lock:
+            self._pending_sends -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        """Correos async pendientes de enviar"""
+        return self._pending_sends
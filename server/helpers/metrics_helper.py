@@ -0,0 +1,48 @@
+import hmac
+import os
+from typing import Any, Callable, Dict
+
+from server.decorators.singleton_decorator import singleton
+from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.utils.admin_utils import is_admin
+
+
+@singleton
+class MetricsHelper:
+    """Registro de proveedores de métricas que se publican en /metrics"""
+
+    def __init__(self):
+        self._providers: Dict[str, Callable[[], Any]] = {}
+        # Las métricas exponen topología y carga: por defecto solo para
+        # administradores o para el scraper con METRICS_TOKEN
+        self.public = os.getenv("METRICS_PUBLIC", "false").lower() == "true"
+        self.token = os.getenv("METRICS_TOKEN", "")
+
+    def register(self, name: str, provider: Callable[[], Any]) -> None:
+        """Registra una función sin argumentos que devuelve métricas serializables"""
+        self._providers[name] = provider
+
+    def authorize(self, authorization: str) -> None:
+        """Lanza UNAUTHORIZED si la petición no puede leer /metrics"""
+        if self.public:
+            return
+        token = authorization.replace("Bearer ", "").strip()
+        if self.token and hmac.compare_digest(token, self.token):
+            return
+        if not is_admin(authorization):
+            raise CustomGraphQLExceptionHelper(
+                "Las métricas requieren un administrador o METRICS_TOKEN",
+                HTTPErrorCode.UNAUTHORIZED,
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        metrics = {}
+        for name, provider in self._providers.items():
+            try:
+                metrics[name] = provider()
+            except Exception as e:
+                LoggerHelper.error(f"Error obteniendo métricas de {name}: {e}")
+                metrics[name] = None
+        return metrics
@@ -0,0 +1,53 @@
+from typing import Any, Dict, Tuple
+
+from pymongo.monitoring import CommandListener
+
+from server.helpers.tracing_helper import SPAN_KIND_CLIENT, Span, TracingHelper
+
+
+class MongoCommandTracingHelper(CommandListener):
+    """
+    Listener de command monitoring que registra un span por cada comando
+    enviado a MongoDB dentro de una petición muestreada (ver TracingHelper).
+    pymongo llama a ``started`` en el hilo que ejecuta la operación, así que
+    el span cuelga del resolver que la lanzó. No incluye el cuerpo del
+    comando: puede contener datos personales
+    """
+
+    def __init__(self, pool_name: str, dbname: str):
+        self.pool_name = pool_name
+        self.dbname = dbname
+        self._spans: Dict[Tuple[int, Any], Span] = {}
+
+    def started(self, event) -> None:
+        tracing = TracingHelper()
+        if not tracing.is_sampled():
+            return
+        collection = event.command.get(event.command_name)
+        span = tracing.start_span(
+            f"mongodb.{event.command_name}",
+            {
+                "db.system.name": "mongodb",
+                "db.namespace": event.database_name,
+                "db.operation.name": event.command_name,
+                "db.collection.name": (
+                    collection if isinstance(collection, str) else None
+                ),
+                "db.mongodb.pool": self.pool_name,
+                "server.address": event.connection_id[0],
+                "server.port": event.connection_id[1],
+            },
+            SPAN_KIND_CLIENT,
+        )
+        self._spans[(event.request_id, event.connection_id)] = span
+
+    def succeeded(self, event) -> None:
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            TracingHelper().end_span(span)
+
+    def failed(self, event) -> None:
+        span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is not None:
+            span.set_error(event.failure.get("errmsg", "command failed"))
+            TracingHelper().end_span(span)
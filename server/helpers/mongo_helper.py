@@ -1,7 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 import os
-from typing import Optional, List, Dict, Any
-from pymongo import MongoClient
+import time
+from typing import Optional, Iterator, List, Dict, Any
+from pymongo import IndexModel, MongoClient, ReturnDocument
 from pymongo.errors import (
     DuplicateKeyError,
     PyMongoError,
@@ -10,6 +13,7 @@ from pymongo.errors import (
     ServerSelectionTimeoutError,
 )
 from pymongo.collection import Collection
+from pymongo.cursor import Cursor
 from pymongo.database import Database
 from pymongo.results import InsertOneResult, UpdateResult, DeleteResult
 
@@ -17,36 +21,72 @@ from server.constants.error_messages import (
     DEFAULT_DUPLICATE_MESSAGE,
     DUPLICATE_ERROR_MESSAGES,
 )
-from server.decorators.singleton_decorator import singleton
+from server.constants.mongo_constants import (
+    REPLICA_MISS,
+    TEXT_SCORE_FIELD,
+    TEXT_SCORE_META,
+)
 from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.circuit_breaker_helper import CircuitBreakerHelper
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
 from server.helpers.logger_helper import LoggerHelper
+from server.helpers.mongo_command_tracing_helper import MongoCommandTracingHelper
+from server.helpers.mongo_pool_metrics_helper import MongoPoolMetricsHelper
+from server.helpers.tracing_helper import TracingHelper
+from server.utils.deadline_utils import remaining_request_time
+
+
+def _collect_plan_stages(plan: Any):
+    """Recorre un plan de explain() y devuelve los nombres de todas sus etapas"""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _collect_plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _collect_plan_stages(value)
 
 
-@singleton
 class MongoHelper:
-    """Clase mejorada para manejo de MongoDB con conexión robusta y manejo avanzado de errores"""
+    """
+    Clase mejorada para manejo de MongoDB con conexión robusta y manejo avanzado de errores.
+    Cada instancia tiene su propio MongoClient y pool: obtenerlas desde
+    MongoRegistryHelper en lugar de instanciarlas directamente
+    """
 
     def __init__(
         self,
         uri: Optional[str] = None,
+        name: str = "default",
         allowed_collections: Optional[List[str]] = None,
         connect_timeout_ms: int = 5000,
         socket_timeout_ms: int = 30000,
         max_pool_size: int = 100,
+        min_pool_size: Optional[int] = None,
         retry_writes: bool = True,
+        read_preference: str = "primary",
+        explain_queries: Optional[bool] = None,
     ):
         """
         Inicializa una conexión a MongoDB con validación y manejo robusto de errores
 
         Args:
             uri: URI de conexión (opcional, usa MONGO_URI por defecto)
+            name: Nombre del pool (aparece en logs, métricas y appname)
             allowed_collections: Lista de colecciones permitidas
             connect_timeout_ms: Tiempo de espera para conexión (ms)
             socket_timeout_ms: Tiempo de espera para operaciones (ms)
             max_pool_size: Tamaño máximo del pool de conexiones
+            min_pool_size: Conexiones que se mantienen abiertas y que abre
+                warm_up() (usa MONGO_MIN_POOL_SIZE por defecto)
             retry_writes: Habilitar reintentos para operaciones de escritura
+            read_preference: Read preference del cliente (p. ej. "secondaryPreferred")
+            explain_queries: Verificar con explain() que las consultas de
+                find_many usan índices (usa MONGO_EXPLAIN_QUERIES por defecto).
+                Pensado para desarrollo y pruebas: añade un round-trip por consulta
         """
+        self.name = name
         self.dbname = os.getenv("MONGO_DB_NAME", "graphqlapp")
         self.uri = uri or os.getenv("MONGO_URI")
 
@@ -58,14 +98,38 @@ class MongoHelper:
         self.allowed_collections = (
             set(allowed_collections) if allowed_collections else None
         )
+        if explain_queries is None:
+            explain_queries = (
+                os.getenv("MONGO_EXPLAIN_QUERIES", "false").lower() == "true"
+            )
+        self.explain_queries = explain_queries
+        if min_pool_size is None:
+            min_pool_size = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+        self.min_pool_size = min(min_pool_size, max_pool_size)
+        self.pool_metrics = MongoPoolMetricsHelper(max_pool_size, self.min_pool_size)
+        # Tras varios fallos de conexión o timeouts seguidos las operaciones
+        # fallan de inmediato en lugar de esperar cada una su timeout
+        self.circuit_breaker = CircuitBreakerHelper(
+            f"mongo:{name}",
+            failure_threshold=int(os.getenv("MONGO_BREAKER_FAILURE_THRESHOLD", "5")),
+            recovery_timeout=float(os.getenv("MONGO_BREAKER_RECOVERY_S", "10")),
+        )
+        # Un timeout solo cuenta como fallo si la operación tenía al menos
+        # este margen: con menos lo agota el presupuesto que eligió el cliente
+        self.breaker_min_timeout = (
+            float(os.getenv("MONGO_BREAKER_MIN_TIMEOUT_MS", "1000")) / 1000
+        )
         self.client: Optional[MongoClient] = None
         self.db: Optional[Database] = None
+        # Réplicas en memoria por colección (ver set_read_replica)
+        self._read_replicas: Dict[str, Any] = {}
 
         self._connect(
             connect_timeout_ms=connect_timeout_ms,
             socket_timeout_ms=socket_timeout_ms,
             max_pool_size=max_pool_size,
             retry_writes=retry_writes,
+            read_preference=read_preference,
         )
         self._validate_connection()
 
@@ -75,8 +139,13 @@ class MongoHelper:
         socket_timeout_ms: int,
         max_pool_size: int,
         retry_writes: bool,
+        read_preference: str,
     ) -> None:
         """Establece la conexión con configuración robusta"""
+        event_listeners = [self.pool_metrics]
+        # El command monitoring tiene coste por comando: solo con trazas
+        if TracingHelper().enabled:
+            event_listeners.append(MongoCommandTracingHelper(self.name, self.dbname))
         try:
             self.client = MongoClient(
                 self.uri,
@@ -84,8 +153,11 @@ class MongoHelper:
                 socketTimeoutMS=socket_timeout_ms,
                 serverSelectionTimeoutMS=connect_timeout_ms,
                 maxPoolSize=max_pool_size,
+                minPoolSize=self.min_pool_size,
                 retryWrites=retry_writes,
-                appname=self.dbname,
+                readPreference=read_preference,
+                appname=f"{self.dbname}-{self.name}",
+                event_listeners=event_listeners,
             )
             self.db = self.client[self.dbname]
         except ConnectionFailure as e:
@@ -98,7 +170,9 @@ class MongoHelper:
         try:
             # Comando ligero para verificar conexión
             self.client.admin.command("ping")
-            LoggerHelper.success(f"Conexión exitosa a MongoDB - DB: {self.dbname}")
+            LoggerHelper.success(
+                f"Conexión exitosa a MongoDB - DB: {self.dbname} (pool: {self.name})"
+            )
         except ServerSelectionTimeoutError:
             raise ConnectionError("No se pudo conectar al servidor MongoDB (timeout)")
         except OperationFailure as e:
@@ -106,6 +180,42 @@ class MongoHelper:
         except Exception as e:
             raise RuntimeError(f"Error validando conexión: {str(e)}")
 
+    def ping(self) -> float:
+        """Ejecuta ``ping`` y devuelve la latencia del round-trip en milisegundos"""
+        started = time.perf_counter()
+        self.client.admin.command("ping")
+        return (time.perf_counter() - started) * 1000
+
+    def warm_up(self) -> int:
+        """
+        Abre ``min_pool_size`` conexiones ahora (TCP, TLS y autenticación) en
+        lugar de pagarlas en las primeras peticiones tras un despliegue
+
+        Returns:
+            Conexiones abiertas en el pool tras el calentamiento
+        """
+        if self.min_pool_size <= 0:
+            return self.pool_metrics.open_connections
+
+        # Pings concurrentes: cada uno retiene una conexión distinta del pool
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.min_pool_size) as executor:
+            list(executor.map(lambda _: self.ping(), range(self.min_pool_size)))
+
+        open_connections = self.pool_metrics.open_connections
+        LoggerHelper.info(
+            f"Pool de MongoDB '{self.name}' precalentado: {open_connections} conexiones "
+            f"en {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return open_connections
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Métricas del pool de conexiones (ver MongoPoolMetricsHelper)"""
+        return {
+            **self.pool_metrics.snapshot(),
+            "circuit": self.circuit_breaker.snapshot(),
+        }
+
     def _check_collection_allowed(self, collection_name: str) -> None:
         """Valida que la colección esté en la lista de permitidas"""
         if self.allowed_collections and collection_name not in self.allowed_collections:
@@ -114,6 +224,81 @@ class MongoHelper:
                 HTTPErrorCode.BAD_REQUEST,
             )
 
+    def _duplicate_error(
+        self, collection_name: str, error: DuplicateKeyError
+    ) -> CustomGraphQLExceptionHelper:
+        """Traduce un DuplicateKeyError al error CONFLICT de la colección"""
+        LoggerHelper.error(f"Documento duplicado: {str(error)}")
+        message = DUPLICATE_ERROR_MESSAGES.get(
+            collection_name, DEFAULT_DUPLICATE_MESSAGE
+        )
+        return CustomGraphQLExceptionHelper(
+            message,
+            code=HTTPErrorCode.CONFLICT,
+            details={"collection": collection_name},
+        )
+
+    @contextmanager
+    def _guard(self):
+        """
+        Pasa la operación por el circuit breaker del pool. Los fallos de
+        conexión y los timeouts (incluido el deadline de pymongo.timeout())
+        se traducen a 503/504 y cuentan como fallo, salvo los timeouts de una
+        petición a la que le quedaban menos de ``breaker_min_timeout``
+        segundos; el resto de errores de MongoDB indican que el servidor
+        respondió y se propagan sin cambios
+        """
+        self.circuit_breaker.before_call()
+        budget = remaining_request_time()
+        try:
+            yield
+        except PyMongoError as e:
+            if isinstance(e, ConnectionFailure) or e.timeout:
+                if (
+                    e.timeout
+                    and budget is not None
+                    and budget < self.breaker_min_timeout
+                ):
+                    # Presupuesto corto del cliente: no dice nada del servidor
+                    self.circuit_breaker.release_probe()
+                else:
+                    self.circuit_breaker.record_failure()
+                if e.timeout:
+                    raise CustomGraphQLExceptionHelper(
+                        "La consulta superó el tiempo límite",
+                        HTTPErrorCode.GATEWAY_TIMEOUT,
+                        details={"dependency": self.circuit_breaker.name},
+                    )
+                raise CustomGraphQLExceptionHelper(
+                    "Base de datos no disponible",
+                    HTTPErrorCode.SERVICE_UNAVAILABLE,
+                    details={"dependency": self.circuit_breaker.name},
+                )
+            self.circuit_breaker.record_success()
+            raise
+        except GeneratorExit:
+            # Abandonada a medias: no dice nada de la salud del servidor
+            self.circuit_breaker.release_probe()
+            raise
+        except BaseException:
+            self.circuit_breaker.record_success()
+            raise
+        else:
+            self.circuit_breaker.record_success()
+
+    def set_read_replica(self, collection_name: str, replica: Any) -> None:
+        """
+        Sirve desde ``replica`` (p. ej. UsersReplicaHelper) las lecturas de
+        ``collection_name`` que sepa resolver; si devuelve REPLICA_MISS (no
+        admite el filtro o va con retraso) la lectura va a MongoDB
+        """
+        self._read_replicas[collection_name] = replica
+
+    def _written(self, collection_name: str) -> None:
+        replica = self._read_replicas.get(collection_name)
+        if replica is not None:
+            replica.note_local_write()
+
     def get_collection(self, name: str) -> Collection:
         """Obtiene una colección con validación previa"""
         self._check_collection_allowed(name)
@@ -137,21 +322,51 @@ class MongoHelper:
 
         Returns:
             Nombre del índice creado
+
+        Raises:
+            OperationFailure: si MongoDB rechaza el índice (p. ej. otro con
+                las mismas claves y distintas opciones)
         """
         self._check_collection_allowed(collection_name)
         collection = self.db[collection_name]
 
+        if name:
+            kwargs["name"] = name
         try:
-            if name:
-                kwargs["name"] = name
-
             index_name = collection.create_index(keys, **kwargs)
-            LoggerHelper.info(f"Índice creado: {index_name} en {collection_name}")
-            return index_name
         except OperationFailure as e:
             LoggerHelper.error(
-                f"No se pudo crear índice: {index_name} en {collection_name}"
+                f"No se pudo crear índice: {name or keys} en {collection_name}: {e}"
             )
+            raise
+        LoggerHelper.info(f"Índice creado: {index_name} en {collection_name}")
+        return index_name
+
+    def create_indexes(
+        self, collection_name: str, indexes: List[IndexModel]
+    ) -> List[str]:
+        """
+        Crea varios índices con un solo createIndexes: el servidor los
+        construye en una única pasada sobre la colección
+
+        Returns:
+            Nombres de los índices creados
+
+        Raises:
+            OperationFailure: si MongoDB rechaza alguno de los índices
+        """
+        self._check_collection_allowed(collection_name)
+        collection = self.db[collection_name]
+
+        try:
+            names = collection.create_indexes(indexes)
+        except OperationFailure as e:
+            LoggerHelper.error(
+                f"No se pudieron crear los índices de {collection_name}: {e}"
+            )
+            raise
+        LoggerHelper.info(f"Índices creados en {collection_name}: {', '.join(names)}")
+        return names
 
     def create_ttl_index(
         self, collection_name: str, field_name: str, expire_seconds: int
@@ -192,22 +407,16 @@ class MongoHelper:
         collection = self.db[collection_name]
 
         try:
-            now = datetime.now(timezone.utc)
-            document["created_at"] = now
-            document["updated_at"] = now
-
-            result = collection.insert_one(document, **kwargs)
-            return result.inserted_id
+            with self._guard():
+                now = datetime.now(timezone.utc)
+                document["created_at"] = now
+                document["updated_at"] = now
+
+                result = collection.insert_one(document, **kwargs)
+                self._written(collection_name)
+                return result.inserted_id
         except DuplicateKeyError as e:
-            LoggerHelper.error(f"Documento duplicado: {str(e)}")
-            message = DUPLICATE_ERROR_MESSAGES.get(
-                collection_name, DEFAULT_DUPLICATE_MESSAGE
-            )
-            raise CustomGraphQLExceptionHelper(
-                message,
-                code=HTTPErrorCode.CONFLICT,
-                details={"collection": collection_name},
-            )
+            raise self._duplicate_error(collection_name, e)
         except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
                 "Error al insertar documento: " + str(e), HTTPErrorCode.BAD_REQUEST
@@ -218,17 +427,55 @@ class MongoHelper:
         collection_name: str,
         filter_: Dict[str, Any],
         projection: Optional[Dict[str, Any]] = None,
+        collation: Optional[Dict[str, Any]] = None,
         **kwargs,
     ) -> Optional[Dict[str, Any]]:
         """Busca un documento con validación de colección"""
         self._check_collection_allowed(collection_name)
+        replica = self._read_replicas.get(collection_name)
+        if replica is not None and not collation and not kwargs:
+            document = replica.find_one(filter_, projection)
+            if document is not REPLICA_MISS:
+                return document
+        if collation:
+            kwargs["collation"] = collation
         try:
-            return self.db[collection_name].find_one(filter_, projection, **kwargs)
+            with self._guard():
+                return self.db[collection_name].find_one(filter_, projection, **kwargs)
         except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
                 f"Error al buscar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
             )
 
+    def _find_cursor(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        sort: Optional[List[tuple]] = None,
+        collation: Optional[Dict[str, Any]] = None,
+        allow_blocking_sort: bool = False,
+        **kwargs,
+    ) -> Cursor:
+        self._check_collection_allowed(collection_name)
+        if collation:
+            kwargs["collation"] = collation
+        cursor = self.db[collection_name].find(filter_, projection, **kwargs)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        # Un listado completo sin filtro ni orden es un scan explícito
+        if self.explain_queries and (filter_ or sort):
+            self._verify_query_plan(
+                collection_name, filter_, cursor.explain(), allow_blocking_sort
+            )
+        return cursor
+
     def find_many(
         self,
         collection_name: str,
@@ -237,23 +484,238 @@ class MongoHelper:
         skip: int = 0,
         limit: int = 0,
         sort: Optional[List[tuple]] = None,
+        collation: Optional[Dict[str, Any]] = None,
+        allow_blocking_sort: bool = False,
         **kwargs,
     ) -> List[Dict[str, Any]]:
-        """Busca múltiples documentos con opciones de paginación"""
+        """
+        Busca múltiples documentos con opciones de paginación
+
+        Args:
+            collation: Collation de la consulta; debe coincidir con la del
+                índice que se espera usar (p. ej. CASE_INSENSITIVE_COLLATION)
+            allow_blocking_sort: Acepta un SORT en memoria al verificar el plan
+                (p. ej. ordenar por relevancia de $text)
+        """
+        documents = self._find_in_replica(
+            collection_name, filter_, projection, skip, limit, sort, kwargs
+        )
+        if documents is not REPLICA_MISS:
+            return documents
+        try:
+            with self._guard():
+                return list(
+                    self._find_cursor(
+                        collection_name,
+                        filter_,
+                        projection,
+                        skip=skip,
+                        limit=limit,
+                        sort=sort,
+                        collation=collation,
+                        allow_blocking_sort=allow_blocking_sort,
+                        **kwargs,
+                    )
+                )
+        except PyMongoError as e:
+            raise CustomGraphQLExceptionHelper(
+                f"Error al buscar los documentos: {str(e)}", HTTPErrorCode.BAD_REQUEST
+            )
+
+    def _find_in_replica(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]],
+        skip: int,
+        limit: int,
+        sort: Optional[List[tuple]],
+        kwargs: Dict[str, Any],
+    ):
+        replica = self._read_replicas.get(collection_name)
+        # Sin filtro ni orden la collation no cambia el resultado
+        if replica is None or filter_ or sort or kwargs:
+            return REPLICA_MISS
         self._check_collection_allowed(collection_name)
+        return replica.find_many(projection, skip=skip, limit=limit)
+
+    def find_iter(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        sort: Optional[List[tuple]] = None,
+        collation: Optional[Dict[str, Any]] = None,
+        allow_blocking_sort: bool = False,
+        **kwargs,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Igual que find_many pero devuelve los documentos según llegan del
+        cursor, lote a lote, sin materializar la lista (p. ej. para @stream).
+        La consulta se abre y verifica antes de devolver el iterador; el
+        cursor se cierra al agotarlo o al descartar el iterador
+        """
+        documents = self._find_in_replica(
+            collection_name, filter_, projection, skip, limit, sort, kwargs
+        )
+        if documents is not REPLICA_MISS:
+            return iter(documents)
         try:
-            cursor = self.db[collection_name].find(filter_, projection, **kwargs)
-            if sort:
-                cursor = cursor.sort(sort)
-            if skip:
-                cursor = cursor.skip(skip)
-            if limit:
-                cursor = cursor.limit(limit)
-            return list(cursor)
+            with self._guard():
+                cursor = self._find_cursor(
+                    collection_name,
+                    filter_,
+                    projection,
+                    skip=skip,
+                    limit=limit,
+                    sort=sort,
+                    collation=collation,
+                    allow_blocking_sort=allow_blocking_sort,
+                    **kwargs,
+                )
         except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
                 f"Error al buscar los documentos: {str(e)}", HTTPErrorCode.BAD_REQUEST
             )
+        return self._iterate_cursor(cursor)
+
+    def _iterate_cursor(self, cursor: Cursor) -> Iterator[Dict[str, Any]]:
+        # El circuit breaker envuelve cada next() (los getMore ocurren ahí) y
+        # no la vida del generador: con @stream el consumidor puede tardar o
+        # abandonar la respuesta, y eso no es un fallo ni un éxito de MongoDB
+        try:
+            while True:
+                try:
+                    with self._guard():
+                        document = next(cursor)
+                except StopIteration:
+                    return
+                except PyMongoError as e:
+                    raise CustomGraphQLExceptionHelper(
+                        f"Error al buscar los documentos: {str(e)}",
+                        HTTPErrorCode.BAD_REQUEST,
+                    )
+                yield document
+        finally:
+            cursor.close()
+
+    def _verify_query_plan(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        explanation: Dict[str, Any],
+        allow_blocking_sort: bool = False,
+    ) -> None:
+        """Falla si el plan ganador recorre la colección o ordena en memoria"""
+        stages = set(_collect_plan_stages(explanation["queryPlanner"]["winningPlan"]))
+        problems = []
+        if "COLLSCAN" in stages:
+            problems.append("COLLSCAN")
+        if "SORT" in stages and not allow_blocking_sort:
+            problems.append("SORT en memoria")
+        if not problems:
+            return
+
+        LoggerHelper.error(
+            f"Plan sin índice adecuado en {collection_name}: {', '.join(problems)} "
+            f"(filtro: {sorted(filter_)})"
+        )
+        raise CustomGraphQLExceptionHelper(
+            f"La consulta sobre '{collection_name}' no usa un índice adecuado",
+            HTTPErrorCode.INTERNAL_SERVER_ERROR,
+            details={
+                "collection": collection_name,
+                "problems": problems,
+                "stages": sorted(stages),
+            },
+        )
+
+    def text_search(
+        self,
+        collection_name: str,
+        text: str,
+        filter_: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> List[Dict[str, Any]]:
+        """
+        Búsqueda de texto libre sobre el índice text de la colección,
+        ordenada por relevancia (textScore) descendente
+
+        Args:
+            collection_name: Nombre de la colección (requiere un índice text)
+            text: Términos a buscar
+            filter_: Condiciones adicionales combinadas con $text
+            projection: Proyección; se añade el campo ``score`` con la relevancia
+            skip: Documentos a omitir
+            limit: Máximo de documentos a devolver
+
+        Returns:
+            Documentos ordenados por relevancia, cada uno con su ``score``
+        """
+        query = {**(filter_ or {}), "$text": {"$search": text}}
+        projection = {**(projection or {}), TEXT_SCORE_FIELD: TEXT_SCORE_META}
+        return self.find_many(
+            collection_name,
+            query,
+            projection,
+            skip=skip,
+            limit=limit,
+            sort=[(TEXT_SCORE_FIELD, TEXT_SCORE_META)],
+            allow_blocking_sort=True,
+        )
+
+    def count_documents(
+        self,
+        collection_name: str,
+        filter_: Optional[Dict[str, Any]] = None,
+        collation: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> int:
+        """
+        Cuenta documentos. Sin filtro usa estimated_document_count, que lee los
+        metadatos de la colección en vez de recorrer un índice
+
+        Args:
+            collection_name: Nombre de la colección
+            filter_: Filtro opcional; si está vacío se usa el conteo estimado
+            collation: Collation del filtro (debe coincidir con la del índice)
+        """
+        self._check_collection_allowed(collection_name)
+        collection = self.db[collection_name]
+        try:
+            with self._guard():
+                if not filter_:
+                    return collection.estimated_document_count()
+                if collation:
+                    kwargs["collation"] = collation
+                return collection.count_documents(filter_, **kwargs)
+        except PyMongoError as e:
+            raise CustomGraphQLExceptionHelper(
+                f"Error al contar los documentos: {str(e)}", HTTPErrorCode.BAD_REQUEST
+            )
+
+    def aggregate(
+        self,
+        collection_name: str,
+        pipeline: List[Dict[str, Any]],
+        collation: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        """Ejecuta un pipeline de agregación y devuelve todos sus resultados"""
+        self._check_collection_allowed(collection_name)
+        if collation:
+            kwargs["collation"] = collation
+        try:
+            with self._guard():
+                return list(self.db[collection_name].aggregate(pipeline, **kwargs))
+        except PyMongoError as e:
+            raise CustomGraphQLExceptionHelper(
+                f"Error en la agregación: {str(e)}", HTTPErrorCode.BAD_REQUEST
+            )
 
     def update_one(
         self,
@@ -266,26 +728,134 @@ class MongoHelper:
         """Actualiza un documento con timestamp automático"""
         self._check_collection_allowed(collection_name)
         try:
-            if "$set" not in update:
-                update["$set"] = {}
-
-            update["$set"]["updated_at"] = datetime.now(timezone.utc)
-            return self.db[collection_name].update_one(
-                filter_, update, upsert=upsert, **kwargs
+            with self._guard():
+                if "$set" not in update:
+                    update["$set"] = {}
+
+                update["$set"]["updated_at"] = datetime.now(timezone.utc)
+                result = self.db[collection_name].update_one(
+                    filter_, update, upsert=upsert, **kwargs
+                )
+                self._written(collection_name)
+                return result
+        except DuplicateKeyError as e:
+            raise self._duplicate_error(collection_name, e)
+        except PyMongoError as e:
+            raise CustomGraphQLExceptionHelper(
+                f"Error al actualizar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
             )
+
+    def find_one_and_update(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        update: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.AFTER,
+        **kwargs,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Actualiza un documento y lo devuelve en un solo round-trip
+
+        Args:
+            collection_name: Nombre de la colección
+            filter_: Filtro del documento
+            update: Operadores de actualización; se añade ``updated_at``
+            projection: Campos a devolver
+            upsert: Insertar si no existe (también fija ``created_at``)
+            return_document: ReturnDocument.AFTER (por defecto) o BEFORE; en
+                pymongo son bool, igual que en Collection.find_one_and_update
+
+        Returns:
+            El documento (después de actualizar por defecto) o None si no existe
+        """
+        self._check_collection_allowed(collection_name)
+        now = datetime.now(timezone.utc)
+        update = {**update, "$set": {**update.get("$set", {}), "updated_at": now}}
+        if upsert:
+            update["$setOnInsert"] = {
+                **update.get("$setOnInsert", {}),
+                "created_at": now,
+            }
+        try:
+            with self._guard():
+                result = self.db[collection_name].find_one_and_update(
+                    filter_,
+                    update,
+                    projection=projection,
+                    upsert=upsert,
+                    return_document=return_document,
+                    **kwargs,
+                )
+                self._written(collection_name)
+                return result
         except DuplicateKeyError as e:
-            LoggerHelper.error(f"Documento duplicado: {str(e)}")
-            message = DUPLICATE_ERROR_MESSAGES.get(
-                collection_name, DEFAULT_DUPLICATE_MESSAGE
+            raise self._duplicate_error(collection_name, e)
+        except PyMongoError as e:
+            raise CustomGraphQLExceptionHelper(
+                f"Error al actualizar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
             )
+
+    def find_one_and_replace(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        replacement: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        upsert: bool = False,
+        return_document: bool = ReturnDocument.AFTER,
+        **kwargs,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reemplaza un documento y lo devuelve en un solo round-trip. El
+        reemplazo recibe ``updated_at``; ``created_at`` es obligatorio porque
+        un reemplazo no admite $setOnInsert y fijarlo aquí perdería la fecha
+        de creación original
+        """
+        self._check_collection_allowed(collection_name)
+        if "created_at" not in replacement:
+            raise ValueError("El reemplazo debe incluir created_at")
+        replacement = {**replacement, "updated_at": datetime.now(timezone.utc)}
+        try:
+            with self._guard():
+                result = self.db[collection_name].find_one_and_replace(
+                    filter_,
+                    replacement,
+                    projection=projection,
+                    upsert=upsert,
+                    return_document=return_document,
+                    **kwargs,
+                )
+                self._written(collection_name)
+                return result
+        except DuplicateKeyError as e:
+            raise self._duplicate_error(collection_name, e)
+        except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
-                message,
-                code=HTTPErrorCode.CONFLICT,
-                details={"collection": collection_name},
+                f"Error al reemplazar el documento: {str(e)}",
+                HTTPErrorCode.BAD_REQUEST,
             )
+
+    def find_one_and_delete(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Optional[Dict[str, Any]]:
+        """Elimina un documento y devuelve su contenido (None si no existía)"""
+        self._check_collection_allowed(collection_name)
+        try:
+            with self._guard():
+                result = self.db[collection_name].find_one_and_delete(
+                    filter_, projection=projection, **kwargs
+                )
+                self._written(collection_name)
+                return result
         except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
-                f"Error al actualizar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
+                f"Error al eliminar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
             )
 
     def delete_one(
@@ -294,7 +864,10 @@ class MongoHelper:
         """Elimina un documento con validación"""
         self._check_collection_allowed(collection_name)
         try:
-            return self.db[collection_name].delete_one(filter_, **kwargs)
+            with self._guard():
+                result = self.db[collection_name].delete_one(filter_, **kwargs)
+                self._written(collection_name)
+                return result
         except PyMongoError as e:
             raise CustomGraphQLExceptionHelper(
                 f"Error al eliminar el documento: {str(e)}", HTTPErrorCode.BAD_REQUEST
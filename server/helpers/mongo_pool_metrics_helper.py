@@ -0,0 +1,73 @@
+import threading
+from typing import Any, Dict
+
+from pymongo.monitoring import ConnectionPoolListener
+
+
+class MongoPoolMetricsHelper(ConnectionPoolListener):
+    """
+    Listener de eventos CMAP que mantiene contadores del pool de conexiones
+    de un MongoClient (pymongo no expone estas cifras públicamente)
+    """
+
+    def __init__(self, max_pool_size: int, min_pool_size: int = 0):
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.open_connections = 0
+        self.in_use = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self._lock = threading.Lock()
+
+    def _add(self, attribute: str, delta: int) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + delta)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._add("pool_clears", 1)
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._add("open_connections", 1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._add("open_connections", -1)
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        # Incluye los timeouts por pool agotado (waitQueueTimeoutMS)
+        self._add("checkout_failures", 1)
+
+    def connection_checked_out(self, event) -> None:
+        self._add("in_use", 1)
+
+    def connection_checked_in(self, event) -> None:
+        self._add("in_use", -1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual del pool; ``utilisation`` es in_use / max_pool_size"""
+        with self._lock:
+            return {
+                "max_pool_size": self.max_pool_size,
+                "min_pool_size": self.min_pool_size,
+                "open_connections": self.open_connections,
+                "in_use": self.in_use,
+                "utilisation": (
+                    self.in_use / self.max_pool_size if self.max_pool_size else 0.0
+                ),
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears,
+            }
@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Any, Dict
+
+from pymongo.errors import PyMongoError
+
+from server.constants.mongo_pools import MONGO_POOL_ENV_OPTIONS, MONGO_POOLS
+from server.decorators.singleton_decorator import singleton
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.mongo_helper import MongoHelper
+
+
+@singleton
+class MongoRegistryHelper:
+    """
+    Registro thread-safe de instancias de MongoHelper con nombre, cada una con
+    su propio pool, timeouts y read preference (ver MONGO_POOLS)
+    """
+
+    def __init__(self):
+        self._configs: Dict[str, Dict[str, Any]] = {
+            name: self._with_env_overrides(name, config)
+            for name, config in MONGO_POOLS.items()
+        }
+        self._instances: Dict[str, MongoHelper] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _with_env_overrides(name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        config = dict(config)
+        for option, cast in MONGO_POOL_ENV_OPTIONS.items():
+            value = os.getenv(f"MONGO_POOL_{name.upper()}_{option.upper()}")
+            if value is not None:
+                config[option] = cast(value)
+        return config
+
+    def register(self, name: str, **config) -> None:
+        """
+        Declara (o redefine) un pool antes de su primer uso
+
+        Raises:
+            ValueError: si el pool ya fue creado
+        """
+        with self._lock:
+            if name in self._instances:
+                raise ValueError(f"El pool de MongoDB '{name}' ya está en uso")
+            self._configs[name] = self._with_env_overrides(name, config)
+
+    def get(self, name: str = "default") -> MongoHelper:
+        """Devuelve la instancia del pool ``name``, creándola en el primer uso"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            # Otro hilo pudo crearla mientras esperábamos el lock
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._configs:
+                    raise ValueError(f"Pool de MongoDB desconocido: '{name}'")
+                config = dict(self._configs[name])
+                config.pop("warm_up", None)
+                instance = MongoHelper(name=name, **config)
+                self._instances[name] = instance
+            return instance
+
+    def instances(self) -> Dict[str, MongoHelper]:
+        with self._lock:
+            return dict(self._instances)
+
+    def warm_up(self) -> None:
+        """
+        Crea y precalienta los pools declarados salvo los marcados con
+        ``warm_up: False``. Un pool inaccesible no impide arrancar: se
+        registra el error y se reintenta en su primer uso
+        """
+        with self._lock:
+            names = [
+                name
+                for name, config in self._configs.items()
+                if config.get("warm_up", True)
+            ]
+        for name in names:
+            try:
+                self.get(name).warm_up()
+            except (PyMongoError, ConnectionError, RuntimeError) as e:
+                LoggerHelper.error(f"No se pudo precalentar el pool '{name}': {e}")
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Métricas de cada pool creado, por nombre"""
+        return {
+            name: instance.pool_stats() for name, instance in self.instances().items()
+        }
+
+    def close_all(self) -> None:
+        with self._lock:
+            for instance in self._instances.values():
+                instance.close()
+            self._instances.clear()
@@ -0,0 +1,300 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Optional, Tuple
+
+from server.decorators.singleton_decorator import singleton
+from server.helpers.logger_helper import LoggerHelper
+from server.utils.admin_utils import is_admin
+
+PROFILE_HEADER = "X-Profile"
+FORMAT_COLLAPSED = "collapsed"
+FORMAT_SPEEDSCOPE = "speedscope"
+FORMAT_PSTATS = "pstats"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+FILE_EXTENSIONS = {
+    FORMAT_COLLAPSED: "collapsed.txt",
+    FORMAT_SPEEDSCOPE: "speedscope.json",
+    FORMAT_PSTATS: "pstats.txt",
+}
+FILENAME_UNSAFE_PATTERN = re.compile(r"[^\w.-]")
+# Funciones de pstats incluidas en la salida de cProfile
+PSTATS_LIMIT = 60
+
+
+def _frame_name(code) -> str:
+    return (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+
+
+class SamplingProfiler:
+    """
+    Profiler de muestreo de un hilo: otro hilo lee su pila con
+    sys._current_frames() cada ``interval`` segundos. El hilo perfilado no
+    ejecuta nada extra, así que el coste no depende de cuántas funciones llame.
+
+    Con el GIL ocupado las muestras llegan más espaciadas que ``interval``:
+    cada una pesa el tiempo real transcurrido desde la anterior
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sampled_time: Counter = Counter()
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._sample, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _sample(self) -> None:
+        last = self.started_at
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                # Se guardan code objects: los nombres se forman al exportar
+                stack = tuple(reversed(stack))
+                self.samples[stack] += 1
+                self.sampled_time[stack] += now - last
+            last = now
+
+    def export(self, output_format: str) -> Any:
+        if output_format == FORMAT_SPEEDSCOPE:
+            return self._speedscope()
+        return "\n".join(
+            ";".join(_frame_name(code) for code in stack) + f" {count}"
+            for stack, count in self.samples.most_common()
+        )
+
+    def _speedscope(self) -> Dict[str, Any]:
+        frames: Dict[Any, int] = {}
+        samples, weights = [], []
+        for stack, elapsed in self.sampled_time.items():
+            samples.append([frames.setdefault(code, len(frames)) for code in stack])
+            weights.append(round(elapsed * 1000, 3))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {
+                "frames": [
+                    {
+                        "name": code.co_name,
+                        "file": code.co_filename,
+                        "line": code.co_firstlineno,
+                    }
+                    for code in frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": "request",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 3),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+        }
+
+
+class CProfileProfiler:
+    """Alternativa determinista con cProfile (PROFILING_MODE=cprofile)"""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self.duration = 0.0
+        self.started_at = 0.0
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        self.duration = time.perf_counter() - self.started_at
+
+    def export(self, output_format: str) -> str:
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PSTATS_LIMIT)
+        return stream.getvalue()
+
+
+class RequestProfile:
+    """Perfilado en curso de una petición"""
+
+    __slots__ = ("profiler", "output_format", "inline", "label")
+
+    def __init__(self, profiler, output_format: str, inline: bool, label: str):
+        self.profiler = profiler
+        self.output_format = output_format
+        self.inline = inline
+        self.label = label
+
+
+@singleton
+class ProfilingHelper:
+    """
+    Perfilado de peticiones individuales de /graphql.
+
+    * Bajo demanda: un administrador envía la cabecera ``X-Profile``
+      (``collapsed`` o ``speedscope``) y el perfil vuelve en
+      ``extensions.profile`` de la respuesta.
+    * En segundo plano: una fracción PROFILING_SAMPLE_RATE de las peticiones
+      se perfila y el resultado se guarda en PROFILING_OUTPUT_DIR.
+
+    Por defecto usa un profiler de muestreo (PROFILING_INTERVAL_MS); con
+    PROFILING_MODE=cprofile, o si el intérprete no ofrece
+    sys._current_frames, usa cProfile y devuelve la tabla de pstats. Como
+    mucho PROFILING_MAX_CONCURRENT peticiones se perfilan a la vez. Sin
+    cabecera ni muestreo el coste es una lectura de cabecera por petición
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+        self.sample_rate = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+        self.interval = float(os.getenv("PROFILING_INTERVAL_MS", "1")) / 1000
+        self.output_dir = os.getenv("PROFILING_OUTPUT_DIR", "profiles")
+        self.background_format = os.getenv(
+            "PROFILING_SAMPLE_FORMAT", FORMAT_SPEEDSCOPE
+        ).lower()
+        if self.background_format not in (FORMAT_COLLAPSED, FORMAT_SPEEDSCOPE):
+            self.background_format = FORMAT_SPEEDSCOPE
+        self.mode = os.getenv("PROFILING_MODE", "sampling").lower()
+        if self.mode == "sampling" and not hasattr(sys, "_current_frames"):
+            self.mode = "cprofile"
+        self._slots = threading.BoundedSemaphore(
+            int(os.getenv("PROFILING_MAX_CONCURRENT", "2"))
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {"on_demand": 0, "sampled": 0, "skipped_busy": 0}
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized "
+            f"(mode: {self.mode}, sample rate: {self.sample_rate})"
+        )
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def _decide(self, headers, operation_name: str) -> Optional[Tuple[str, bool, str]]:
+        """(formato, inline, motivo) si la petición se perfila"""
+        requested = headers.get(PROFILE_HEADER)
+        if requested:
+            output_format = requested.strip().lower()
+            if output_format not in (FORMAT_COLLAPSED, FORMAT_SPEEDSCOPE):
+                output_format = FORMAT_COLLAPSED
+            if is_admin(headers.get("Authorization", "")):
+                return output_format, True, "on_demand"
+            LoggerHelper.error(
+                f"Cabecera {PROFILE_HEADER} ignorada en {operation_name}: "
+                "requiere un administrador"
+            )
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return self.background_format, False, "sampled"
+        return None
+
+    def start(
+        self, headers, operation_name: str, label: str
+    ) -> Optional[RequestProfile]:
+        """
+        Empieza a perfilar el hilo actual si la petición lo pide o sale en el
+        muestreo; None en otro caso. Hay que cerrarlo con finish()
+        """
+        if not self.enabled:
+            return None
+        decision = self._decide(headers, operation_name)
+        if decision is None:
+            return None
+        output_format, inline, reason = decision
+        if not self._slots.acquire(blocking=False):
+            self._count("skipped_busy")
+            return None
+        self._count(reason)
+
+        if self.mode == "cprofile":
+            profiler = CProfileProfiler()
+            output_format = FORMAT_PSTATS
+        else:
+            profiler = SamplingProfiler(threading.get_ident(), self.interval)
+        try:
+            profiler.start()
+        except ValueError as e:
+            # cProfile no admite otro profiler activo a la vez
+            self._slots.release()
+            LoggerHelper.error(f"No se pudo iniciar el profiler: {e}")
+            return None
+        return RequestProfile(profiler, output_format, inline, label)
+
+    def finish(
+        self, profile: Optional[RequestProfile], result: Optional[Dict[str, Any]]
+    ) -> None:
+        """
+        Detiene el profiler; el perfil se añade a ``result["extensions"]`` si
+        se pidió por cabecera o se guarda en disco si es del muestreo
+        """
+        if profile is None:
+            return
+        try:
+            profile.profiler.stop()
+        finally:
+            self._slots.release()
+
+        output = {
+            "format": profile.output_format,
+            "durationMs": round(profile.profiler.duration * 1000, 3),
+            "data": profile.profiler.export(profile.output_format),
+        }
+        if profile.inline:
+            if isinstance(result, dict):
+                result.setdefault("extensions", {})["profile"] = output
+            return
+        self._store(profile, output)
+
+    def _store(self, profile: RequestProfile, output: Dict[str, Any]) -> None:
+        filename = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-"
+            f"{FILENAME_UNSAFE_PATTERN.sub('_', profile.label)}."
+            f"{FILE_EXTENSIONS[profile.output_format]}"
+        )
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(
+                os.path.join(self.output_dir, filename), "w", encoding="utf-8"
+            ) as f:
+                data = output["data"]
+                f.write(data if isinstance(data, str) else json.dumps(data))
+        except OSError as e:
+            LoggerHelper.error(f"No se pudo guardar el perfil {filename}: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(enabled=self.enabled, mode=self.mode, sample_rate=self.sample_rate)
+        return stats
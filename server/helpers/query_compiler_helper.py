@@ -0,0 +1,449 @@
+import os
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ariadne import format_error
+from ariadne.graphql import handle_query_result
+from graphql import (
+    BREAK,
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    GraphQLBoolean,
+    GraphQLError,
+    GraphQLID,
+    GraphQLObjectType,
+    GraphQLResolveInfo,
+    GraphQLSchema,
+    GraphQLString,
+    OperationDefinitionNode,
+    OperationType,
+    Undefined,
+    Visitor,
+    is_enum_type,
+    is_leaf_type,
+    is_list_type,
+    is_non_null_type,
+    is_object_type,
+    located_error,
+    parse,
+    validate,
+    visit,
+)
+from graphql.execution import ExecutionContext
+from graphql.execution.collect_fields import collect_fields, collect_sub_fields
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.pyutils import Path, inspect, is_iterable
+
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.ttl_cache_helper import TTLCacheHelper
+
+# Escalares cuyo serialize() devuelve el mismo valor si ya tiene este tipo
+PASSTHROUGH_SCALARS = {
+    GraphQLString.name: str,
+    GraphQLID.name: str,
+    GraphQLBoolean.name: bool,
+}
+NO_ARGUMENTS: Dict[str, Any] = {}
+
+
+class NotCompilableError(Exception):
+    """La operación usa algo que el compilador no soporta (se usa graphql_sync)"""
+
+
+class _NullPropagation(Exception):
+    """Un null en posición non-null: se anula el padre nullable más cercano"""
+
+
+class _Execution:
+    __slots__ = ("variables", "context", "root_value", "errors", "arguments")
+
+    def __init__(self, variables, context, root_value):
+        self.variables = variables
+        self.context = context
+        self.root_value = root_value
+        self.errors: List[GraphQLError] = []
+        self.arguments: Dict[int, Dict[str, Any]] = {}
+
+
+Completer = Callable[[Any, Path, _Execution], Any]
+FieldExecutor = Callable[[Any, Optional[Path], _Execution], Any]
+
+
+class _DirectiveFinder(Visitor):
+    def __init__(self):
+        super().__init__()
+        self.found = False
+
+    def enter_directive(self, *_args):
+        self.found = True
+        return BREAK
+
+
+class CompiledQuery:
+    """
+    Operación validada convertida en un árbol de closures: cada campo sabe de
+    antemano su resolver, sus argumentos, su tipo y cómo serializarlo, sin
+    recorrer el AST ni consultar el schema en cada petición
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        operation: OperationDefinitionNode,
+    ):
+        self.schema = schema
+        self.operation = operation
+        self.fragments: Dict[str, FragmentDefinitionNode] = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        root_type = schema.query_type
+        if root_type is None:
+            raise NotCompilableError("El schema no define el tipo Query")
+        self._root_fields = self._compile_fields(
+            root_type,
+            collect_fields(
+                schema, self.fragments, {}, root_type, operation.selection_set
+            ),
+        )
+
+    def execute(
+        self, variables: Optional[Dict[str, Any]], context_value: Any = None
+    ) -> Optional[Tuple[Optional[Dict[str, Any]], List[GraphQLError]]]:
+        """
+        Ejecuta la operación; devuelve (data, errores) o None si las variables
+        no son válidas (graphql_sync genera entonces la respuesta de error)
+        """
+        coerced = get_variable_values(
+            self.schema,
+            self.operation.variable_definitions or (),
+            variables or {},
+            max_errors=50,
+        )
+        if isinstance(coerced, list):
+            return None
+
+        execution = _Execution(coerced, context_value, None)
+        try:
+            data = {
+                key: execute(None, None, execution)
+                for key, execute in self._root_fields
+            }
+        except _NullPropagation:
+            data = None
+        return data, execution.errors
+
+    def _compile_fields(
+        self, parent_type: GraphQLObjectType, fields: Dict[str, List[FieldNode]]
+    ) -> List[Tuple[str, FieldExecutor]]:
+        return [
+            (key, self._compile_field(parent_type, key, field_nodes))
+            for key, field_nodes in fields.items()
+        ]
+
+    def _compile_field(
+        self,
+        parent_type: GraphQLObjectType,
+        response_key: str,
+        field_nodes: List[FieldNode],
+    ) -> FieldExecutor:
+        field_name = field_nodes[0].name.value
+        if field_name == "__typename":
+            type_name = parent_type.name
+            return lambda source, path, execution: type_name
+
+        field_def = parent_type.fields.get(field_name)
+        if field_def is None:
+            # __schema / __type: la introspección tiene su propia caché
+            raise NotCompilableError(f"Campo no soportado: {field_name}")
+
+        return_type = field_def.type
+        parent_name = parent_type.name
+        nullable = not is_non_null_type(return_type)
+        complete = self._compile_value(
+            return_type, field_nodes, f"{parent_name}.{field_name}"
+        )
+        arguments = self._compile_arguments(field_def, field_nodes[0])
+        schema, fragments, operation = self.schema, self.fragments, self.operation
+
+        def make_info(path: Path, execution: _Execution) -> GraphQLResolveInfo:
+            return GraphQLResolveInfo(
+                field_name,
+                field_nodes,
+                return_type,
+                parent_type,
+                path,
+                schema,
+                fragments,
+                execution.root_value,
+                operation,
+                execution.variables,
+                execution.context,
+                ExecutionContext.is_awaitable,
+            )
+
+        resolve = field_def.resolve
+        if resolve is None:
+            # Equivalente a default_field_resolver sin construir el info
+            def resolve_value(source, path, execution):
+                if isinstance(source, Mapping):
+                    value = source.get(field_name)
+                else:
+                    value = getattr(source, field_name, None)
+                if callable(value):
+                    return value(make_info(path, execution), **arguments(execution))
+                return value
+
+        else:
+
+            def resolve_value(source, path, execution):
+                return resolve(
+                    source, make_info(path, execution), **arguments(execution)
+                )
+
+        def execute_field(source, parent_path, execution):
+            path = Path(parent_path, response_key, parent_name)
+            try:
+                value = resolve_value(source, path, execution)
+                if isinstance(value, Exception):
+                    raise value
+                return complete(value, path, execution)
+            except _NullPropagation:
+                if nullable:
+                    return None
+                raise
+            except Exception as raw_error:
+                execution.errors.append(
+                    located_error(raw_error, field_nodes, path.as_list())
+                )
+                if nullable:
+                    return None
+                raise _NullPropagation()
+
+        leaf_type = return_type.of_type if not nullable else return_type
+        passthrough = (
+            PASSTHROUGH_SCALARS.get(leaf_type.name) if is_leaf_type(leaf_type) else None
+        )
+        if resolve is None and passthrough is not None:
+            # Caso más frecuente: clave de un dict o atributo de un registro
+            # (p. ej. User) con el tipo ya correcto
+            def execute_passthrough_field(source, parent_path, execution):
+                if type(source) is dict:
+                    value = source.get(field_name)
+                else:
+                    value = getattr(source, field_name, None)
+                if type(value) is passthrough:
+                    return value
+                return execute_field(source, parent_path, execution)
+
+            return execute_passthrough_field
+        return execute_field
+
+    def _compile_arguments(
+        self, field_def, node: FieldNode
+    ) -> Callable[[_Execution], Dict[str, Any]]:
+        if not field_def.args:
+            return lambda execution: NO_ARGUMENTS
+
+        key = id(node)
+
+        def arguments(execution: _Execution) -> Dict[str, Any]:
+            # Una vez por ejecución, no por cada elemento de una lista
+            values = execution.arguments.get(key)
+            if values is None:
+                values = get_argument_values(field_def, node, execution.variables)
+                execution.arguments[key] = values
+            return values
+
+        return arguments
+
+    def _compile_value(
+        self, type_, field_nodes: List[FieldNode], field_label: str
+    ) -> Completer:
+        if is_non_null_type(type_):
+            inner = self._compile_value(type_.of_type, field_nodes, field_label)
+            message = f"Cannot return null for non-nullable field {field_label}."
+
+            def complete_non_null(value, path, execution):
+                completed = inner(value, path, execution)
+                if completed is None:
+                    raise TypeError(message)
+                return completed
+
+            return complete_non_null
+
+        if is_leaf_type(type_):
+            serialize = type_.serialize
+            passthrough = PASSTHROUGH_SCALARS.get(type_.name)
+            type_name = type_.name
+            is_enum = is_enum_type(type_)
+
+            def complete_leaf(value, path, execution):
+                if value is None:
+                    return None
+                if not is_enum and type(value) is passthrough:
+                    return value
+                serialized = serialize(value)
+                if serialized is Undefined or serialized is None:
+                    raise TypeError(
+                        f"Expected `{type_name}.serialize({inspect(value)})`"
+                        f" to return non-nullish value, returned: {inspect(serialized)}"
+                    )
+                return serialized
+
+            return complete_leaf
+
+        if is_list_type(type_):
+            item_type = type_.of_type
+            item_nullable = not is_non_null_type(item_type)
+            complete_item = self._compile_value(item_type, field_nodes, field_label)
+
+            def complete_list(value, path, execution):
+                if value is None:
+                    return None
+                if not is_iterable(value):
+                    raise GraphQLError(
+                        "Expected Iterable, but did not find one for field"
+                        f" '{field_label}'."
+                    )
+                completed = []
+                append = completed.append
+                for index, item in enumerate(value):
+                    item_path = Path(path, index, None)
+                    try:
+                        if isinstance(item, Exception):
+                            raise item
+                        append(complete_item(item, item_path, execution))
+                    except _NullPropagation:
+                        if not item_nullable:
+                            raise
+                        append(None)
+                    except Exception as raw_error:
+                        execution.errors.append(
+                            located_error(raw_error, field_nodes, item_path.as_list())
+                        )
+                        if not item_nullable:
+                            raise _NullPropagation()
+                        append(None)
+                return completed
+
+            return complete_list
+
+        if is_object_type(type_) and type_.is_type_of is None:
+            fields = self._compile_fields(
+                type_,
+                collect_sub_fields(self.schema, self.fragments, {}, type_, field_nodes),
+            )
+
+            def complete_object(value, path, execution):
+                if value is None:
+                    return None
+                return {key: execute(value, path, execution) for key, execute in fields}
+
+            return complete_object
+
+        # Interfaces, uniones o is_type_of: quedan para el ejecutor genérico
+        raise NotCompilableError(f"Tipo no soportado: {type_}")
+
+
+class QueryCompilerHelper:
+    """
+    Compilador ahead-of-time de operaciones (al estilo de graphql-jit). La
+    primera vez que llega un documento se parsea, valida y compila; las
+    siguientes se ejecuta directamente el CompiledQuery cacheado, sin parse,
+    validate ni el ejecutor genérico de graphql-core.
+
+    Solo compila queries sin directivas (@skip, @include, @defer, @stream...)
+    sobre tipos objeto; para todo lo demás ``execute`` devuelve None y la
+    petición sigue por graphql_sync
+    """
+
+    def __init__(self, schema: GraphQLSchema):
+        self.schema = schema
+        self.enabled = os.getenv("GRAPHQL_COMPILE_QUERIES", "true").lower() == "true"
+        # Documento -> CompiledQuery, o False si no se puede compilar
+        self._compiled = TTLCacheHelper(
+            float("inf"),
+            max_entries=int(os.getenv("GRAPHQL_COMPILED_QUERIES_MAX", "256")),
+        )
+
+    def get(
+        self, query: str, operation_name: Optional[str] = None
+    ) -> Optional[CompiledQuery]:
+        compiled = self._compiled.get_or_set(
+            (query, operation_name), lambda: self.compile(query, operation_name)
+        )
+        return compiled or None
+
+    def compile(self, query: str, operation_name: Optional[str] = None):
+        """CompiledQuery de ``query``, o False si debe ejecutarse con graphql_sync"""
+        try:
+            document = parse(query)
+        except GraphQLError:
+            return False
+        if validate(self.schema, document):
+            return False
+
+        operations = [
+            definition
+            for definition in document.definitions
+            if isinstance(definition, OperationDefinitionNode)
+            and (
+                operation_name is None
+                or (definition.name and definition.name.value == operation_name)
+            )
+        ]
+        if len(operations) != 1 or operations[0].operation != OperationType.QUERY:
+            return False
+
+        finder = _DirectiveFinder()
+        visit(document, finder)
+        if finder.found:
+            return False
+
+        try:
+            return CompiledQuery(self.schema, document, operations[0])
+        except NotCompilableError as e:
+            LoggerHelper.info(f"Operación no compilable, se usa graphql_sync: {e}")
+            return False
+
+    def execute(
+        self,
+        data: Any,
+        context_value: Any = None,
+        debug: bool = False,
+        error_formatter: Callable = format_error,
+    ) -> Optional[Tuple[bool, Dict[str, Any]]]:
+        """
+        Mismo resultado que graphql_sync(schema, data, ...) para operaciones
+        compilables; None si la petición debe ir por graphql_sync
+        """
+        if not self.enabled or not isinstance(data, dict):
+            return None
+        query = data.get("query")
+        operation_name = data.get("operationName")
+        variables = data.get("variables")
+        if (
+            not isinstance(query, str)
+            or not isinstance(operation_name, (str, type(None)))
+            or not isinstance(variables, (dict, type(None)))
+        ):
+            return None
+
+        compiled = self.get(query, operation_name)
+        if compiled is None:
+            return None
+        executed = compiled.execute(variables, context_value)
+        if executed is None:
+            return None
+
+        data, errors = executed
+        return handle_query_result(
+            ExecutionContext.build_response(data, errors),
+            logger=None,
+            error_formatter=error_formatter,
+            debug=debug,
+        )
@@ -0,0 +1,172 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from server.decorators.singleton_decorator import singleton
+from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+
+RATE_LIMIT_COLLECTION = "rate_limits"
+
+
+class InMemoryRateLimitBackend:
+    """Token buckets en memoria del proceso (un bucket por clave)"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        # clave -> [tokens, último refill (monotonic), capacidad, tokens por segundo]
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def consume(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> Tuple[bool, float]:
+        """
+        Consume ``cost`` tokens del bucket de ``key``
+
+        Returns:
+            (permitido, segundos hasta que haya tokens suficientes)
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                bucket = [capacity, now, capacity, refill_rate]
+                self._buckets[key] = bucket
+
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return True, 0.0
+            bucket[0] = tokens
+            return False, (cost - tokens) / refill_rate
+
+    def _prune(self, now: float) -> None:
+        # Un bucket lleno equivale a no tener bucket: se puede descartar
+        full = [
+            key
+            for key, (tokens, updated, capacity, rate) in self._buckets.items()
+            if tokens + (now - updated) * rate >= capacity
+        ]
+        for key in full:
+            del self._buckets[key]
+
+
+class MongoRateLimitBackend:
+    """
+    Token buckets compartidos entre procesos (p. ej. workers de gunicorn).
+    Cada consumo es un único find_one_and_update atómico con pipeline,
+    usando el reloj del servidor ($$NOW) para no depender del de cada worker
+    """
+
+    def __init__(self, mongo_helper):
+        self.mongo_helper = mongo_helper
+
+    def consume(
+        self, key: str, capacity: int, refill_rate: float, cost: int = 1
+    ) -> Tuple[bool, float]:
+        elapsed_seconds = {
+            "$divide": [
+                {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]},
+                1000,
+            ]
+        }
+        refilled = {
+            "$min": [
+                capacity,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {"$multiply": [elapsed_seconds, refill_rate]},
+                    ]
+                },
+            ]
+        }
+        # El documento expira cuando el bucket se habría rellenado por completo
+        ttl_ms = math.ceil(capacity / refill_rate * 1000)
+        pipeline = [
+            {"$set": {"tokens": refilled, "updated_at": "$$NOW"}},
+            {"$set": {"allowed": {"$gte": ["$tokens", cost]}}},
+            {
+                "$set": {
+                    "tokens": {
+                        "$cond": [
+                            "$allowed",
+                            {"$subtract": ["$tokens", cost]},
+                            "$tokens",
+                        ]
+                    },
+                    "expires_at": {"$add": ["$$NOW", ttl_ms]},
+                }
+            },
+        ]
+        bucket = self.mongo_helper.get_collection(
+            RATE_LIMIT_COLLECTION
+        ).find_one_and_update(
+            {"_id": key},
+            pipeline,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return True, 0.0
+        return False, (cost - bucket["tokens"]) / refill_rate
+
+
+@singleton
+class RateLimiterHelper:
+    """
+    Limitador de peticiones por token bucket. El backend se elige con
+    RATE_LIMIT_BACKEND: ``memory`` (por proceso, por defecto) o ``mongo``
+    (compartido entre workers)
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+        backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+        if backend_name == "mongo":
+            self.backend = MongoRateLimitBackend(MongoRegistryHelper().get("auth"))
+        else:
+            self.backend = InMemoryRateLimitBackend()
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized (backend: {backend_name})"
+        )
+
+    def hit(self, key: str, limit: int, period: float, operation: str) -> None:
+        """
+        Registra una petición para ``key``; admite ``limit`` peticiones por
+        ``period`` segundos con ráfagas de hasta ``limit``
+
+        Raises:
+            CustomGraphQLExceptionHelper: TOO_MANY_REQUESTS si se supera el límite
+        """
+        if not self.enabled:
+            return
+
+        try:
+            allowed, retry_after = self.backend.consume(key, limit, limit / period)
+        except PyMongoError as e:
+            # Si el backend compartido falla no bloqueamos login/registro
+            LoggerHelper.error(f"Rate limiter no disponible: {str(e)}")
+            return
+
+        if not allowed:
+            LoggerHelper.warning(f"Límite de peticiones superado: {key}")
+            raise CustomGraphQLExceptionHelper(
+                "Demasiadas peticiones, inténtalo más tarde",
+                HTTPErrorCode.TOO_MANY_REQUESTS,
+                details={
+                    "operation": operation,
+                    "retryAfter": math.ceil(retry_after),
+                },
+            )
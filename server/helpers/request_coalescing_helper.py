@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from flask import Response
+from graphql import GraphQLError, OperationDefinitionNode, OperationType, parse
+from graphql import print_ast
+
+from server.decorators.singleton_decorator import singleton
+from server.enums.http_error_code_enum import HTTPErrorCode
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+
+# Documentos distintos cuya forma normalizada se recuerda
+NORMALIZED_DOCUMENT_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=NORMALIZED_DOCUMENT_CACHE_SIZE)
+def _normalized_query(query: str, operation_name: Optional[str]) -> Optional[str]:
+    """
+    Documento impreso de forma canónica (sin comentarios ni espacios extra) si
+    la operación seleccionada es una query; None para mutaciones,
+    suscripciones y documentos inválidos
+    """
+    try:
+        document = parse(query, no_location=True)
+    except GraphQLError:
+        return None
+    operations = [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+    ]
+    if operation_name:
+        operation = next(
+            (op for op in operations if op.name and op.name.value == operation_name),
+            None,
+        )
+    else:
+        operation = operations[0] if len(operations) == 1 else None
+    if operation is None or operation.operation != OperationType.QUERY:
+        return None
+    return print_ast(document)
+
+
+class _InFlight:
+    """Ejecución en curso compartida por las peticiones con la misma clave"""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Tuple[bytes, int, list]] = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+@singleton
+class RequestCoalescingHelper:
+    """
+    Singleflight de queries idénticas en curso (REQUEST_COALESCING).
+
+    Las peticiones concurrentes con el mismo documento normalizado, nombre
+    de operación, variables, cabecera Authorization y presupuesto de tiempo
+    comparten una única ejecución: la primera la ejecuta y el resto espera y
+    recibe una copia de la misma respuesta serializada. No se comparte nada
+    una vez terminada (no es una caché). Las mutaciones nunca se agrupan; las
+    peticiones multipart, perfiladas o muestreadas por las trazas tampoco,
+    porque su respuesta es propia de cada una
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("REQUEST_COALESCING", "true").lower() == "true"
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._stats = {"executions": 0, "collapsed": 0, "wait_timeouts": 0}
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized "
+            f"(coalescing {'enabled' if self.enabled else 'disabled'})"
+        )
+
+    def key(
+        self, data: Dict[str, Any], authorization: str, timeout: float
+    ) -> Optional[Hashable]:
+        """
+        Clave de agrupación de la operación; None si no se puede agrupar.
+        Incluye ``timeout`` (el presupuesto resuelto de la petición): con
+        presupuestos distintos el 504 de una ejecución no vale para la otra
+        """
+        if not self.enabled:
+            return None
+        query = data.get("query")
+        operation_name = data.get("operationName")
+        if not isinstance(query, str) or not (
+            operation_name is None or isinstance(operation_name, str)
+        ):
+            return None
+        normalized = _normalized_query(query, operation_name)
+        if normalized is None:
+            return None
+        try:
+            variables = json.dumps(
+                data.get("variables") or {}, sort_keys=True, separators=(",", ":")
+            )
+        except (TypeError, ValueError):
+            return None
+        # El alcance de la respuesta es el de la credencial: sin guardarla
+        scope = hashlib.sha256(authorization.encode()).hexdigest()
+        return normalized, operation_name, variables, scope, timeout
+
+    def execute(
+        self, key: Hashable, execute: Callable[[], Response], timeout: float
+    ) -> Response:
+        """
+        Ejecuta ``execute`` o espera (como mucho ``timeout`` segundos) a la
+        ejecución en curso con la misma clave y copia su respuesta
+
+        Raises:
+            CustomGraphQLExceptionHelper: GATEWAY_TIMEOUT si la ejecución
+                compartida no termina a tiempo
+        """
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if call is None:
+                call = self._in_flight[key] = _InFlight()
+                self._stats["executions"] += 1
+            else:
+                call.followers += 1
+                self._stats["collapsed"] += 1
+
+        if leader:
+            return self._lead(key, call, execute)
+
+        if not call.done.wait(timeout):
+            with self._lock:
+                self._stats["wait_timeouts"] += 1
+            raise CustomGraphQLExceptionHelper(
+                "La consulta superó el tiempo límite", HTTPErrorCode.GATEWAY_TIMEOUT
+            )
+        if call.error is not None:
+            raise call.error
+        # _lead deja siempre result o error antes de done.set()
+        assert call.result is not None
+        body, status, headers = call.result
+        return Response(body, status=status, headers=headers)
+
+    def _lead(
+        self, key: Hashable, call: _InFlight, execute: Callable[[], Response]
+    ) -> Response:
+        try:
+            response = execute()
+            if response.is_streamed:
+                call.error = RuntimeError("Respuesta en streaming no compartible")
+            else:
+                call.result = (
+                    response.get_data(),
+                    response.status_code,
+                    list(response.headers.items()),
+                )
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # Las peticiones que lleguen a partir de aquí ejecutan de nuevo
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._in_flight),
+                **self._stats,
+            }
@@ -0,0 +1,25 @@
+import pymongo
+from ariadne import SchemaDirectiveVisitor
+from graphql import GraphQLField, default_field_resolver
+
+
+class TimeoutDirectiveHelper(SchemaDirectiveVisitor):
+    """
+    ``@timeout(ms: Int!)`` en la definición de un campo: las operaciones de
+    MongoDB de su resolver tienen como máximo ``ms`` milisegundos. Se anida
+    con el deadline de la petición, así que solo puede acortarlo
+
+    El límite cubre la ejecución del resolver; si este devuelve un generador
+    perezoso, su consumo posterior queda fuera y solo aplica el de la petición
+    """
+
+    def visit_field_definition(self, field: GraphQLField, object_type) -> GraphQLField:
+        seconds = self.args["ms"] / 1000
+        resolve = field.resolve or default_field_resolver
+
+        def resolve_with_timeout(obj, info, **kwargs):
+            with pymongo.timeout(seconds):
+                return resolve(obj, info, **kwargs)
+
+        field.resolve = resolve_with_timeout
+        return field
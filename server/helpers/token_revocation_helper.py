@@ -0,0 +1,179 @@
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+from server.decorators.singleton_decorator import singleton
+from server.helpers.bloom_filter_helper import BloomFilterHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+
+REVOKED_TOKENS_COLLECTION = "revoked_tokens"
+FAMILY_PREFIX = "family:"
+# Margen al pedir revocaciones nuevas: cubre desfase de reloj entre workers
+# e inserciones en curso durante la sincronización anterior
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+@singleton
+class TokenRevocationHelper:
+    """
+    Revocación de refresh tokens por ``jti`` o por familia (la cadena de
+    tokens rotados desde un login). La fuente de verdad es la colección
+    ``revoked_tokens`` (TTL por ``expires_at``); cada proceso la replica en un
+    filtro de Bloom que un hilo en segundo plano sincroniza de forma
+    incremental cada TOKEN_REVOCATION_SYNC_INTERVAL segundos, de modo que
+    comprobar un token no revocado no consulta MongoDB ni espera a una
+    sincronización. Solo los positivos del filtro (o un filtro desactualizado)
+    se confirman contra la colección
+    """
+
+    def __init__(self):
+        self.mongo_helper = MongoRegistryHelper().get("auth")
+        self.sync_interval = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "5"))
+        # Reconstrucción completa para descartar las revocaciones ya expiradas
+        self.rebuild_interval = float(
+            os.getenv("TOKEN_REVOCATION_REBUILD_INTERVAL", "3600")
+        )
+        self.capacity = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "100000"))
+        # Pasado este tiempo sin sincronizar el filtro no se considera fiable
+        self.max_staleness = self.sync_interval * 3
+
+        self._bloom = BloomFilterHelper(self.capacity)
+        self._synced_until: Optional[datetime] = None
+        self._last_sync = float("-inf")
+        self._next_rebuild = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "checks": 0,
+            "filter_negatives": 0,
+            "db_lookups": 0,
+            "false_positives": 0,
+            "sync_failures": 0,
+        }
+
+        LoggerHelper.info(f"{self.__class__.__name__} initialized")
+
+    def start(self) -> None:
+        """Arranca el hilo que sincroniza el filtro con ``revoked_tokens``"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="token-revocation-sync", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def revoke(self, jti: str, expires_at: datetime) -> bool:
+        """
+        Revoca un token hasta ``expires_at`` (su ``exp``; después ya no es
+        válido y el documento se elimina por TTL)
+
+        Returns:
+            True si se revocó ahora, False si ya estaba revocado (reutilización)
+        """
+        previous = self.mongo_helper.find_one_and_update(
+            REVOKED_TOKENS_COLLECTION,
+            {"_id": jti},
+            {"$setOnInsert": {"expires_at": expires_at}},
+            projection={"_id": 1},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        self._bloom.add(jti)
+        return previous is None
+
+    def revoke_family(self, family: str, lifetime: timedelta) -> bool:
+        """Revoca todos los tokens de una familia emitidos hasta ahora"""
+        return self.revoke(
+            FAMILY_PREFIX + family, datetime.now(timezone.utc) + lifetime
+        )
+
+    def is_revoked(self, jti: str, family: Optional[str] = None) -> bool:
+        self._count("checks")
+
+        ids = [jti] if family is None else [jti, FAMILY_PREFIX + family]
+        trusted = time.monotonic() - self._last_sync <= self.max_staleness
+        if trusted and not any(token_id in self._bloom for token_id in ids):
+            self._count("filter_negatives")
+            return False
+
+        self._count("db_lookups")
+        revoked = (
+            self.mongo_helper.find_one(
+                REVOKED_TOKENS_COLLECTION, {"_id": {"$in": ids}}, {"_id": 1}
+            )
+            is not None
+        )
+        if trusted and not revoked:
+            self._count("false_positives")
+        return revoked
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._sync_once()
+            self._stop.wait(self.sync_interval)
+
+    def _sync_once(self) -> None:
+        now = time.monotonic()
+        try:
+            synced_until = self._synced_until
+            if now >= self._next_rebuild or synced_until is None:
+                self._rebuild()
+                self._next_rebuild = now + self.rebuild_interval
+            else:
+                self._sync(synced_until)
+            self._last_sync = time.monotonic()
+        except Exception as e:
+            # Cualquier fallo se reintenta: el hilo no debe terminar. Mientras
+            # tanto el filtro deja de ser fiable y se consulta MongoDB
+            self._count("sync_failures")
+            LoggerHelper.error(f"No se pudieron sincronizar las revocaciones: {e}")
+
+    def _sync(self, synced_until: datetime) -> None:
+        revoked = self.mongo_helper.find_many(
+            REVOKED_TOKENS_COLLECTION,
+            {"created_at": {"$gte": synced_until - SYNC_OVERLAP}},
+            {"created_at": 1},
+            sort=[("created_at", ASCENDING)],
+        )
+        for document in revoked:
+            self._bloom.add(document["_id"])
+            synced_until = max(synced_until, document["created_at"])
+        self._synced_until = synced_until
+
+    def _rebuild(self) -> None:
+        revoked = self.mongo_helper.find_many(
+            REVOKED_TOKENS_COLLECTION, {}, {"created_at": 1}
+        )
+        # Si las revocaciones vigentes superan la capacidad se duplica el filtro
+        bloom = BloomFilterHelper(max(self.capacity, len(revoked) * 2))
+        bloom.update(document["_id"] for document in revoked)
+        synced_until = max(
+            (document["created_at"] for document in revoked),
+            default=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
+        self._bloom, self._synced_until = bloom, synced_until
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["filter_entries"] = self._bloom.count
+        stats["filter_capacity"] = self._bloom.capacity
+        stats["seconds_since_sync"] = (
+            round(time.monotonic() - self._last_sync, 3)
+            if self._last_sync > float("-inf")
+            else None
+        )
+        return stats
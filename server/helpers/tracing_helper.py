@@ -0,0 +1,459 @@
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from flask import Flask, g, request
+from graphql import ExecutionContext, parse, validate
+
+from server.decorators.singleton_decorator import singleton
+from server.helpers.logger_helper import LoggerHelper
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_PATTERN = re.compile(
+    r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+REQUEST_ID_PATTERN = re.compile(r"^[\w.:/=+-]{1,128}$")
+HEX_TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# SpanKind de OTLP
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_ERROR = 2
+
+# Span activo del contexto actual; None si la petición no se muestrea
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """Operación con tiempos de inicio y fin dentro de una traza"""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "kind",
+        "attributes",
+        "start_time",
+        "end_time",
+        "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_span_id: Optional[str] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: Any) -> None:
+        # GraphQLError.message no incluye la ubicación en el documento
+        self.error = getattr(error, "message", None) or str(error)
+
+    def __repr__(self) -> str:
+        return f"Span(name={self.name!r}, span_id={self.span_id!r})"
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    # bool antes que int: bool es subclase de int
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    result = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {},
+    }
+    if span.parent_span_id:
+        result["parentSpanId"] = span.parent_span_id
+    if span.error is not None:
+        result["status"] = {"code": STATUS_CODE_ERROR, "message": span.error}
+    return result
+
+
+class SpanExporter:
+    """Destino de los spans terminados; TracingHelper lo llama desde su hilo"""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """
+    Escribe cada lote como una línea JSON con la forma de un
+    ExportTraceServiceRequest de OTLP (la misma que el file exporter del
+    OpenTelemetry Collector), de modo que el receptor ``otlpjsonfile`` u otras
+    herramientas OTLP pueden leer el fichero directamente
+    """
+
+    def __init__(self, path: str, resource_attributes: Dict[str, Any]):
+        self.path = path
+        self._resource = {"attributes": _otlp_attributes(resource_attributes)}
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": self._resource,
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": "server.tracing"},
+                                "spans": [_otlp_span(span) for span in spans],
+                            }
+                        ],
+                    }
+                ]
+            },
+            separators=(",", ":"),
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class _TracedExecutionContext:
+    """Mixin que añade el span ``graphql.execute`` a un ExecutionContext"""
+
+    def execute_operation(self, operation, root_value):
+        with TracingHelper().span(
+            "graphql.execute",
+            {"graphql.operation.type": operation.operation.value},
+        ):
+            return super().execute_operation(operation, root_value)
+
+
+def _resolver_middleware(next_, source, info, **kwargs):
+    # graphql-core solo acepta funciones u objetos con ``resolve`` como middleware.
+    # Los campos sin resolver propio (lectura de atributos) no generan span
+    if info.parent_type.fields[info.field_name].resolve is None:
+        return next_(source, info, **kwargs)
+    with TracingHelper().span(
+        f"resolve {info.parent_type.name}.{info.field_name}",
+        {
+            "graphql.field.name": info.field_name,
+            "graphql.field.path": ".".join(map(str, info.path.as_list())),
+        },
+    ):
+        return next_(source, info, **kwargs)
+
+
+@singleton
+class TracingHelper:
+    """
+    Trazas por petición (opcional: TRACING_ENABLED=true).
+
+    Cada petición lleva un request id (cabecera X-Request-ID o uno generado)
+    que se devuelve en la respuesta. La decisión de muestreo se toma al
+    empezar la petición (head-based): se respeta la de un ``traceparent``
+    entrante y si no hay se muestrea con probabilidad TRACING_SAMPLE_RATE.
+    En las peticiones muestreadas se registran spans anidados (parse,
+    validate, execute, cada resolver, cada comando de MongoDB, bcrypt y el
+    envío de correo) que se exportan por lotes desde un hilo aparte; en las
+    demás, ``span()`` no hace nada.
+
+    El exportador por defecto (TRACING_EXPORTER=jsonl) escribe en
+    TRACING_JSONL_PATH; set_exporter() permite usar otro
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+        self.sample_rate = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+        self.service_name = os.getenv("TRACING_SERVICE_NAME", "flask-graphql")
+        self.batch_size = int(os.getenv("TRACING_BATCH_SIZE", "512"))
+        self.export_interval = float(os.getenv("TRACING_EXPORT_INTERVAL_S", "1"))
+        self._queue: "queue.Queue[Span]" = queue.Queue(
+            maxsize=int(os.getenv("TRACING_MAX_QUEUE_SIZE", "4096"))
+        )
+        self._exporter: Optional[SpanExporter] = None
+        self._traced_contexts: Dict[type, type] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "traces_started": 0,
+            "traces_sampled": 0,
+            "spans_exported": 0,
+            "spans_dropped": 0,
+            "export_errors": 0,
+        }
+
+        if self.enabled:
+            exporter = os.getenv("TRACING_EXPORTER", "jsonl").lower()
+            if exporter == "jsonl":
+                self.set_exporter(
+                    JsonlSpanExporter(
+                        os.getenv("TRACING_JSONL_PATH", "traces.jsonl"),
+                        {"service.name": self.service_name},
+                    )
+                )
+            elif exporter != "none":
+                raise ValueError(f"TRACING_EXPORTER desconocido: {exporter}")
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def set_exporter(self, exporter: Optional[SpanExporter]) -> None:
+        """Sustituye el exportador (None descarta los spans)"""
+        previous, self._exporter = self._exporter, exporter
+        if previous is not None:
+            previous.shutdown()
+        if exporter is not None and self._thread is None:
+            self._thread = threading.Thread(
+                target=self._export_loop, name="tracing-exporter", daemon=True
+            )
+            self._thread.start()
+
+    def init_app(self, app: Flask) -> None:
+        app.before_request(self._start_request)
+        app.after_request(self._finish_response)
+        app.teardown_request(self._teardown_request)
+        LoggerHelper.info(
+            f"{self.__class__.__name__} initialized "
+            f"(tracing {'enabled' if self.enabled else 'disabled'})"
+        )
+
+    # --- Petición -----------------------------------------------------------
+
+    def _start_request(self) -> None:
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        g.request_id = request_id
+
+        root = None
+        if self.enabled:
+            root = self._start_trace(request_id)
+        # Siempre se fija: el contexto del hilo se reutiliza entre peticiones
+        _current_span.set(root)
+
+    def _start_trace(self, request_id: str) -> Optional[Span]:
+        self._count("traces_started")
+        parent_span_id = None
+        match = TRACEPARENT_PATTERN.match(request.headers.get(TRACEPARENT_HEADER, ""))
+        if match:
+            trace_id, parent_span_id, flags = match.groups()
+            sampled = int(flags, 16) & 1 == 1
+        else:
+            # El request id generado sirve como trace id y permite buscar la
+            # traza a partir de la cabecera de la respuesta
+            trace_id = (
+                request_id
+                if HEX_TRACE_ID_PATTERN.match(request_id)
+                else uuid.uuid4().hex
+            )
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            return None
+
+        self._count("traces_sampled")
+        return Span(
+            f"{request.method} {request.path}",
+            trace_id,
+            parent_span_id,
+            SPAN_KIND_SERVER,
+            {
+                "http.request.method": request.method,
+                "url.path": request.path,
+                "http.request_id": request_id,
+            },
+        )
+
+    def _finish_response(self, response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        root = _current_span.get()
+        if root is not None:
+            root.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.set_error(f"HTTP {response.status_code}")
+        return response
+
+    def _teardown_request(self, error: Optional[BaseException]) -> None:
+        root = _current_span.get()
+        if root is None:
+            return
+        if error is not None:
+            root.set_error(error)
+        _current_span.set(None)
+        self.end_span(root)
+
+    # --- Spans --------------------------------------------------------------
+
+    def is_sampled(self) -> bool:
+        return _current_span.get() is not None
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: Optional[Span] = None,
+    ) -> Optional[Span]:
+        """
+        Span hijo de ``parent`` (o del activo) sin activarlo; hay que cerrarlo
+        con end_span(). None si la petición no se muestrea
+        """
+        parent = parent or _current_span.get()
+        if parent is None:
+            return None
+        return Span(name, parent.trace_id, parent.span_id, kind, attributes)
+
+    def end_span(self, span: Span) -> None:
+        span.end_time = time.time_ns()
+        if self._exporter is None:
+            return
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._count("spans_dropped")
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        kind: int = SPAN_KIND_INTERNAL,
+        parent: Optional[Span] = None,
+    ):
+        """
+        Span activo mientras dura el bloque; los que se abran dentro son sus
+        hijos. ``parent`` permite continuar la traza desde otro hilo
+        """
+        span = self.start_span(name, attributes, kind, parent)
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end_span(span)
+
+    # --- GraphQL ------------------------------------------------------------
+
+    def graphql_options(self, execution_context_class=None) -> Dict[str, Any]:
+        """
+        Argumentos de graphql_sync: en peticiones muestreadas añaden los spans
+        de parse, validate, execute y de cada resolver
+        """
+        if not self.is_sampled():
+            return {"execution_context_class": execution_context_class}
+        return {
+            "execution_context_class": self._traced_execution_context(
+                execution_context_class or ExecutionContext
+            ),
+            "query_parser": self._parse_query,
+            "query_validator": self._validate_query,
+            "middleware": [_resolver_middleware],
+        }
+
+    def _traced_execution_context(self, base: type) -> type:
+        traced = self._traced_contexts.get(base)
+        if traced is None:
+            traced = type(f"Traced{base.__name__}", (_TracedExecutionContext, base), {})
+            self._traced_contexts[base] = traced
+        return traced
+
+    def _parse_query(self, context_value: Any, data: Dict[str, Any]):
+        with self.span("graphql.parse"):
+            return parse(data["query"])
+
+    def _validate_query(self, schema, document_ast, *args, **kwargs):
+        with self.span("graphql.validate"):
+            return validate(schema, document_ast, *args, **kwargs)
+
+    # --- Exportación --------------------------------------------------------
+
+    def _export_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.export_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            exporter = self._exporter
+            if exporter is None:
+                continue
+            try:
+                exporter.export(batch)
+                self._count("spans_exported", len(batch))
+            except Exception as e:
+                self._count("export_errors")
+                LoggerHelper.error(f"Error exportando {len(batch)} spans: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update(
+            enabled=self.enabled,
+            sample_rate=self.sample_rate,
+            queued_spans=self._queue.qsize(),
+        )
+        return stats
@@ -0,0 +1,322 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from server.constants.mongo_constants import REPLICA_MISS
+from server.decorators.singleton_decorator import singleton
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.logger_helper import LoggerHelper
+from server.helpers.mongo_helper import MongoHelper
+
+USERS_COLLECTION = "users"
+REPLICA_STATE_COLLECTION = "replica_state"
+# Pools cuyas lecturas de users se sirven desde la réplica
+REPLICA_READ_POOLS = ("default", "auth")
+# ChangeStreamHistoryLost / ChangeStreamFatalError: el token ya no es válido
+RESUME_FAILED_CODES = {280, 286}
+# Espera máxima de cada getMore del stream; acota cuánto tarda en notarse
+# que la réplica está al día
+POLL_MAX_AWAIT_MS = 1000
+
+
+def _project(
+    document: Dict[str, Any], projection: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Proyección de inclusión o exclusión sobre campos de primer nivel"""
+    if not projection:
+        return dict(document)
+    included = [
+        field for field, value in projection.items() if value and field != "_id"
+    ]
+    if included:
+        result = {"_id": document["_id"]} if projection.get("_id", 1) else {}
+        result.update(
+            (field, document[field]) for field in included if field in document
+        )
+        return result
+    return {
+        field: value for field, value in document.items() if projection.get(field, 1)
+    }
+
+
+@singleton
+class UsersReplicaHelper:
+    """
+    Réplica en memoria de la colección ``users`` indexada por ``_id`` y
+    ``email`` (opcional: USERS_REPLICA_ENABLED=true).
+
+    Al arrancar abre un change stream, carga la colección completa y aplica
+    los cambios en un hilo en segundo plano; el resume token se guarda en
+    ``replica_state`` para retomar el stream tras un corte sin recargar.
+    MongoHelper le pasa las lecturas por ``_id``/``email`` y los listados sin
+    filtro; si el retraso supera USERS_REPLICA_MAX_LAG_S (o el stream está
+    caído) esas lecturas vuelven a ir a MongoDB.
+
+    Las escrituras de este proceso (ver MongoHelper.set_read_replica) dejan de
+    servirse desde memoria hasta que el stream las ha aplicado, de modo que
+    un login justo después del registro ve al usuario nuevo
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("USERS_REPLICA_ENABLED", "false").lower() == "true"
+        self.max_lag = float(os.getenv("USERS_REPLICA_MAX_LAG_S", "5"))
+        self.checkpoint_interval = float(os.getenv("USERS_REPLICA_CHECKPOINT_S", "10"))
+        self.retry_interval = float(os.getenv("USERS_REPLICA_RETRY_S", "5"))
+        self.mongo_helper: Optional[MongoHelper] = None
+
+        self._by_id: Dict[Any, Dict[str, Any]] = {}
+        self._by_email: Dict[str, Any] = {}
+        self._loaded = False
+        self._event_lag = 0.0
+        self._last_poll = float("-inf")
+        self._caught_up_at = float("-inf")
+        self._local_write_at = float("-inf")
+        self._resume_token: Optional[Mapping[str, Any]] = None
+        self._saved_token: Optional[Mapping[str, Any]] = None
+        self._next_checkpoint = 0.0
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "served_reads": 0,
+            "fallback_reads": 0,
+            "events_applied": 0,
+            "resyncs": 0,
+            "stream_errors": 0,
+        }
+
+    def _count(self, stat: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[stat] += amount
+
+    def start(self, mongo_registry) -> None:
+        """Conecta la réplica a los pools y arranca el hilo del change stream"""
+        if not self.enabled or self._thread is not None:
+            return
+        self.mongo_helper = mongo_registry.get("replica")
+        for pool in REPLICA_READ_POOLS:
+            mongo_registry.get(pool).set_read_replica(USERS_COLLECTION, self)
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self.mongo_helper,),
+            name="users-replica",
+            daemon=True,
+        )
+        self._thread.start()
+        LoggerHelper.info(f"{self.__class__.__name__} initialized")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # --- Lecturas ---------------------------------------------------------
+
+    def lag_seconds(self) -> Optional[float]:
+        """Retraso estimado respecto a MongoDB; None si aún no hay datos"""
+        if not self._loaded:
+            return None
+        return max(self._event_lag, time.monotonic() - self._last_poll)
+
+    def _serving(self) -> bool:
+        lag = self.lag_seconds()
+        if (
+            lag is not None
+            and lag <= self.max_lag
+            and self._caught_up_at >= self._local_write_at
+        ):
+            return True
+        self._count("fallback_reads")
+        return False
+
+    def find_one(
+        self, filter_: Dict[str, Any], projection: Optional[Dict[str, Any]] = None
+    ):
+        """Documento por ``_id`` o ``email`` exactos; REPLICA_MISS si no aplica"""
+        if len(filter_) != 1:
+            return REPLICA_MISS
+        ((field, value),) = filter_.items()
+        if field not in ("_id", "email") or isinstance(value, dict):
+            return REPLICA_MISS
+        if not self._serving():
+            return REPLICA_MISS
+
+        if field == "email":
+            value = self._by_email.get(value)
+        document = self._by_id.get(value)
+        self._count("served_reads")
+        return _project(document, projection) if document is not None else None
+
+    def find_many(
+        self,
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+    ) -> Union[List[Dict[str, Any]], object]:
+        """Listado completo (sin filtro ni orden); REPLICA_MISS si va con retraso"""
+        if not self._serving():
+            return REPLICA_MISS
+        with self._write_lock:
+            documents = list(self._by_id.values())
+        documents = documents[skip : skip + limit if limit else None]
+        self._count("served_reads")
+        return [_project(document, projection) for document in documents]
+
+    def note_local_write(self) -> None:
+        """Una escritura de este proceso: no servir hasta que llegue por el stream"""
+        self._local_write_at = time.monotonic()
+
+    # --- Replicación ------------------------------------------------------
+
+    def _run(self, mongo_helper: MongoHelper) -> None:
+        self._resume_token = self._load_resume_token(mongo_helper)
+        while not self._stop.is_set():
+            try:
+                self._follow(mongo_helper)
+            except OperationFailure as e:
+                self._count("stream_errors")
+                if e.code in RESUME_FAILED_CODES:
+                    # El oplog ya no contiene el token: recarga completa
+                    LoggerHelper.error(
+                        "Réplica de users: resume token caducado, recargando"
+                    )
+                    self._resume_token = None
+                else:
+                    LoggerHelper.error(f"Réplica de users: error en el stream: {e}")
+            except Exception as e:
+                # Cualquier fallo se reintenta: el hilo no debe terminar
+                self._count("stream_errors")
+                LoggerHelper.error(f"Réplica de users: error en el stream: {e}")
+            self._stop.wait(self.retry_interval)
+
+    def _follow(self, mongo_helper: MongoHelper) -> None:
+        collection = mongo_helper.get_collection(USERS_COLLECTION)
+        with collection.watch(
+            full_document="updateLookup",
+            resume_after=self._resume_token,
+            max_await_time_ms=POLL_MAX_AWAIT_MS,
+        ) as stream:
+            # La carga va después de abrir el stream: los cambios que ocurran
+            # durante la carga llegan por el stream y se aplican de nuevo
+            if self._resume_token is None or not self._loaded:
+                self._load(collection)
+
+            while stream.alive and not self._stop.is_set():
+                poll_started = time.monotonic()
+                change = stream.try_next()
+                if change is None:
+                    # Sin cambios pendientes: todo lo anterior ya está aplicado
+                    self._event_lag = 0.0
+                    self._caught_up_at = poll_started
+                elif not self._apply(change):
+                    self._resume_token = None
+                    return
+                self._last_poll = time.monotonic()
+                self._resume_token = stream.resume_token
+                self._checkpoint(mongo_helper)
+
+    def _load(self, collection) -> None:
+        started = time.monotonic()
+        by_id, by_email = {}, {}
+        for document in collection.find({}):
+            by_id[document["_id"]] = document
+            if "email" in document:
+                by_email[document["email"]] = document["_id"]
+        with self._write_lock:
+            self._by_id, self._by_email = by_id, by_email
+        self._loaded = True
+        self._last_poll = time.monotonic()
+        self._count("resyncs")
+        LoggerHelper.info(
+            f"Réplica de users cargada: {len(by_id)} documentos en "
+            f"{(time.monotonic() - started) * 1000:.0f} ms"
+        )
+
+    def _apply(self, change: Dict[str, Any]) -> bool:
+        """Aplica un evento; False si el stream queda invalidado (recargar)"""
+        operation = change["operationType"]
+        if operation in ("insert", "update", "replace"):
+            document = change.get("fullDocument")
+            if document is None:
+                # Borrado antes del lookup: llegará su evento delete
+                self._remove(change["documentKey"]["_id"])
+            else:
+                self._put(document)
+        elif operation == "delete":
+            self._remove(change["documentKey"]["_id"])
+        elif operation in ("drop", "rename", "dropDatabase", "invalidate"):
+            LoggerHelper.error(f"Réplica de users: evento {operation}, recargando")
+            return False
+
+        wall_time = change.get("wallTime")
+        if wall_time is not None:
+            if wall_time.tzinfo is None:
+                wall_time = wall_time.replace(tzinfo=timezone.utc)
+            lag = (datetime.now(timezone.utc) - wall_time).total_seconds()
+        else:
+            lag = time.time() - change["clusterTime"].time
+        self._event_lag = max(0.0, lag)
+        self._count("events_applied")
+        return True
+
+    def _put(self, document: Dict[str, Any]) -> None:
+        with self._write_lock:
+            previous = self._by_id.get(document["_id"])
+            self._by_id[document["_id"]] = document
+            previous_email = previous.get("email") if previous is not None else None
+            if previous_email is not None and previous_email != document.get("email"):
+                self._by_email.pop(previous_email, None)
+            if "email" in document:
+                self._by_email[document["email"]] = document["_id"]
+
+    def _remove(self, document_id: Any) -> None:
+        with self._write_lock:
+            previous = self._by_id.pop(document_id, None)
+            if previous is not None and previous.get("email") is not None:
+                self._by_email.pop(previous["email"], None)
+
+    def _load_resume_token(
+        self, mongo_helper: MongoHelper
+    ) -> Optional[Mapping[str, Any]]:
+        try:
+            state = mongo_helper.find_one(
+                REPLICA_STATE_COLLECTION, {"_id": USERS_COLLECTION}
+            )
+        except (PyMongoError, CustomGraphQLExceptionHelper) as e:
+            LoggerHelper.error(f"Réplica de users: no se pudo leer el token: {e}")
+            return None
+        self._saved_token = state and state.get("resume_token")
+        return self._saved_token
+
+    def _checkpoint(self, mongo_helper: MongoHelper) -> None:
+        now = time.monotonic()
+        if now < self._next_checkpoint or self._resume_token == self._saved_token:
+            return
+        self._next_checkpoint = now + self.checkpoint_interval
+        try:
+            mongo_helper.update_one(
+                REPLICA_STATE_COLLECTION,
+                {"_id": USERS_COLLECTION},
+                {"$set": {"resume_token": self._resume_token}},
+                upsert=True,
+            )
+            self._saved_token = self._resume_token
+        except (PyMongoError, CustomGraphQLExceptionHelper) as e:
+            LoggerHelper.error(f"Réplica de users: no se pudo guardar el token: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        lag = self.lag_seconds()
+        stats.update(
+            enabled=self.enabled,
+            loaded=self._loaded,
+            documents=len(self._by_id),
+            lag_seconds=round(lag, 3) if lag is not None else None,
+            max_lag_seconds=self.max_lag,
+        )
+        return stats
@@ -1,4 +1,6 @@
 import re
+from datetime import datetime
+from typing import Any, Mapping
 from pydantic import (
     BaseModel,
     Field,
@@ -8,6 +10,7 @@ from pydantic import (
     EmailStr,
 )
 
+from server.enums.http_error_code_enum import HTTPErrorCode
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
 from server.utils.auth_utils import hash_password
 
@@ -56,3 +59,65 @@ class UpdateUserModel(BaseModel):
     lastname: str = Field(..., description="User lastname", min_length=3)
     email: EmailStr | None = Field(None, description="User email")
     isAdmin: bool | None = Field(None, description="Is user admin")
+
+
+class UserFilterModel(BaseModel):
+    isAdmin: bool | None = Field(None, description="Is user admin")
+    createdAfter: datetime | None = Field(None, description="Created after date")
+    emailPrefix: str | None = Field(None, description="Email prefix", min_length=1)
+
+    @field_validator("emailPrefix", mode="before")
+    @classmethod
+    def trim_email_prefix(cls, v):
+        return v.strip() if isinstance(v, str) else v
+
+    @field_validator("createdAfter", mode="before")
+    @classmethod
+    def parse_created_after(cls, v):
+        if v is None or isinstance(v, datetime):
+            return v
+        try:
+            return datetime.fromisoformat(v)
+        except (TypeError, ValueError):
+            raise CustomGraphQLExceptionHelper(
+                "createdAfter debe ser una fecha ISO-8601",
+                HTTPErrorCode.BAD_REQUEST,
+                details={"field": "createdAfter", "value": v},
+            )
+
+
+class User:
+    """
+    Usuario tal y como lo expone el tipo ``User`` del schema. Registro con
+    __slots__ (una fracción de lo que ocupa un dict) del que el resolver por
+    defecto lee los campos con getattr
+    """
+
+    __slots__ = ("id", "name", "lastname", "email", "isAdmin")
+
+    # Campos necesarios para construirlo; nunca incluye la contraseña
+    PROJECTION = {"name": 1, "lastname": 1, "email": 1, "isAdmin": 1}
+
+    def __init__(
+        self, id: str, name: str, lastname: str, email: str, isAdmin: bool = False
+    ):
+        self.id = id
+        self.name = name
+        self.lastname = lastname
+        self.email = email
+        self.isAdmin = isAdmin
+
+    @classmethod
+    def from_document(cls, document: Mapping[str, Any]) -> "User":
+        """Desde un documento de ``users`` (cualquier Mapping)"""
+        return cls(
+            str(document["_id"]),
+            document["name"],
+            document["lastname"],
+            document["email"],
+            # Documentos antiguos pueden no tener isAdmin
+            document.get("isAdmin", False),
+        )
+
+    def __repr__(self) -> str:
+        return f"User(id={self.id!r}, email={self.email!r})"
@@ -1,6 +1,8 @@
 from ariadne import load_schema_from_path, make_executable_schema
 from pathlib import Path
 
+from server.helpers.timeout_directive_helper import TimeoutDirectiveHelper
+
 from .hello.resolver import HelloResolver
 from .users.resolver import UserResolver
 from .auth.resolver import AuthResolver
@@ -21,4 +23,13 @@ all_resolvers.extend(__hello_resolver.get_resolvers())
 all_resolvers.extend(__user_resolver.get_resolvers())
 all_resolvers.extend(__auth_resolver.get_resolvers())
 
-schema = make_executable_schema(type_defs, *all_resolvers)
+schema = make_executable_schema(
+    type_defs, *all_resolvers, directives={"timeout": TimeoutDirectiveHelper}
+)
+
+# El argumento ``filter`` llega a los resolvers como ``filter_`` (igual que en
+# MongoHelper y sin ocultar el builtin)
+query_type = schema.query_type
+assert query_type is not None
+for field_name in ("users", "usersCount"):
+    query_type.fields[field_name].args["filter"].out_name = "filter_"
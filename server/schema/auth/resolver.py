@@ -1,31 +1,36 @@
 import os
+from datetime import datetime, timedelta, timezone
+
 from ariadne import QueryType, MutationType
 from bson import ObjectId
 from flask import g, url_for
 from itsdangerous import URLSafeTimedSerializer
-from pymongo import ASCENDING
 
+from server.decorators.rate_limit_decorator import rate_limit
 from server.decorators.require_token_decorator import require_token
+from server.enums.http_error_code_enum import HTTPErrorCode
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
 from server.helpers.logger_helper import LoggerHelper
 from server.helpers.mail_helper import MailHelper
+from server.helpers.token_revocation_helper import TokenRevocationHelper
 from server.utils.auth_utils import (
+    REFRESH_TOKEN_EXPIRES_MINUTES,
     verify_password,
     create_token,
     create_refresh_token,
     verify_refresh_token,
 )
-from server.models.user_model import RegisterModel
-from server.helpers.mongo_helper import MongoHelper
+from server.models.user_model import RegisterModel, User
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
 
 
 class AuthResolver:
     def __init__(self):
         self.__query = QueryType()
         self.__mutation = MutationType()
-        self.__mongo_helper = MongoHelper(allowed_collections=["users"])
+        self.__mongo_helper = MongoRegistryHelper().get("auth")
         self.mail_helper = MailHelper()
-        self._create_indexes()
+        self.token_revocation = TokenRevocationHelper()
         self._bind_mutations()
         self._bind_queries()
         self.serializer = URLSafeTimedSerializer(os.getenv("SECRET_KEY", "SECRET_KEY"))
@@ -38,22 +43,11 @@ class AuthResolver:
         self.__mutation.set_field("register", self.resolve_register)
         self.__mutation.set_field("login", self.resolve_login)
         self.__mutation.set_field("refreshToken", self.resolve_refresh_token)
+        self.__mutation.set_field("logout", self.resolve_logout)
         self.__mutation.set_field("recoverPassword", self.resolve_recover_password)
 
-    def _create_indexes(self):
-        self.__mongo_helper.create_index(
-            "users", [("email", ASCENDING)], name="UQ_EMAIL_IDX", unique=True
-        )
-
-    def user_to_dict(self, user):
-        return {
-            "id": str(user["_id"]),
-            "name": user["name"],
-            "lastname": user["lastname"],
-            "email": user["email"],
-            "isAdmin": user.get("isAdmin", False),
-        }
-
+    # bcrypt hace que registro y login sean caros en CPU: límites por IP
+    @rate_limit(limit=5, period=60, key_by=("ip", "operation"))
     def resolve_register(self, _, info, input):
         model = RegisterModel(**input)
         user_data = model.model_dump()
@@ -66,9 +60,10 @@ class AuthResolver:
         return {
             "accessToken": access_token,
             "refreshToken": refresh_token,
-            "user": self.user_to_dict(user_data),
+            "user": User.from_document(user_data),
         }
 
+    @rate_limit(limit=10, period=60, key_by=("ip", "operation"))
     def resolve_login(self, _, info, input):
         user = self.__mongo_helper.find_one("users", {"email": input["email"]})
         if not user or not verify_password(input["password"], user["password"]):
@@ -80,23 +75,57 @@ class AuthResolver:
         return {
             "accessToken": access_token,
             "refreshToken": refresh_token,
-            "user": self.user_to_dict(user),
+            "user": User.from_document(user),
         }
 
     @require_token
     def resolve_profile(self, _, info):
-        return self.user_to_dict(g.current_user)
+        return User.from_document(g.current_user)
 
+    # Sin "user": al refrescar, el access token suele estar caducado o ausente
+    @rate_limit(limit=30, period=60, key_by=("ip", "operation"))
     def resolve_refresh_token(self, _, info, refreshToken):
         LoggerHelper.info("Refrescando token...")
         payload = verify_refresh_token(refreshToken)
+        jti, family = payload["jti"], payload["fam"]
+
+        # Rotación: cada refresh token se usa una sola vez. Presentar uno ya
+        # usado indica que se ha filtrado: se revoca toda su familia
+        reused = self.token_revocation.is_revoked(jti, family)
+        if not reused:
+            # Revocación atómica: si otra petición lo usó antes, ya constaba
+            reused = not self.token_revocation.revoke(
+                jti, datetime.fromtimestamp(payload["exp"], timezone.utc)
+            )
+        if reused:
+            LoggerHelper.warning(f"Reutilización de refresh token (familia {family})")
+            self.token_revocation.revoke_family(
+                family, timedelta(minutes=REFRESH_TOKEN_EXPIRES_MINUTES)
+            )
+            raise CustomGraphQLExceptionHelper(
+                "Refresh token revocado", HTTPErrorCode.UNAUTHORIZED
+            )
+
         user = self.__mongo_helper.find_one("users", {"_id": ObjectId(payload["id"])})
         if not user:
             raise CustomGraphQLExceptionHelper("Usuario no encontrado")
 
         new_access_token = create_token({"id": str(user["_id"])})
-        return {"accessToken": new_access_token}
+        new_refresh_token = create_refresh_token(
+            {"id": str(user["_id"])}, family=family
+        )
+        return {"accessToken": new_access_token, "refreshToken": new_refresh_token}
+
+    def resolve_logout(self, _, info, refreshToken):
+        # Invalida la sesión completa: el token presentado y sus sucesores
+        payload = verify_refresh_token(refreshToken)
+        self.token_revocation.revoke_family(
+            payload["fam"], timedelta(minutes=REFRESH_TOKEN_EXPIRES_MINUTES)
+        )
+        return True
 
+    # Cada llamada puede enviar un correo SMTP
+    @rate_limit(limit=3, period=300, key_by=("ip", "operation"))
     def resolve_recover_password(self, _, info, email):
         user = self.__mongo_helper.find_one("users", {"email": email})
         if not user:
@@ -1,10 +1,26 @@
+import os
+from datetime import datetime, timedelta, timezone
+
 from ariadne import QueryType, MutationType
-from bson import ObjectId
+from bson import ObjectId, json_util
+from pymongo import ASCENDING, DESCENDING
+
+from server.constants.mongo_constants import CASE_INSENSITIVE_COLLATION
 from server.decorators.singleton_decorator import singleton
 from server.helpers.logger_helper import LoggerHelper
-from server.models.user_model import UpdateUserModel
-from server.helpers.mongo_helper import MongoHelper
+from server.models.user_model import UpdateUserModel, User, UserFilterModel
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+from server.helpers.ttl_cache_helper import TTLCacheHelper
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.utils.cursor_utils import decode_cursor, encode_cursor
+
+SEARCH_MAX_PAGE_SIZE = 100
+# Solo los campos del tipo User: nunca el hash de la contraseña
+USER_LIST_PROJECTION = User.PROJECTION
+
+USER_ORDER_FIELDS = {"CREATED_AT": "created_at", "NAME": "name", "EMAIL": "email"}
+SORT_DIRECTIONS = {"ASC": ASCENDING, "DESC": DESCENDING}
+STATS_MAX_DAYS = 366
 
 
 @singleton
@@ -12,57 +28,259 @@ class UserResolver:
     def __init__(self):
         self.query = QueryType()
         self.mutation = MutationType()
-        self.__mongo_helper = MongoHelper(allowed_collections=["users"])
+        mongo_registry = MongoRegistryHelper()
+        self.__mongo_helper = mongo_registry.get("default")
+        # Conteos y agregaciones en su propio pool para no competir con el CRUD
+        self.__reporting_mongo = mongo_registry.get("reporting")
+        # Conteos y estadísticas toleran unos segundos de desfase
+        self.__stats_cache = TTLCacheHelper(
+            float(os.getenv("USER_STATS_CACHE_TTL", "30"))
+        )
         self._bind_queries()
         self._bind_mutations()
         LoggerHelper.info(f"{self.__class__.__name__} initialized")
 
     def _bind_queries(self):
         self.query.set_field("users", self.resolve_users)
+        self.query.set_field("usersCount", self.resolve_users_count)
+        self.query.set_field("userStats", self.resolve_user_stats)
         self.query.set_field("user", self.resolve_user)
+        self.query.set_field("searchUsers", self.resolve_search_users)
 
     def _bind_mutations(self):
         self.mutation.set_field("updateUser", self.resolve_update_user)
         self.mutation.set_field("deleteUser", self.resolve_delete_user)
 
-    def user_to_dict(self, user):
+    def _build_users_query(self, filter_):
+        model = UserFilterModel(**(filter_ or {}))
+        query = {}
+        if model.isAdmin is not None:
+            # Documentos antiguos pueden no tener isAdmin: cuentan como no admin
+            query["isAdmin"] = True if model.isAdmin else {"$ne": True}
+        if model.createdAfter is not None:
+            query["created_at"] = {"$gt": model.createdAfter}
+        if model.emailPrefix:
+            query["email"] = {
+                "$gte": model.emailPrefix,
+                "$lt": model.emailPrefix + "\uffff",
+            }
+        return query
+
+    def _build_users_sort(self, orderBy):
+        if not orderBy:
+            return None
+        field = USER_ORDER_FIELDS[orderBy["field"]]
+        direction = SORT_DIRECTIONS[orderBy.get("direction") or "ASC"]
+        # _id desempata los valores repetidos: sin él skip/first pueden
+        # repetir o saltarse usuarios entre páginas
+        return [(field, direction), ("_id", direction)]
+
+    def _allows_blocking_sort(self, query, sort):
+        """
+        Combinaciones que ningún índice de MONGO_INDEXES resuelve en orden:
+        isAdmin=false ($ne son dos rangos) o un rango sobre un campo distinto
+        del de orden. El planificador puede elegir igualmente un índice que
+        ordene y filtrar en FETCH, pero no está garantizado
+        """
+        if not sort:
+            return False
+        sort_field = sort[0][0]
+        return isinstance(query.get("isAdmin"), dict) or any(
+            field != sort_field for field in query if field != "isAdmin"
+        )
+
+    def resolve_users(self, _, info, filter_=None, orderBy=None, first=None, skip=0):
+        if (first is not None and first < 0) or (skip or 0) < 0:
+            raise CustomGraphQLExceptionHelper("first y skip no pueden ser negativos")
+
+        query = self._build_users_query(filter_)
+        sort = self._build_users_sort(orderBy)
+        # Iterador sobre el cursor: con @stream los usuarios se envían según
+        # llegan de MongoDB en lugar de esperar a la lista completa
+        users = self.__mongo_helper.find_iter(
+            "users",
+            query,
+            USER_LIST_PROJECTION,
+            skip=skip or 0,
+            limit=first or 0,
+            sort=sort,
+            collation=CASE_INSENSITIVE_COLLATION,
+            allow_blocking_sort=self._allows_blocking_sort(query, sort),
+        )
+        # Cada dict decodificado se descarta al mapearlo: solo el registro
+        # sobrevive hasta que ariadne completa la lista
+        return (User.from_document(user) for user in users)
+
+    def _count_users(self, query, collation=CASE_INSENSITIVE_COLLATION):
+        key = ("count", json_util.dumps(query, sort_keys=True))
+        return self.__stats_cache.get_or_set(
+            key,
+            lambda: self.__reporting_mongo.count_documents(
+                "users", query, collation=collation
+            ),
+        )
+
+    def resolve_users_count(self, _, info, filter_=None):
+        return self._count_users(self._build_users_query(filter_))
+
+    def resolve_user_stats(self, _, info, days=30):
+        days = max(1, min(days, STATS_MAX_DAYS))
+        return self.__stats_cache.get_or_set(
+            ("stats", days), lambda: self._compute_user_stats(days)
+        )
+
+    def _compute_user_stats(self, days):
+        today = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        since = today - timedelta(days=days - 1)
+
+        roles = self.__reporting_mongo.aggregate(
+            "users",
+            [{"$group": {"_id": {"$eq": ["$isAdmin", True]}, "count": {"$sum": 1}}}],
+        )
+        # El $match inicial usa IDX_USERS_CREATED_AT_ID (misma collation)
+        signups = self.__reporting_mongo.aggregate(
+            "users",
+            [
+                {"$match": {"created_at": {"$gte": since}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "$dateToString": {
+                                "format": "%Y-%m-%d",
+                                "date": "$created_at",
+                            }
+                        },
+                        "count": {"$sum": 1},
+                    }
+                },
+            ],
+            collation=CASE_INSENSITIVE_COLLATION,
+        )
+
+        by_role = {row["_id"]: row["count"] for row in roles}
+        by_day = {row["_id"]: row["count"] for row in signups}
+        admins = by_role.get(True, 0)
+        non_admins = by_role.get(False, 0)
+        signups_per_day = []
+        for offset in range(days):
+            date = (since + timedelta(days=offset)).strftime("%Y-%m-%d")
+            signups_per_day.append({"date": date, "count": by_day.get(date, 0)})
+
         return {
-            "id": str(user["_id"]),
-            "name": user["name"],
-            "lastname": user["lastname"],
-            "email": user["email"],
-            "isAdmin": user.get("isAdmin", False),
+            "total": admins + non_admins,
+            "admins": admins,
+            "nonAdmins": non_admins,
+            "signupsPerDay": signups_per_day,
         }
 
-    def resolve_users(self, _, info):
-        users = self.__mongo_helper.find_many("users", {})
-        return [self.user_to_dict(user) for user in users]
-
     def resolve_user(self, _, info, id):
-        user = self.__mongo_helper.find_one("users", {"_id": ObjectId(id)})
+        user = self.__mongo_helper.find_one(
+            "users", {"_id": ObjectId(id)}, USER_LIST_PROJECTION
+        )
         if not user:
             return None
-        return self.user_to_dict(user)
+        return User.from_document(user)
+
+    def resolve_search_users(self, _, info, query, first=20, after=None, mode="PREFIX"):
+        query = query.strip()
+        if not query:
+            raise CustomGraphQLExceptionHelper("El texto de búsqueda es obligatorio")
+        first = max(1, min(first, SEARCH_MAX_PAGE_SIZE))
+
+        if mode == "TEXT":
+            return self._search_users_by_text(query, first, after)
+        return self._search_users_by_prefix(query, first, after)
+
+    def _search_users_by_prefix(self, query, first, after):
+        # Rango [prefijo, prefijo + U+FFFF) en vez de $regex: con la collation
+        # del índice se resuelve como IXSCAN insensible a mayúsculas
+        bounds = {"$gte": query, "$lt": query + "\uffff"}
+        filter_ = {"$or": [{"email": bounds}, {"name": bounds}]}
+        if after:
+            last_id = decode_cursor(after)
+            if not ObjectId.is_valid(last_id):
+                raise CustomGraphQLExceptionHelper("Cursor de paginación inválido")
+            filter_["_id"] = {"$gt": ObjectId(last_id)}
+
+        users = self.__mongo_helper.find_many(
+            "users",
+            filter_,
+            USER_LIST_PROJECTION,
+            limit=first + 1,
+            sort=[("_id", ASCENDING)],
+            collation=CASE_INSENSITIVE_COLLATION,
+            # El $or combina dos IXSCAN acotados; ordenar ese resultado es barato
+            allow_blocking_sort=True,
+        )
+        users = [User.from_document(user) for user in users]
+        end_cursor = users[:first][-1].id if users else None
+        filter_.pop("_id", None)
+        return self._to_connection(users, first, end_cursor, filter_)
+
+    def _search_users_by_text(self, query, first, after):
+        offset = 0
+        if after:
+            offset = decode_cursor(after)
+            if not offset.isdigit():
+                raise CustomGraphQLExceptionHelper("Cursor de paginación inválido")
+            offset = int(offset)
+
+        users = self.__mongo_helper.text_search(
+            "users",
+            query,
+            projection=USER_LIST_PROJECTION,
+            skip=offset,
+            limit=first + 1,
+        )
+        users = [User.from_document(user) for user in users]
+        end_cursor = str(offset + min(len(users), first)) if users else None
+        # $text no admite collation distinta de la simple
+        return self._to_connection(
+            users, first, end_cursor, {"$text": {"$search": query}}, None
+        )
+
+    def _to_connection(
+        self,
+        users,
+        first,
+        end_cursor,
+        count_query,
+        count_collation=CASE_INSENSITIVE_COLLATION,
+    ):
+        return {
+            # El resolver por defecto invoca los callables: solo se cuenta si
+            # el cliente pide totalCount
+            "totalCount": lambda info: self._count_users(count_query, count_collation),
+            "nodes": users[:first],
+            "pageInfo": {
+                "endCursor": encode_cursor(end_cursor) if end_cursor else None,
+                "hasNextPage": len(users) > first,
+            },
+        }
 
     def resolve_update_user(self, _, info, input):
         user_id = ObjectId(input["id"])
         model = UpdateUserModel(**input)
         update_data = model.model_dump(exclude_unset=True)
 
-        user = self.__mongo_helper.find_one("users", {"_id": user_id})
+        # Un solo round-trip: actualiza y devuelve el documento resultante
+        user = self.__mongo_helper.find_one_and_update(
+            "users",
+            {"_id": user_id},
+            {"$set": update_data},
+            projection=USER_LIST_PROJECTION,
+        )
         if not user:
             raise CustomGraphQLExceptionHelper("Usuario no encontrado")
-        if update_data:
-            self.__mongo_helper.update_one(
-                "users", {"_id": user_id}, {"$set": update_data}
-            )
-
-        user = self.__mongo_helper.find_one("users", {"_id": user_id})
-        return self.user_to_dict(user)
+        return User.from_document(user)
 
     def resolve_delete_user(self, _, info, id):
-        result = self.__mongo_helper.delete_one("users", {"_id": ObjectId(id)})
-        return result["deleted_count"] == 1
+        deleted = self.__mongo_helper.find_one_and_delete(
+            "users", {"_id": ObjectId(id)}, projection={"_id": 1}
+        )
+        return deleted is not None
 
     def get_resolvers(self):
         return [self.query, self.mutation]
@@ -0,0 +1,23 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.mongo_registry_helper import MongoRegistryHelper
+from server.utils.auth_utils import verify_token
+
+
+def is_admin(authorization: str) -> bool:
+    """True si la cabecera Authorization es de un usuario administrador"""
+    token = authorization.replace("Bearer ", "").strip()
+    if not token:
+        return False
+    try:
+        user_id = ObjectId(verify_token(token).get("id"))
+    except (CustomGraphQLExceptionHelper, InvalidId, TypeError):
+        return False
+    user = (
+        MongoRegistryHelper()
+        .get("auth")
+        .find_one("users", {"_id": user_id}, {"isAdmin": 1})
+    )
+    return bool(user and user.get("isAdmin"))
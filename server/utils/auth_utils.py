@@ -1,22 +1,27 @@
 import os
-from typing import Any, Dict
+import uuid
+from typing import Any, Dict, Optional
 import bcrypt
 import jwt
 from datetime import datetime, timedelta, timezone
 
 from server.enums.http_error_code_enum import HTTPErrorCode
 from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+from server.helpers.tracing_helper import TracingHelper
 
 SECRET_KEY = os.getenv("SECRET_KEY", "SECRET_KEY")
 REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY", "REFRESH_SECRET_KEY")
+REFRESH_TOKEN_EXPIRES_MINUTES = 60 * 24 * 7
 
 
 def hash_password(password):
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    with TracingHelper().span("bcrypt.hashpw"):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
 
 
 def verify_password(password, hashed):
-    return bcrypt.checkpw(password.encode(), hashed.encode())
+    with TracingHelper().span("bcrypt.checkpw"):
+        return bcrypt.checkpw(password.encode(), hashed.encode())
 
 
 def create_token(payload: dict, expires_in: int = 15) -> str:
@@ -25,15 +30,31 @@ def create_token(payload: dict, expires_in: int = 15) -> str:
     return jwt.encode(data, SECRET_KEY, algorithm="HS256")
 
 
-def create_refresh_token(payload: dict, expires_in: int = 60 * 24 * 7) -> str:
+def create_refresh_token(
+    payload: dict,
+    expires_in: int = REFRESH_TOKEN_EXPIRES_MINUTES,
+    family: Optional[str] = None,
+) -> str:
+    """
+    Refresh token con ``jti`` único y ``fam``: la familia de tokens rotados a
+    partir de un mismo login (el ``jti`` del primero si no se indica)
+    """
     data = payload.copy()
     data["exp"] = datetime.now(timezone.utc) + timedelta(minutes=expires_in)
+    data["jti"] = uuid.uuid4().hex
+    data["fam"] = family or data["jti"]
     return jwt.encode(data, REFRESH_SECRET_KEY, algorithm="HS256")
 
 
 def verify_refresh_token(token: str) -> Dict[str, Any]:
     try:
-        return jwt.decode(token, REFRESH_SECRET_KEY, algorithms=["HS256"])
+        # Los tokens sin jti/fam no se pueden revocar: se rechazan
+        return jwt.decode(
+            token,
+            REFRESH_SECRET_KEY,
+            algorithms=["HS256"],
+            options={"require": ["exp", "jti", "fam"]},
+        )
     except jwt.ExpiredSignatureError:
         raise CustomGraphQLExceptionHelper("Refresh token expirado")
     except jwt.InvalidTokenError:
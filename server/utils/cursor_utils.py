@@ -0,0 +1,17 @@
+import base64
+import binascii
+
+from server.helpers.custom_graphql_exception_helper import CustomGraphQLExceptionHelper
+
+
+def encode_cursor(value: str) -> str:
+    """Codifica un valor de paginación como cursor opaco"""
+    return base64.urlsafe_b64encode(str(value).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> str:
+    """Decodifica un cursor generado por encode_cursor"""
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CustomGraphQLExceptionHelper("Cursor de paginación inválido")
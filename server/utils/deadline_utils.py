@@ -0,0 +1,78 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, TypeVar
+
+import pymongo
+from flask import g, has_request_context, request
+
+T = TypeVar("T")
+
+# Presupuesto de la operación en milisegundos, enviado por el cliente
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+REQUEST_TIMEOUT_MS = int(os.getenv("REQUEST_TIMEOUT_MS", "10000"))
+REQUEST_MAX_TIMEOUT_MS = int(os.getenv("REQUEST_MAX_TIMEOUT_MS", "30000"))
+# Evita que un cliente fuerce timeouts con presupuestos que ninguna consulta
+# puede cumplir (el circuit breaker además ignora los presupuestos cortos)
+REQUEST_MIN_TIMEOUT_MS = int(os.getenv("REQUEST_MIN_TIMEOUT_MS", "250"))
+
+
+def resolve_request_timeout(header_value: Optional[str]) -> float:
+    """
+    Presupuesto de la operación en segundos: el de la cabecera
+    X-Request-Timeout acotado a [REQUEST_MIN_TIMEOUT_MS, REQUEST_MAX_TIMEOUT_MS],
+    o REQUEST_TIMEOUT_MS si no llega o no es un número válido
+    """
+    timeout_ms = REQUEST_TIMEOUT_MS
+    if header_value:
+        try:
+            timeout_ms = int(header_value)
+        except ValueError:
+            pass
+    timeout_ms = max(REQUEST_MIN_TIMEOUT_MS, min(timeout_ms, REQUEST_MAX_TIMEOUT_MS))
+    return timeout_ms / 1000
+
+
+@contextmanager
+def request_deadline():
+    """
+    Aplica con pymongo.timeout() el tiempo que le queda a la petición actual,
+    de modo que todas las operaciones de MongoHelper dentro del bloque lo
+    respetan (como maxTimeMS y timeout de socket). El deadline se fija en la
+    primera llamada y se conserva en ``g`` para las siguientes
+    """
+    if not has_request_context():
+        yield
+        return
+    deadline = g.get("request_deadline")
+    if deadline is None:
+        deadline = g.request_deadline = time.monotonic() + resolve_request_timeout(
+            request.headers.get(REQUEST_TIMEOUT_HEADER)
+        )
+    with pymongo.timeout(max(deadline - time.monotonic(), 0.0)):
+        yield
+
+
+def remaining_request_time() -> Optional[float]:
+    """Segundos que le quedan a la petición actual; None si no hay deadline"""
+    if not has_request_context():
+        return None
+    deadline = g.get("request_deadline")
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def iterate_within_deadline(iterable: Iterable[T]) -> Iterator[T]:
+    """
+    Itera aplicando el deadline de la petición a cada paso; para trabajo que
+    continúa fuera de la vista (p. ej. los payloads de @defer/@stream)
+    """
+    iterator = iter(iterable)
+    while True:
+        with request_deadline():
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
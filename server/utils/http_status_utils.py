@@ -0,0 +1,33 @@
+from typing import Any, Dict, Optional
+
+from server.enums.http_error_code_enum import HTTPErrorCode
+
+
+def resolve_status_code(success: bool, result: Dict[str, Any]) -> int:
+    """Calcula el status HTTP de una respuesta GraphQL según extensions.code"""
+    status_code = 200 if success else HTTPErrorCode.BAD_REQUEST.status_code
+
+    # Ajustar status_code según código de error en extensions.code
+    if "errors" in result:
+        for err in result["errors"]:
+            code = err.get("extensions", {}).get("code", "")
+            # Mapea el código string a enum si existe
+            for error_enum in HTTPErrorCode:
+                if code == error_enum.code_name:
+                    status_code = error_enum.status_code
+                    break
+            # Si ya asignaste un código distinto de 200, no sigas buscando
+            if status_code != HTTPErrorCode.BAD_REQUEST.status_code:
+                break
+
+    return status_code
+
+
+def resolve_retry_after(result: Dict[str, Any]) -> Optional[int]:
+    """Mayor retryAfter (segundos) indicado en los errores, si hay alguno"""
+    retry_after = [
+        err.get("extensions", {}).get("details", {}).get("retryAfter")
+        for err in result.get("errors", [])
+    ]
+    retry_after = [value for value in retry_after if value is not None]
+    return max(retry_after) if retry_after else None
@@ -0,0 +1,60 @@
+import os
+from typing import Any, Callable, Dict, Iterator
+
+from flask import current_app
+
+from server.helpers.incremental_execution_helper import IncrementalExecutionContext
+from server.utils.deadline_utils import iterate_within_deadline
+
+MULTIPART_BOUNDARY = "-"
+MULTIPART_CONTENT_TYPE = f'multipart/mixed; boundary="{MULTIPART_BOUNDARY}"'
+STREAM_BATCH_SIZE = int(os.getenv("GRAPHQL_STREAM_BATCH_SIZE", "50"))
+
+
+def accepts_incremental_delivery(accept_header: str) -> bool:
+    """True si el cliente acepta respuestas multipart/mixed (``Accept``)"""
+    for part in accept_header.lower().split(","):
+        media_type, *params = [value.strip() for value in part.split(";")]
+        if media_type == "multipart/mixed" and "q=0" not in params:
+            return True
+    return False
+
+
+def _encode_part(payload: Dict[str, Any]) -> str:
+    return (
+        f"\r\n--{MULTIPART_BOUNDARY}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n\r\n"
+        f"{current_app.json.dumps(payload)}"
+    )
+
+
+def multipart_response_body(
+    result: Dict[str, Any],
+    execution: IncrementalExecutionContext,
+    error_formatter: Callable,
+    debug: bool = False,
+) -> Iterator[str]:
+    """
+    Cuerpo multipart/mixed con el resultado inicial seguido de los payloads
+    incrementales (``incremental`` + ``hasNext``) según se van resolviendo
+    """
+    yield _encode_part({**result, "hasNext": True})
+
+    has_next = True
+    # El trabajo diferido sigue sujeto al deadline de la petición
+    for entry in iterate_within_deadline(
+        execution.incremental_results(STREAM_BATCH_SIZE)
+    ):
+        has_next = execution.has_pending
+        if entry is None:
+            continue
+        if "errors" in entry:
+            entry["errors"] = [
+                error_formatter(error, debug) for error in entry["errors"]
+            ]
+        yield _encode_part({"incremental": [entry], "hasNext": has_next})
+
+    # Un stream puede agotarse sin elementos nuevos tras el último payload
+    if has_next:
+        yield _encode_part({"hasNext": False})
+    yield f"\r\n--{MULTIPART_BOUNDARY}--\r\n"
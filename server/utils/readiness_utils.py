@@ -0,0 +1,57 @@
+import os
+from typing import Any, Dict, Tuple
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+READY_MAX_MONGO_LATENCY_MS = float(os.getenv("READY_MAX_MONGO_LATENCY_MS", "250"))
+READY_MAX_POOL_UTILISATION = float(os.getenv("READY_MAX_POOL_UTILISATION", "0.9"))
+READY_MAX_MAIL_QUEUE = int(os.getenv("READY_MAX_MAIL_QUEUE", "50"))
+READY_PING_TIMEOUT_S = float(os.getenv("READY_PING_TIMEOUT_S", "2"))
+
+
+def check_readiness(mongo_registry, mail_helper) -> Tuple[bool, Dict[str, Any]]:
+    """
+    Comprueba MongoDB (latencia y pool de cada instancia del registro) y la
+    cola de correo contra sus umbrales
+
+    Returns:
+        (listo, reporte serializable a JSON)
+    """
+    failures = []
+
+    latency_ms = None
+    try:
+        with pymongo.timeout(READY_PING_TIMEOUT_S):
+            latency_ms = round(mongo_registry.get("default").ping(), 2)
+        if latency_ms > READY_MAX_MONGO_LATENCY_MS:
+            failures.append(
+                f"Latencia de MongoDB {latency_ms} ms > {READY_MAX_MONGO_LATENCY_MS} ms"
+            )
+    except (PyMongoError, ConnectionError, RuntimeError) as e:
+        # Las dos últimas: el pool se crea aquí y no llega a conectar
+        failures.append(f"MongoDB no responde: {str(e)}")
+
+    pools = mongo_registry.metrics()
+    for name, pool in pools.items():
+        if pool["utilisation"] > READY_MAX_POOL_UTILISATION:
+            failures.append(
+                f"Pool de MongoDB '{name}' al {pool['utilisation']:.0%} "
+                f"(máximo {READY_MAX_POOL_UTILISATION:.0%})"
+            )
+        if pool["circuit"]["state"] == "open":
+            failures.append(f"Circuito del pool de MongoDB '{name}' abierto")
+
+    mail_queue = mail_helper.queue_depth
+    if mail_queue > READY_MAX_MAIL_QUEUE:
+        failures.append(f"Cola de correo con {mail_queue} envíos pendientes")
+
+    report = {
+        "status": "Ok" if not failures else "Unavailable",
+        "checks": {
+            "mongo": {"latency_ms": latency_ms, "pools": pools},
+            "mail": {"queue_depth": mail_queue},
+        },
+        "failures": failures,
+    }
+    return not failures, report
@@ -0,0 +1,24 @@
+import os
+
+from flask import Flask, request
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+TRUST_PROXY = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+# Proxies de confianza delante de la app. Cada uno añade una entrada a la
+# derecha de X-Forwarded-For; las de la izquierda las pone el cliente y no
+# valen para identificarlo. TRUST_PROXY_HEADERS=true equivale a uno
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "1" if TRUST_PROXY else "0"))
+
+
+def init_proxy_fix(app: Flask) -> None:
+    """
+    Con TRUSTED_PROXY_HOPS > 0, remote_addr pasa a ser la dirección que vio
+    el proxy de confianza más externo (ProxyFix)
+    """
+    if TRUSTED_PROXY_HOPS > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXY_HOPS)
+
+
+def get_client_ip() -> str:
+    """IP del cliente: ver init_proxy_fix si la app está detrás de proxies"""
+    return request.remote_addr or "unknown"
@@ -0,0 +1,199 @@
+"""Doble en memoria de MongoHelper compartido por benchmarks y tests."""
+
+import copy
+import sys
+import types
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+
+def _matches(document: Dict[str, Any], filter_: Dict[str, Any]) -> bool:
+    return all(
+        _matches_value(document.get(key), value) for key, value in filter_.items()
+    )
+
+
+def _matches_value(actual: Any, expected: Any) -> bool:
+    # Solo $in: el resto de operadores no coincide con ningún documento
+    if isinstance(expected, dict) and set(expected) == {"$in"}:
+        return actual in expected["$in"]
+    return actual == expected
+
+
+class StubMongoHelper:
+    """Interfaz de MongoHelper que usan los resolvers, sobre listas en memoria"""
+
+    def __init__(self, *args, **kwargs):
+        self.collections: Dict[str, List[Dict[str, Any]]] = {}
+
+    def seed(self, collection_name: str, documents: List[Dict[str, Any]]) -> None:
+        self.collections[collection_name] = documents
+
+    def ping(self) -> float:
+        return 0.0
+
+    def warm_up(self) -> int:
+        return 0
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {"open_connections": 0, "in_use": 0, "utilisation": 0.0}
+
+    def get_collection(self, name: str) -> List[Dict[str, Any]]:
+        return self.collections.setdefault(name, [])
+
+    def create_index(self, collection_name: str, keys, name=None, **kwargs) -> str:
+        return name or "_".join(f"{field}_{direction}" for field, direction in keys)
+
+    def create_ttl_index(self, collection_name: str, field_name: str, expire_seconds):
+        return f"{field_name}_ttl_idx"
+
+    def insert_one(self, collection_name: str, document: Dict[str, Any], **kwargs):
+        now = datetime.now(timezone.utc)
+        document["created_at"] = now
+        document["updated_at"] = now
+        document.setdefault("_id", ObjectId())
+        self.get_collection(collection_name).append(document)
+        return document["_id"]
+
+    def find_one(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Optional[Dict[str, Any]]:
+        for document in self.get_collection(collection_name):
+            if _matches(document, filter_):
+                return copy.copy(document)
+        return None
+
+    def find_many(
+        self,
+        collection_name: str,
+        filter_: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        sort=None,
+        **kwargs,
+    ) -> List[Dict[str, Any]]:
+        documents = [
+            copy.copy(document)
+            for document in self.get_collection(collection_name)
+            if _matches(document, filter_)
+        ]
+        documents = documents[skip:]
+        return documents[:limit] if limit else documents
+
+    def count_documents(self, collection_name: str, filter_, **kwargs) -> int:
+        return len(self.find_many(collection_name, filter_))
+
+    def find_iter(self, collection_name: str, filter_: Dict[str, Any], *args, **kwargs):
+        return iter(self.find_many(collection_name, filter_, *args, **kwargs))
+
+    def text_search(
+        self,
+        collection_name: str,
+        text: str,
+        filter_=None,
+        projection=None,
+        skip=0,
+        limit=0,
+    ):
+        terms = text.lower().split()
+        documents = [
+            copy.copy(document)
+            for document in self.get_collection(collection_name)
+            if any(term in document.get("name", "").lower() for term in terms)
+        ]
+        documents = documents[skip:]
+        return documents[:limit] if limit else documents
+
+    def update_one(self, collection_name: str, filter_, update, upsert=False, **kwargs):
+        for document in self.get_collection(collection_name):
+            if _matches(document, filter_):
+                document.update(update.get("$set", {}))
+                document["updated_at"] = datetime.now(timezone.utc)
+                break
+
+    def find_one_and_update(
+        self,
+        collection_name: str,
+        filter_,
+        update,
+        projection=None,
+        upsert: bool = False,
+        return_document=ReturnDocument.AFTER,
+        **kwargs,
+    ):
+        for document in self.get_collection(collection_name):
+            if _matches(document, filter_):
+                previous = copy.copy(document)
+                document.update(update.get("$set", {}))
+                document["updated_at"] = datetime.now(timezone.utc)
+                if return_document == ReturnDocument.BEFORE:
+                    return previous
+                return copy.copy(document)
+        if not upsert:
+            return None
+        document = {
+            **filter_,
+            **update.get("$setOnInsert", {}),
+            **update.get("$set", {}),
+        }
+        self.insert_one(collection_name, document)
+        return None if return_document == ReturnDocument.BEFORE else copy.copy(document)
+
+    def find_one_and_delete(self, collection_name: str, filter_, projection=None):
+        documents = self.get_collection(collection_name)
+        for index, document in enumerate(documents):
+            if _matches(document, filter_):
+                return documents.pop(index)
+        return None
+
+    def delete_one(self, collection_name: str, filter_, **kwargs):
+        documents = self.get_collection(collection_name)
+        for index, document in enumerate(documents):
+            if _matches(document, filter_):
+                del documents[index]
+                return {"deleted_count": 1}
+        return {"deleted_count": 0}
+
+    def close(self) -> None:
+        self.collections.clear()
+
+
+def make_users(count: int) -> List[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Usuario{index}",
+            "lastname": f"Apellido{index}",
+            "email": f"usuario{index}@example.com",
+            # Hash bcrypt fijo: los benchmarks de resolvers no verifican contraseñas
+            "password": "$2b$12$KIXQeFz1Qm1n0M3gkT7yXOp0c9rQm8Qk4b1yC6H3F9cK2d5mZ8b7e",
+            "isAdmin": index % 10 == 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for index in range(count)
+    ]
+
+
+def install_stub_mongo(users: int = 100) -> StubMongoHelper:
+    """Sustituye el módulo mongo_helper antes de importar el paquete server
+
+    Debe llamarse antes de cualquier import de ``server``: el paquete instancia
+    MongoHelper (y conecta) al cargar los resolvers y decoradores.
+    """
+    stub = StubMongoHelper()
+    stub.seed("users", make_users(users))
+
+    module = types.ModuleType("server.helpers.mongo_helper")
+    setattr(module, "MongoHelper", lambda *args, **kwargs: stub)
+    sys.modules["server.helpers.mongo_helper"] = module
+    return stub
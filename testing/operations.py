@@ -0,0 +1,42 @@
+"""Operaciones GraphQL de referencia que miden los benchmarks y prueban los tests."""
+
+USER_FIELDS = "id name lastname email isAdmin"
+
+OPERATIONS = {
+    "hello": "query Hello { hello }",
+    "users": f"query Users {{ users {{ {USER_FIELDS} }} }}",
+    "user": f"query User($id: ID!) {{ user(id: $id) {{ {USER_FIELDS} }} }}",
+    "searchUsers": (
+        "query Search($q: String!) { searchUsers(query: $q, first: 20) "
+        f"{{ nodes {{ {USER_FIELDS} }} pageInfo {{ endCursor hasNextPage }} }} }}"
+    ),
+    "profile": f"query Profile {{ profile {{ {USER_FIELDS} }} }}",
+    "register": (
+        "mutation Register($input: RegisterInput!) { register(input: $input) "
+        f"{{ accessToken refreshToken user {{ {USER_FIELDS} }} }} }}"
+    ),
+    "login": (
+        "mutation Login($input: LoginInput!) { login(input: $input) "
+        f"{{ accessToken refreshToken user {{ {USER_FIELDS} }} }} }}"
+    ),
+    "refreshToken": (
+        "mutation Refresh($token: String!) "
+        "{ refreshToken(refreshToken: $token) { accessToken } }"
+    ),
+    "recoverPassword": (
+        "mutation Recover($email: String!) { recoverPassword(email: $email) }"
+    ),
+    "updateUser": (
+        "mutation UpdateUser($input: UpdateUserInput!) "
+        f"{{ updateUser(input: $input) {{ {USER_FIELDS} }} }}"
+    ),
+    "deleteUser": "mutation DeleteUser($id: ID!) { deleteUser(id: $id) }",
+}
+
+REGISTER_INPUT = {
+    "name": "Benchmark",
+    "lastname": "Usuario",
+    "email": "bench@example.com",
+    "password": "Secreta@123",
+    "confirm_password": "Secreta@123",
+}
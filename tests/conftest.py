@@ -0,0 +1,82 @@
+"""Fixtures comunes: la app sobre el doble en memoria de MongoDB"""
+
+import os
+import threading
+
+import pytest
+
+from tests.helpers import THREAD_TIMEOUT_S
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+
+from testing.mongo_stub import install_stub_mongo  # noqa: E402
+
+# El doble de MongoDB tiene que estar instalado antes de importar server
+stub_mongo = install_stub_mongo(users=100)
+
+from server import create_app  # noqa: E402
+from server.utils.auth_utils import create_token  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def mongo():
+    """El doble de MongoDB; los cambios del test se deshacen al terminar"""
+    snapshot = {
+        name: [dict(document) for document in documents]
+        for name, documents in stub_mongo.collections.items()
+    }
+    yield stub_mongo
+    stub_mongo.collections.clear()
+    stub_mongo.collections.update(snapshot)
+
+
+@pytest.fixture
+def user_id(mongo):
+    return str(mongo.collections["users"][0]["_id"])
+
+
+@pytest.fixture
+def token(user_id):
+    return create_token({"id": user_id})
+
+
+class BlockingFindOne:
+    """
+    Sustituye find_one del doble: las búsquedas de ``user_id`` esperan a
+    release() para simular una consulta lenta
+    """
+
+    def __init__(self, mongo, monkeypatch, user_id: str):
+        self.entered = threading.Event()
+        self._release = threading.Event()
+        self.calls = 0
+        self._lock = threading.Lock()
+        original = mongo.find_one
+
+        def find_one(collection_name, filter_, *args, **kwargs):
+            if str(filter_.get("_id")) == user_id:
+                with self._lock:
+                    self.calls += 1
+                self.entered.set()
+                self._release.wait(THREAD_TIMEOUT_S)
+            return original(collection_name, filter_, *args, **kwargs)
+
+        monkeypatch.setattr(mongo, "find_one", find_one)
+
+    def release(self) -> None:
+        self._release.set()
+
+
+@pytest.fixture
+def blocking_find_one(mongo, monkeypatch, user_id):
+    blocking = BlockingFindOne(mongo, monkeypatch, user_id)
+    yield blocking
+    # Nunca deja hilos esperando aunque el test falle
+    blocking.release()
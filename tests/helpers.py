@@ -0,0 +1,28 @@
+"""Utilidades de los tests con hilos (no son fixtures)"""
+
+import threading
+import time
+
+# Espera máxima de los hilos de los tests antes de darlos por colgados
+THREAD_TIMEOUT_S = 5
+
+
+def wait_until(predicate, timeout: float = THREAD_TIMEOUT_S) -> bool:
+    """Espera activa a que ``predicate()`` se cumpla"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def post_in_thread(app, results: dict, name: str, json: dict, **kwargs):
+    """POST /graphql en otro hilo; la respuesta queda en ``results[name]``"""
+
+    def run():
+        results[name] = app.test_client().post("/graphql", json=json, **kwargs)
+
+    thread = threading.Thread(target=run, name=f"test-{name}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,80 @@
+"""Control de admisión de /graphql con peticiones concurrentes reales"""
+
+import pytest
+
+from server.helpers.admission_control_helper import AdmissionControlHelper
+from testing.operations import OPERATIONS
+from tests.helpers import THREAD_TIMEOUT_S, post_in_thread, wait_until
+
+STREAM_QUERY = "{ users @stream(initialCount: 1) { id } }"
+ANONYMOUS_QUERY = "{ users(first: 1) { id } }"
+LOGIN = {
+    "query": OPERATIONS["login"],
+    "variables": {"input": {"email": "nadie@example.com", "password": "x"}},
+}
+
+
+@pytest.fixture
+def admission(monkeypatch):
+    """
+    Límite de 2 con la mitad reservada: una sola consulta anónima a la vez y
+    sin esperas largas en la cola
+    """
+    admission = AdmissionControlHelper()
+    monkeypatch.setattr(admission, "enabled", True)
+    monkeypatch.setattr(admission, "adaptive", False)
+    monkeypatch.setattr(admission, "_limit", 2.0)
+    monkeypatch.setattr(admission, "reserved_ratio", 0.5)
+    monkeypatch.setattr(admission, "queue_timeout", 0.05)
+    assert admission.in_flight == 0
+    return admission
+
+
+def test_streamed_response_releases_slot_on_close(app, admission):
+    response = app.test_client().post(
+        "/graphql",
+        json={"query": STREAM_QUERY},
+        headers={"Accept": "multipart/mixed"},
+        buffered=False,
+    )
+    assert response.is_streamed
+    # Los payloads de @stream se ejecutan al enviar la respuesta
+    assert admission.in_flight == 1
+    assert b"hasNext" in b"".join(response.response)
+    response.close()
+    assert admission.in_flight == 0
+
+
+def test_priority_requests_use_reserved_capacity(
+    app, admission, blocking_find_one, user_id, token
+):
+    results = {}
+    blocked = post_in_thread(
+        app,
+        results,
+        "blocked",
+        {"query": OPERATIONS["user"], "variables": {"id": user_id}},
+    )
+    assert blocking_find_one.entered.wait(THREAD_TIMEOUT_S)
+    assert admission.in_flight == 1
+
+    # La capacidad anónima está agotada: se rechaza tras la espera en cola
+    client = app.test_client()
+    anonymous = client.post("/graphql", json={"query": ANONYMOUS_QUERY})
+    assert anonymous.status_code == 503
+    assert anonymous.headers["Retry-After"] == str(admission.retry_after)
+
+    # Mutaciones y peticiones autenticadas entran en la fracción reservada
+    mutation = client.post("/graphql", json=LOGIN)
+    assert mutation.status_code != 503
+    authenticated = client.post(
+        "/graphql",
+        json={"query": ANONYMOUS_QUERY},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert authenticated.status_code == 200
+
+    blocking_find_one.release()
+    blocked.join(THREAD_TIMEOUT_S)
+    assert results["blocked"].status_code == 200
+    assert wait_until(lambda: admission.in_flight == 0)
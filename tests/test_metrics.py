@@ -0,0 +1,39 @@
+"""/metrics solo para administradores, METRICS_TOKEN o con METRICS_PUBLIC"""
+
+import pytest
+
+from server.helpers.metrics_helper import MetricsHelper
+from server.utils.auth_utils import create_token
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = MetricsHelper()
+    monkeypatch.setattr(metrics, "public", False)
+    monkeypatch.setattr(metrics, "token", "secreto-del-scraper")
+    return metrics
+
+
+def _get(app, authorization=None):
+    headers = {"Authorization": authorization} if authorization else {}
+    return app.test_client().get("/metrics", headers=headers)
+
+
+def test_anonymous_and_non_admin_are_rejected(app, mongo, metrics):
+    assert _get(app).status_code == 401
+    # El fixture marca como administrador a uno de cada diez usuarios
+    non_admin = create_token({"id": str(mongo.collections["users"][1]["_id"])})
+    assert _get(app, f"Bearer {non_admin}").status_code == 401
+    assert _get(app, "Bearer otro-secreto").status_code == 401
+
+
+def test_admin_and_scraper_token_are_allowed(app, metrics, token):
+    response = _get(app, f"Bearer {token}")
+    assert response.status_code == 200
+    assert "admission_control" in response.get_json()
+    assert _get(app, "Bearer secreto-del-scraper").status_code == 200
+
+
+def test_public_metrics(app, metrics, monkeypatch):
+    monkeypatch.setattr(metrics, "public", True)
+    assert _get(app).status_code == 200
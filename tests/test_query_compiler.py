@@ -0,0 +1,193 @@
+"""El plan compilado debe dar exactamente la misma respuesta que graphql_sync"""
+
+import pytest
+from ariadne import graphql_sync
+from bson import ObjectId
+from flask import request
+
+from server.helpers.query_compiler_helper import QueryCompilerHelper
+from server.schema import schema
+from server.utils.custom_error_formatter_utils import custom_format_error
+from testing.operations import OPERATIONS, REGISTER_INPUT
+
+MUTATIONS = {
+    "register",
+    "login",
+    "refreshToken",
+    "recoverPassword",
+    "updateUser",
+    "deleteUser",
+}
+
+# Queries adicionales: alias, fragmentos, errores y propagación de null.
+# Los usuarios "roto" del fixture ``broken_users`` están al final de la lista
+EXTRA_QUERIES = {
+    "aliases": (
+        "query Aliases($id: ID!) { first: user(id: $id) { key: id name } "
+        "second: user(id: $id) { email name } }"
+    ),
+    "fragments": (
+        "fragment Basic on User { id name } "
+        "query Fragments { users(first: 3) { ...Basic ... on User { email } "
+        "...Basic } }"
+    ),
+    "typename": "{ __typename users(first: 2) { __typename id } }",
+    "default_variable": (
+        "query Page($first: Int = 2) { users(first: $first, "
+        "orderBy: {field: NAME, direction: DESC}) { id } }"
+    ),
+    "selected_operation": "query Hello { hello } query Users { users { id } }",
+    "resolver_error_nullable": '{ user(id: "no-es-un-id") { id } }',
+    "resolver_error_non_null_root": '{ searchUsers(query: "   ") { nodes { id } } }',
+    "partial_errors": (
+        "query Partial($id: ID!) { user(id: $id) { id } "
+        'missing: user(id: "no-es-un-id") { id } }'
+    ),
+    "null_in_non_null_field": (
+        "query Broken($broken: ID!) { user(id: $broken) { id email } }"
+    ),
+    "null_in_non_null_list_item": "{ users { id email } }",
+    "serialize_error": (
+        "query Invalid($invalid: ID!) { user(id: $invalid) { id isAdmin } }"
+    ),
+}
+
+# Lo que el compilador deja a graphql_sync (execute devuelve None)
+FALLBACK_QUERIES = {
+    "directive": (
+        "query Include($id: ID!, $yes: Boolean!) "
+        "{ user(id: $id) @include(if: $yes) { id } }"
+    ),
+    "introspection": "{ __schema { queryType { name } } }",
+    "syntax_error": "{ users { id ",
+    "validation_error": "{ users { nope } }",
+    "ambiguous_operation": "query A { hello } query B { users { id } }",
+}
+
+
+@pytest.fixture
+def broken_users(mongo):
+    """Usuarios con valores que el schema no admite"""
+    broken = {"_id": ObjectId(), "name": "Roto", "lastname": "Roto", "email": None}
+    invalid = {
+        "_id": ObjectId(),
+        "name": "Invalido",
+        "lastname": "Invalido",
+        "email": "invalido@example.com",
+        "isAdmin": "si",
+    }
+    mongo.collections["users"].extend([broken, invalid])
+    return {"broken": str(broken["_id"]), "invalid": str(invalid["_id"])}
+
+
+@pytest.fixture
+def variables(mongo, user_id, broken_users):
+    user = mongo.collections["users"][0]
+    return {
+        "id": user_id,
+        "q": "Usuario1",
+        "input": REGISTER_INPUT,
+        "email": user["email"],
+        "token": "no-es-un-token",
+        "yes": True,
+        **broken_users,
+    }
+
+
+def run_both(app, token, data):
+    """(compilado, graphql_sync) de la misma petición"""
+    headers = {"Authorization": f"Bearer {token}"}
+    compiler = QueryCompilerHelper(schema)
+    with app.test_request_context("/graphql", method="POST", headers=headers):
+        compiled = compiler.execute(
+            data, context_value=request, error_formatter=custom_format_error
+        )
+    # Segunda ejecución con el plan ya cacheado
+    with app.test_request_context("/graphql", method="POST", headers=headers):
+        cached = compiler.execute(
+            data, context_value=request, error_formatter=custom_format_error
+        )
+    with app.test_request_context("/graphql", method="POST", headers=headers):
+        expected = graphql_sync(
+            schema, data, context_value=request, error_formatter=custom_format_error
+        )
+    assert cached == compiled
+    return compiled, expected
+
+
+def _used_variables(query, variables):
+    return {name: value for name, value in variables.items() if f"${name}" in query}
+
+
+@pytest.mark.parametrize("name", sorted(set(OPERATIONS) - MUTATIONS))
+def test_benchmark_queries_match_graphql_sync(app, token, variables, name):
+    query = OPERATIONS[name]
+    data = {"query": query, "variables": _used_variables(query, variables)}
+    compiled, expected = run_both(app, token, data)
+    assert compiled is not None
+    assert compiled == expected
+
+
+@pytest.mark.parametrize("name", sorted(MUTATIONS))
+def test_benchmark_mutations_fall_back(app, token, variables, name):
+    query = OPERATIONS[name]
+    data = {"query": query, "variables": _used_variables(query, variables)}
+    with app.test_request_context("/graphql", method="POST"):
+        assert QueryCompilerHelper(schema).execute(data, context_value=request) is None
+
+
+@pytest.mark.parametrize("name", sorted(EXTRA_QUERIES))
+def test_extra_queries_match_graphql_sync(app, token, variables, name):
+    query = EXTRA_QUERIES[name]
+    data = {"query": query, "variables": _used_variables(query, variables)}
+    if name == "selected_operation":
+        data["operationName"] = "Users"
+    compiled, expected = run_both(app, token, data)
+    assert compiled is not None
+    assert compiled == expected
+
+
+def test_errors_keep_path_and_locations(app, token, variables):
+    query = EXTRA_QUERIES["null_in_non_null_field"]
+    data = {"query": query, "variables": _used_variables(query, variables)}
+    compiled, _ = run_both(app, token, data)
+    assert compiled is not None
+    _, result = compiled
+    assert result["data"] == {"user": None}
+    [error] = result["errors"]
+    assert error["path"] == ["user", "email"]
+    assert error["locations"] == [{"line": 1, "column": 53}]
+
+
+def test_null_propagates_to_root(app, token, broken_users):
+    compiled, _ = run_both(
+        app, token, {"query": EXTRA_QUERIES["null_in_non_null_list_item"]}
+    )
+    assert compiled is not None
+    _, result = compiled
+    assert result["data"] is None
+    assert result["errors"][0]["path"][:2] == ["users", 100]
+
+
+@pytest.mark.parametrize("name", sorted(FALLBACK_QUERIES))
+def test_fallback_queries(app, token, variables, name):
+    query = FALLBACK_QUERIES[name]
+    data = {"query": query, "variables": _used_variables(query, variables)}
+    compiled, _ = run_both(app, token, data)
+    assert compiled is None
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        # Falta una variable obligatoria: la coerción falla
+        {"query": OPERATIONS["user"], "variables": {}},
+        {"query": OPERATIONS["user"], "variables": "no-es-un-dict"},
+        {"query": OPERATIONS["users"], "operationName": 1},
+        {"query": None},
+    ],
+    ids=["invalid_variables", "variables_type", "operation_name_type", "no_query"],
+)
+def test_invalid_requests_fall_back(app, token, data):
+    compiled, _ = run_both(app, token, data)
+    assert compiled is None
@@ -0,0 +1,42 @@
+"""Identificación del cliente para los límites por IP"""
+
+import pytest
+from flask import Flask
+
+from server.utils import request_utils
+from server.utils.request_utils import get_client_ip, init_proxy_fix
+
+
+@pytest.fixture
+def ip_app(monkeypatch):
+    """App mínima detrás de un proxy de confianza que devuelve get_client_ip()"""
+    monkeypatch.setattr(request_utils, "TRUSTED_PROXY_HOPS", 1)
+    app = Flask(__name__)
+    init_proxy_fix(app)
+    app.add_url_rule("/ip", "ip", get_client_ip)
+    return app.test_client()
+
+
+def test_client_cannot_choose_its_ip_behind_proxy(ip_app):
+    # El cliente inventa la primera entrada; el proxy añade la real al final
+    environ = {"REMOTE_ADDR": "10.0.0.1"}
+    for spoofed in ("1.1.1.1", "2.2.2.2"):
+        response = ip_app.get(
+            "/ip",
+            headers={"X-Forwarded-For": f"{spoofed}, 203.0.113.7"},
+            environ_base=environ,
+        )
+        assert response.get_data(as_text=True) == "203.0.113.7"
+
+
+def test_forwarded_header_ignored_without_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(request_utils, "TRUSTED_PROXY_HOPS", 0)
+    app = Flask(__name__)
+    init_proxy_fix(app)
+    app.add_url_rule("/ip", "ip", get_client_ip)
+    response = app.test_client().get(
+        "/ip",
+        headers={"X-Forwarded-For": "1.1.1.1"},
+        environ_base={"REMOTE_ADDR": "10.0.0.1"},
+    )
+    assert response.get_data(as_text=True) == "10.0.0.1"
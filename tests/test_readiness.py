@@ -0,0 +1,36 @@
+"""/ready con MongoDB inaccesible"""
+
+import pytest
+
+from server.utils.readiness_utils import check_readiness
+
+
+class _UnreachableRegistry:
+    """Registro cuyo pool falla al crearse, como MongoHelper sin servidor"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def get(self, name="default"):
+        raise self.error
+
+    def metrics(self):
+        return {}
+
+
+class _Mail:
+    queue_depth = 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectionError("No se pudo conectar al servidor MongoDB (timeout)"),
+        RuntimeError("Error validando conexión"),
+    ],
+)
+def test_unreachable_pool_is_reported_not_raised(error):
+    ready, report = check_readiness(_UnreachableRegistry(error), _Mail())
+    assert not ready
+    assert report["status"] == "Unavailable"
+    assert report["failures"] == [f"MongoDB no responde: {error}"]
@@ -0,0 +1,135 @@
+"""Agrupación de queries idénticas en curso (REQUEST_COALESCING)"""
+
+import threading
+
+import pytest
+from flask import Response
+
+from server.helpers.request_coalescing_helper import RequestCoalescingHelper
+from testing.operations import OPERATIONS
+from tests.helpers import THREAD_TIMEOUT_S, post_in_thread, wait_until
+
+
+@pytest.fixture
+def coalescing(monkeypatch):
+    coalescing = RequestCoalescingHelper()
+    monkeypatch.setattr(coalescing, "enabled", True)
+    return coalescing
+
+
+@pytest.fixture
+def user_query(user_id):
+    return {"query": OPERATIONS["user"], "variables": {"id": user_id}}
+
+
+# El mínimo que admite X-Request-Timeout (REQUEST_MIN_TIMEOUT_MS)
+SHORT_BUDGET = {"X-Request-Timeout": "250"}
+
+
+def _start_leader(app, results, blocking_find_one, user_query, **kwargs):
+    leader = post_in_thread(app, results, "leader", user_query, **kwargs)
+    assert blocking_find_one.entered.wait(THREAD_TIMEOUT_S)
+    return leader
+
+
+def test_follower_gets_copy_of_leader_response(
+    app, coalescing, blocking_find_one, user_query
+):
+    collapsed = coalescing.metrics()["collapsed"]
+    results = {}
+    leader = _start_leader(app, results, blocking_find_one, user_query)
+    # Mismo documento con otro formato: misma clave normalizada
+    follower_query = dict(user_query, query=f"# comentario\n{user_query['query']}  ")
+    follower = post_in_thread(app, results, "follower", follower_query)
+    assert wait_until(lambda: coalescing.metrics()["collapsed"] == collapsed + 1)
+
+    blocking_find_one.release()
+    leader.join(THREAD_TIMEOUT_S)
+    follower.join(THREAD_TIMEOUT_S)
+
+    assert blocking_find_one.calls == 1
+    assert results["leader"].status_code == 200
+    assert results["follower"].status_code == results["leader"].status_code
+    assert results["follower"].get_data() == results["leader"].get_data()
+    assert results["follower"].headers["Content-Type"] == (
+        results["leader"].headers["Content-Type"]
+    )
+    assert results["follower"].get_json()["data"]["user"]["id"] == (
+        user_query["variables"]["id"]
+    )
+    assert coalescing.metrics()["in_flight"] == 0
+
+
+def test_follower_times_out_with_504(app, coalescing, blocking_find_one, user_query):
+    wait_timeouts = coalescing.metrics()["wait_timeouts"]
+    results = {}
+    leader = _start_leader(
+        app, results, blocking_find_one, user_query, headers=SHORT_BUDGET
+    )
+
+    follower = app.test_client().post("/graphql", json=user_query, headers=SHORT_BUDGET)
+    assert follower.status_code == 504
+    assert coalescing.metrics()["wait_timeouts"] == wait_timeouts + 1
+
+    # El líder no se ve afectado
+    blocking_find_one.release()
+    leader.join(THREAD_TIMEOUT_S)
+    assert results["leader"].status_code == 200
+
+
+def test_different_budgets_do_not_coalesce(
+    app, coalescing, blocking_find_one, user_query
+):
+    metrics = coalescing.metrics()
+    results = {}
+    leader = _start_leader(app, results, blocking_find_one, user_query)
+    # Con otro presupuesto el 504 del líder no le sirve: ejecuta por su cuenta
+    other = post_in_thread(app, results, "other", user_query, headers=SHORT_BUDGET)
+    assert wait_until(
+        lambda: coalescing.metrics()["executions"] == metrics["executions"] + 2
+    )
+
+    blocking_find_one.release()
+    leader.join(THREAD_TIMEOUT_S)
+    other.join(THREAD_TIMEOUT_S)
+
+    assert blocking_find_one.calls == 2
+    assert coalescing.metrics()["collapsed"] == metrics["collapsed"]
+    assert results["leader"].status_code == results["other"].status_code == 200
+
+
+def test_leader_error_reaches_followers_and_clears_in_flight(coalescing):
+    key = ("test_leader_error",)
+    started, release = threading.Event(), threading.Event()
+    error = RuntimeError("fallo del líder")
+    raised = {}
+
+    def failing_execution():
+        started.set()
+        release.wait(THREAD_TIMEOUT_S)
+        raise error
+
+    def run(name):
+        try:
+            coalescing.execute(key, failing_execution, THREAD_TIMEOUT_S)
+        except RuntimeError as e:
+            raised[name] = e
+
+    collapsed = coalescing.metrics()["collapsed"]
+    leader = threading.Thread(target=run, args=("leader",))
+    leader.start()
+    assert started.wait(THREAD_TIMEOUT_S)
+    follower = threading.Thread(target=run, args=("follower",))
+    follower.start()
+    assert wait_until(lambda: coalescing.metrics()["collapsed"] == collapsed + 1)
+
+    release.set()
+    leader.join(THREAD_TIMEOUT_S)
+    follower.join(THREAD_TIMEOUT_S)
+
+    assert raised == {"leader": error, "follower": error}
+    assert key not in coalescing._in_flight
+    # La siguiente petición con la misma clave ejecuta de nuevo
+    response = coalescing.execute(key, lambda: Response("ok"), THREAD_TIMEOUT_S)
+    assert response.get_data() == b"ok"
+    assert key not in coalescing._in_flight
@@ -0,0 +1,62 @@
+"""Rotación de refresh tokens, reutilización y logout"""
+
+import pytest
+
+from server.helpers.token_revocation_helper import (
+    REVOKED_TOKENS_COLLECTION,
+    TokenRevocationHelper,
+)
+from server.utils.auth_utils import create_refresh_token
+
+LOGOUT = "mutation Logout($token: String!) { logout(refreshToken: $token) }"
+REFRESH = (
+    "mutation Refresh($token: String!) "
+    "{ refreshToken(refreshToken: $token) { accessToken refreshToken } }"
+)
+
+
+@pytest.fixture
+def refresh_token(mongo, user_id):
+    return create_refresh_token({"id": user_id})
+
+
+def _post(app, query, token):
+    response = app.test_client().post(
+        "/graphql", json={"query": query, "variables": {"token": token}}
+    )
+    return response.get_json()
+
+
+def _error_code(body):
+    return body["errors"][0]["extensions"]["code"]
+
+
+def test_reusing_a_rotated_token_revokes_its_family(app, refresh_token):
+    rotated = _post(app, REFRESH, refresh_token)["data"]["refreshToken"]
+    # Un atacante presenta el token ya rotado: se revoca toda la familia,
+    # también el sucesor que tiene el usuario legítimo
+    assert _error_code(_post(app, REFRESH, refresh_token)) == "UNAUTHORIZED"
+    body = _post(app, REFRESH, rotated["refreshToken"])
+    assert _error_code(body) == "UNAUTHORIZED"
+
+
+def test_logout_revokes_the_session(app, refresh_token):
+    rotated = _post(app, REFRESH, refresh_token)["data"]["refreshToken"]
+    assert _post(app, LOGOUT, rotated["refreshToken"])["data"]["logout"] is True
+    body = _post(app, REFRESH, rotated["refreshToken"])
+    assert _error_code(body) == "UNAUTHORIZED"
+
+
+def test_sync_loads_revocations_from_other_workers(mongo, monkeypatch):
+    revocation = TokenRevocationHelper()
+    monkeypatch.setattr(revocation, "_next_rebuild", 0.0)
+    mongo.insert_one(REVOKED_TOKENS_COLLECTION, {"_id": "revocado-en-otro-worker"})
+
+    revocation._sync_once()
+
+    assert "revocado-en-otro-worker" in revocation._bloom
+    assert revocation.is_revoked("revocado-en-otro-worker")
+    # Con el filtro al día, un token no revocado no consulta MongoDB
+    negatives = revocation.metrics()["filter_negatives"]
+    assert not revocation.is_revoked("no-revocado")
+    assert revocation.metrics()["filter_negatives"] == negatives + 1
@@ -0,0 +1,37 @@
+"""Argumentos filter/orderBy de users"""
+
+import pytest
+
+USERS_QUERY = (
+    "query Users($filter: UserFilter, $orderBy: UserOrderBy) "
+    "{ users(filter: $filter, orderBy: $orderBy) { id } "
+    "usersCount(filter: $filter) }"
+)
+
+
+def _post(app, variables):
+    response = app.test_client().post(
+        "/graphql", json={"query": USERS_QUERY, "variables": variables}
+    )
+    return response.get_json()
+
+
+@pytest.mark.parametrize(
+    "filter_",
+    [
+        {"createdAfter": "2024-01-01T00:00:00"},
+        {"createdAfter": "2024-01-01T00:00:00+00:00", "isAdmin": False},
+        {"emailPrefix": "  usuario1 "},
+    ],
+)
+def test_filter_reaches_resolvers(app, mongo, filter_):
+    body = _post(app, {"filter": filter_, "orderBy": {"field": "NAME"}})
+    assert "errors" not in body
+    assert isinstance(body["data"]["users"], list)
+
+
+def test_invalid_created_after_is_bad_request(app, mongo):
+    body = _post(app, {"filter": {"createdAfter": "ayer"}})
+    codes = {error["extensions"]["code"] for error in body["errors"]}
+    assert codes == {"BAD_REQUEST"}
+    assert body["errors"][0]["message"] == "createdAfter debe ser una fecha ISO-8601"
@@ -0,0 +1,136 @@
+"""Réplica de users alimentada con un change stream simulado"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+from server.constants.mongo_constants import REPLICA_MISS
+from server.helpers.users_replica_helper import (
+    REPLICA_STATE_COLLECTION,
+    UsersReplicaHelper,
+)
+
+STALE_TOKEN = {"_data": "caducado"}
+
+
+def _user(email):
+    return {"_id": ObjectId(), "name": "Ana", "email": email}
+
+
+def _change(operation, document):
+    return {
+        "operationType": operation,
+        "documentKey": {"_id": document["_id"]},
+        "fullDocument": document,
+        "wallTime": datetime.now(timezone.utc),
+    }
+
+
+class FakeStream:
+    """Entrega los cambios y, al quedarse sin ellos, detiene la réplica"""
+
+    def __init__(self, changes, replica):
+        self._changes = list(changes)
+        self._replica = replica
+        self.alive = True
+        self.resume_token: Optional[Dict[str, str]] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def try_next(self):
+        if not self._changes:
+            self._replica.stop()
+            return None
+        self.resume_token = {"_data": str(len(self._changes))}
+        return self._changes.pop(0)
+
+
+class FakeMongo:
+    """Pool ``replica``: colección users, su change stream y replica_state"""
+
+    def __init__(self, replica, documents, changes=(), saved_token=None):
+        self.replica = replica
+        self.documents = documents
+        self.changes = changes
+        self.saved_token = saved_token
+        self.resumed_after = []
+
+    def get_collection(self, name):
+        return self
+
+    def find(self, filter_):
+        return [dict(document) for document in self.documents]
+
+    def watch(self, resume_after=None, **kwargs):
+        self.resumed_after.append(resume_after)
+        if resume_after == STALE_TOKEN:
+            raise OperationFailure("ChangeStreamHistoryLost", code=286)
+        return FakeStream(self.changes, self.replica)
+
+    def find_one(self, collection_name, filter_):
+        assert collection_name == REPLICA_STATE_COLLECTION
+        return {"resume_token": self.saved_token} if self.saved_token else None
+
+    def update_one(self, collection_name, filter_, update, upsert=False):
+        self.saved_token = update["$set"]["resume_token"]
+
+
+@pytest.fixture
+def replica():
+    # Instancia propia: el singleton de la app está desactivado
+    replica = type(UsersReplicaHelper())()
+    replica.retry_interval = 0
+    return replica
+
+
+def test_email_change_reindexes_by_email(replica):
+    user = _user("antes@example.com")
+    replica._run(FakeMongo(replica, [user]))
+
+    replica._apply(_change("update", {**user, "email": "despues@example.com"}))
+
+    assert replica.find_one({"email": "antes@example.com"}) is None
+    assert replica.find_one({"email": "despues@example.com"})["_id"] == user["_id"]
+    replica._apply(_change("delete", user))
+    assert replica.find_one({"email": "despues@example.com"}) is None
+
+
+def test_local_write_is_not_served_until_the_stream_applies_it(replica):
+    user = _user("ana@example.com")
+    replica._run(FakeMongo(replica, []))
+    assert replica.find_one({"_id": user["_id"]}) is None
+
+    # Registro en este proceso: la réplica aún no lo tiene, se lee de MongoDB
+    replica.note_local_write()
+    assert replica.find_one({"email": "ana@example.com"}) is REPLICA_MISS
+
+    replica._stop.clear()
+    replica._run(FakeMongo(replica, [], changes=[_change("insert", user)]))
+    assert replica.find_one({"email": "ana@example.com"})["_id"] == user["_id"]
+
+
+def test_stale_resume_token_reloads_the_collection(replica):
+    user = _user("ana@example.com")
+    mongo = FakeMongo(
+        replica,
+        [user],
+        changes=[_change("insert", _user("nuevo@example.com"))],
+        saved_token=STALE_TOKEN,
+    )
+
+    replica._run(mongo)
+
+    # Primero intenta retomar el stream y, al no poder, lo abre de cero
+    assert mongo.resumed_after == [STALE_TOKEN, None]
+    metrics = replica.metrics()
+    assert metrics["resyncs"] == 1
+    assert metrics["stream_errors"] == 1
+    assert metrics["documents"] == 2
+    assert mongo.saved_token not in (None, STALE_TOKEN)